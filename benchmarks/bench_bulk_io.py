@@ -0,0 +1,82 @@
+"""
+Throughput and peak memory of the streaming catalogue import/export.
+
+Writes a synthetic product file (--rows records, CSV or JSONL), imports it
+into a fresh store twice (insert, then an unchanged re-run) and exports it
+again, reporting rows/s, commits and the tracemalloc peak of each step.
+The peak should stay flat as --rows grows; it depends on --batch-size only.
+
+Usage: python -m benchmarks.bench_bulk_io [--rows N] [--batch-size N] [--format csv|jsonl]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import open_store, temp_db_path
+from database import bulk_io
+from database.queries import Queries
+
+FIELDS = ("sku", "name", "vendor", "buy_price", "sell_price", "stock_quantity", "size", "color")
+
+
+def write_catalogue(path, rows, fmt, seed=11):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle) if fmt == bulk_io.CSV else None
+        if writer is not None:
+            writer.writerow(FIELDS)
+        for i in range(rows):
+            buy = round(rng.uniform(4, 80), 2)
+            record = (f"IMP-{i:08d}", f"Imported Item {i}", rng.choice(("Vendor A", "Vendor B")),
+                      buy, round(buy * 1.8, 2), rng.randint(0, 40), rng.choice("SML"), "Black")
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                handle.write(json.dumps(dict(zip(FIELDS, record))) + "\n")
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = report.get("read", report["written"])
+    print(f"{label:<18} {rows:>9} {elapsed:>8.2f} {rows / elapsed:>10.0f} {peak / 1024 / 1024:>9.2f}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=bulk_io.BATCH_SIZE)
+    parser.add_argument("--format", choices=(bulk_io.CSV, bulk_io.JSONL), default=bulk_io.CSV)
+    args = parser.parse_args()
+
+    source = os.path.join(tempfile.gettempdir(), f"store_bench_catalogue.{args.format}")
+    target = os.path.join(tempfile.gettempdir(), f"store_bench_export.{args.format}")
+    write_catalogue(source, args.rows, args.format)
+
+    db = open_store(temp_db_path("bulk_io"))
+    queries = Queries(db)
+
+    print(f"\n{'step':<18} {'rows':>9} {'s':>8} {'rows/s':>10} {'peak MiB':>9}")
+    commits = db.commit_count
+    measure("import (insert)", lambda: bulk_io.import_products(queries, source, batch_size=args.batch_size))
+    print(f"{'':<18} commits: {db.commit_count - commits}")
+    measure("import (unchanged)", lambda: bulk_io.import_products(queries, source, batch_size=args.batch_size))
+    measure("export", lambda: bulk_io.export_products(queries, target, page_size=args.batch_size))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Checkout latency of Queries.create_transaction over cart sizes 1..500.
+
+Compares the current implementation (guarded UPDATE per product for small
+carts, set-based above Queries.SET_BASED_STOCK_MIN_PRODUCTS) with the
+previous per-line version (SELECT + INSERT + UPDATE for every cart line),
+both in one transaction. The baseline also maintains the daily_sales and
+vendor_daily_sales rollups, so both sides do the same work.
+
+Usage: python -m benchmarks.bench_create_transaction [--repeat N]
+"""
+import argparse
+import sqlite3
+
+from benchmarks.common import fill_catalogue, open_store, summarize, temp_db_path, time_calls
+from database.queries import UPSERT_DAILY_SALES, UPSERT_VENDOR_SALES, Queries
+
+CART_SIZES = (1, 10, 50, 100, 250, 500)
+
+
+def legacy_create_transaction(db, total_amount, payment_method, user_id, items_list):
+    """The original per-line implementation (plus the rollups), kept here as the baseline."""
+    with db.lock:
+        try:
+            db.cursor.execute(
+                "INSERT INTO transactions (total_amount, payment_method, user_id) VALUES (?, ?, ?)",
+                (total_amount, payment_method, user_id)
+            )
+            transaction_id = db.cursor.lastrowid
+            for product_id, quantity, price_at_sale in items_list:
+                db.cursor.execute("SELECT stock_quantity FROM products WHERE id = ?", (product_id,))
+                stock_row = db.cursor.fetchone()
+                if not stock_row or stock_row[0] < quantity:
+                    raise sqlite3.Error(f"Insufficient stock for product {product_id}")
+                db.cursor.execute(
+                    "INSERT INTO transaction_items (transaction_id, product_id, quantity, price_at_sale) "
+                    "VALUES (?, ?, ?, ?)",
+                    (transaction_id, product_id, quantity, price_at_sale)
+                )
+                db.cursor.execute(
+                    "UPDATE products SET stock_quantity = stock_quantity - ? WHERE id = ?",
+                    (quantity, product_id)
+                )
+            db.cursor.execute(UPSERT_DAILY_SALES.sql, (transaction_id,))
+            db.cursor.execute(UPSERT_VENDOR_SALES.sql, (transaction_id,))
+            db.conn.commit()
+            return transaction_id
+        except sqlite3.Error:
+            db.conn.rollback()
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--products", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = open_store(temp_db_path("checkout"))
+    fill_catalogue(db, products=args.products, transactions=0)
+    # Plenty of stock so no run fails on the guard
+    db.execute_query("UPDATE products SET stock_quantity = 1000000")
+    queries = Queries(db)
+
+    print(f"\n{'lines':>5} {'legacy p50':>11} {'current p50':>12} {'legacy p95':>11} {'current p95':>12}")
+    for size in CART_SIZES:
+        items = [(product_id, 1, 25.0) for product_id in range(1, size + 1)]
+        total = 25.0 * size
+        legacy = summarize(time_calls(
+            lambda: legacy_create_transaction(db, total, "Cash", 1, items), args.repeat))
+        current = summarize(time_calls(
+            lambda: queries.create_transaction(total, "Cash", 1, items), args.repeat))
+        print(
+            f"{size:>5} {legacy['p50_ms']:>9.3f}ms {current['p50_ms']:>10.3f}ms "
+            f"{legacy['p95_ms']:>9.3f}ms {current['p95_ms']:>10.3f}ms"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares SQLite's default connection settings with config.DB_PRAGMAS.
+
+Measures, on a file-backed device-sized database:
+  * commit latency of a single auto-committed UPDATE through execute_query
+  * read throughput of point lookups by SKU
+
+Usage: python -m benchmarks.bench_pragmas [--products N] [--commits N] [--reads N]
+"""
+import argparse
+import random
+import time
+
+import config
+from benchmarks.common import fill_catalogue, open_store, summarize, temp_db_path, time_calls
+
+# SQLite's out-of-the-box behaviour (rollback journal, synchronous=FULL).
+DEFAULT_PROFILE = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def run_profile(label, pragmas, products, commits, reads):
+    path = temp_db_path(label)
+    db = open_store(path, pragmas=pragmas)
+    fill_catalogue(db, products=products, transactions=products)
+
+    rng = random.Random(1)
+    ids = [rng.randint(1, products) for _ in range(commits)]
+    it = iter(ids)
+    commit_ms = time_calls(
+        lambda: db.execute_query(
+            "UPDATE products SET stock_quantity = stock_quantity + 1 WHERE id = ?", (next(it),)
+        ),
+        commits,
+    )
+
+    skus = [f"BN-{rng.randrange(products):07d}" for _ in range(reads)]
+    started = time.perf_counter()
+    for sku in skus:
+        db.execute_query("SELECT * FROM products WHERE sku = ?", (sku,), fetch_one=True)
+    elapsed = time.perf_counter() - started
+
+    active = db.get_pragmas()
+    db.close()
+    return {
+        "profile": label,
+        "journal_mode": active.get("journal_mode"),
+        "synchronous": active.get("synchronous"),
+        "commit": summarize(commit_ms),
+        "reads_per_sec": reads / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--commits", type=int, default=300)
+    parser.add_argument("--reads", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = [
+        run_profile("default", DEFAULT_PROFILE, args.products, args.commits, args.reads),
+        run_profile("tuned", config.DB_PRAGMAS, args.products, args.commits, args.reads),
+    ]
+    print(f"\n{'profile':<8} {'journal':<8} {'commit p50':>11} {'commit p95':>11} {'reads/s':>10}")
+    for r in results:
+        print(
+            f"{r['profile']:<8} {r['journal_mode']:<8} {r['commit']['p50_ms']:>9.3f}ms "
+            f"{r['commit']['p95_ms']:>9.3f}ms {r['reads_per_sec']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Latency of every Queries method against a generated store database.
+
+Runs each case in CASES --repeat times (heavy maintenance methods fewer
+times) on a scratch copy of the database and reports n/mean/p50/p95/p99 in
+milliseconds. Every public Queries method must have a case, so new methods
+cannot silently skip the suite.
+
+Usage:
+    python -m benchmarks.bench_queries                         # generates a default store first
+    python -m benchmarks.bench_queries --db /tmp/store_large.db --json after.json
+    python -m benchmarks.bench_queries --db /tmp/store_large.db --compare before.json
+
+With --compare the exit status is 1 if any method's p50 or p95 got slower
+than --threshold (relative) and by more than --noise-ms (absolute).
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+
+from benchmarks.common import open_store, summarize, temp_db_path, time_calls
+from benchmarks.generate_store import generate_store
+from database.queries import Queries
+
+# Methods that never touch SQL themselves.
+NOT_BENCHMARKED = {"run_async"}
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def _take_open_trials(queries, ctx, count):
+    """
+    Pops count open trial IDs for the batch trial cases. When the pool runs
+    dry, closed entries are reopened first (a rare, slower call).
+    """
+    pool = ctx["open_trials"]
+    if len(pool) < count:
+        with queries.db.lock:
+            conn = queries.db.conn
+            reopened = [row[0] for row in conn.execute(
+                "SELECT id FROM trial_ledger WHERE status != 'On_Trial' LIMIT ?", (count * 50,))]
+            conn.executemany("UPDATE trial_ledger SET status = 'On_Trial' WHERE id = ?",
+                             ((trial_id,) for trial_id in reopened))
+            conn.commit()
+        pool.extend(reopened)
+    return [pool.pop() for _ in range(count)]
+
+
+def _take_returned_trial(queries, ctx):
+    """Pops a Returned trial ID for the reopen case, closing open entries when the pool runs dry."""
+    pool = ctx["returned_trials"]
+    if not pool:
+        with queries.db.lock:
+            conn = queries.db.conn
+            closed = [row[0] for row in conn.execute(
+                "SELECT id FROM trial_ledger WHERE status = 'On_Trial' LIMIT 500")]
+            conn.executemany("UPDATE trial_ledger SET status = 'Returned' WHERE id = ?",
+                             ((trial_id,) for trial_id in closed))
+            conn.commit()
+        pool.extend(closed)
+    return pool.pop()
+
+
+# (case name, Queries method, repeat divisor, call(queries, rng, ctx))
+# The repeat divisor scales --repeat down for whole-table maintenance work.
+CASES = [
+    ("get_user_by_credentials", "get_user_by_credentials", 1,
+     lambda q, rng, ctx: q.get_user_by_credentials("admin", "adminpass")),
+    ("get_total_sales_for_today", "get_total_sales_for_today", 1,
+     lambda q, rng, ctx: q.get_total_sales_for_today()),
+    ("get_pending_trials_count", "get_pending_trials_count", 1,
+     lambda q, rng, ctx: q.get_pending_trials_count()),
+    ("get_dashboard_stats", "get_dashboard_stats", 1,
+     lambda q, rng, ctx: q.get_dashboard_stats()),
+    ("get_sales_totals[month]", "get_sales_totals", 1,
+     lambda q, rng, ctx: q.get_sales_totals(ctx["first_day"], ctx["last_day"], period="month")),
+    ("get_sales_totals[day,cash]", "get_sales_totals", 1,
+     lambda q, rng, ctx: q.get_sales_totals(ctx["first_day"], ctx["last_day"], payment_method="Cash")),
+    ("get_vendor_report[month]", "get_vendor_report", 1,
+     lambda q, rng, ctx: q.get_vendor_report(ctx["first_day"], ctx["last_day"], period="month")),
+    ("get_vendor_report[vendor]", "get_vendor_report", 1,
+     lambda q, rng, ctx: q.get_vendor_report(ctx["first_day"], ctx["last_day"],
+                                             vendor_id=rng.choice(ctx["vendor_ids"]))),
+    ("get_top_vendors", "get_top_vendors", 1,
+     lambda q, rng, ctx: q.get_top_vendors(ctx["first_day"], ctx["last_day"], limit=20)),
+    ("get_product_by_sku", "get_product_by_sku", 1,
+     lambda q, rng, ctx: q.get_product_by_sku(rng.choice(ctx["skus"]))),
+    ("lookup_sku", "lookup_sku", 1,
+     lambda q, rng, ctx: q.lookup_sku(rng.choice(ctx["skus"]))),
+    ("lookup_skus[20 scans]", "lookup_skus", 1,
+     lambda q, rng, ctx: q.lookup_skus(rng.sample(ctx["skus"], 20))),
+    ("search_products[word]", "search_products", 1,
+     lambda q, rng, ctx: q.search_products(rng.choice(("hoodie", "jeans", "linen", "slim", "black")))),
+    ("search_products[short]", "search_products", 1,
+     lambda q, rng, ctx: q.search_products(rng.choice(("XL", "32", "S")))),
+    ("list_products_page[name]", "list_products_page", 1,
+     lambda q, rng, ctx: q.list_products_page(sort="name")),
+    ("list_products_page[deep]", "list_products_page", 1,
+     lambda q, rng, ctx: q.list_products_page(sort="name", after=(rng.choice(ctx["names"]), 0))),
+    ("list_products_page[low_stock]", "list_products_page", 1,
+     lambda q, rng, ctx: q.list_products_page(sort="stock", low_stock_only=True)),
+    ("list_products_page[search]", "list_products_page", 1,
+     lambda q, rng, ctx: q.list_products_page(search="hoodie")),
+    ("update_product", "update_product", 1,
+     lambda q, rng, ctx: q.update_product(rng.choice(ctx["product_ids"]),
+                                          sell_price=round(rng.uniform(10, 90), 2))),
+    ("update_product_stock", "update_product_stock", 1,
+     lambda q, rng, ctx: q.update_product_stock(rng.choice(ctx["product_ids"]), 1)),
+    ("create_transaction[3 lines]", "create_transaction", 1,
+     lambda q, rng, ctx: q.create_transaction(
+         75.0, "Card", 1, [(pid, 1, 25.0) for pid in rng.sample(ctx["product_ids"], 3)])),
+    ("create_transaction[25 lines]", "create_transaction", 1,
+     lambda q, rng, ctx: q.create_transaction(
+         625.0, "Cash", 1, [(pid, 1, 25.0) for pid in rng.sample(ctx["product_ids"], 25)])),
+    ("checkout_for_trial", "checkout_for_trial", 1,
+     lambda q, rng, ctx: q.checkout_for_trial("Bench Customer", "0700000000", rng.choice(ctx["product_ids"]))),
+    ("get_on_trial_items", "get_on_trial_items", 4,
+     lambda q, rng, ctx: q.get_on_trial_items()),
+    ("get_on_trial_items_page", "get_on_trial_items_page", 1,
+     lambda q, rng, ctx: q.get_on_trial_items_page()),
+    ("get_on_trial_items_page[phone]", "get_on_trial_items_page", 1,
+     lambda q, rng, ctx: q.get_on_trial_items_page(phone="0700")),
+    ("iter_on_trial_items", "iter_on_trial_items", 4,
+     lambda q, rng, ctx: _consume(q.iter_on_trial_items())),
+    # Runs before the batch cases below use up the open trials of these phones
+    ("settle_customer_trials", "settle_customer_trials", 1,
+     lambda q, rng, ctx: q.settle_customer_trials(ctx["open_phones"].pop() if ctx["open_phones"] else "-", 1)),
+    ("return_trial_items[10]", "return_trial_items", 1,
+     lambda q, rng, ctx: q.return_trial_items(_take_open_trials(q, ctx, 10))),
+    ("convert_trials_to_sale[5]", "convert_trials_to_sale", 1,
+     lambda q, rng, ctx: q.convert_trials_to_sale(_take_open_trials(q, ctx, 5), "Card", 1)),
+    ("get_or_create_customer", "get_or_create_customer", 1,
+     lambda q, rng, ctx: q.get_or_create_customer(rng.choice(ctx["phones"]))),
+    ("find_customer_by_phone", "find_customer_by_phone", 1,
+     lambda q, rng, ctx: q.find_customer_by_phone(rng.choice(ctx["phones"]))),
+    ("search_customers_by_phone", "search_customers_by_phone", 1,
+     lambda q, rng, ctx: q.search_customers_by_phone(rng.choice(ctx["phones"])[:6])),
+    ("get_customer_history", "get_customer_history", 1,
+     lambda q, rng, ctx: q.get_customer_history(rng.choice(ctx["customer_ids"]))),
+    ("get_outstanding_trial_value", "get_outstanding_trial_value", 1,
+     lambda q, rng, ctx: q.get_outstanding_trial_value(rng.choice(ctx["customer_ids"]))),
+    # Alternating the age invalidates the checkpoint, so every call is a full pass
+    ("scan_overdue_trials[full]", "scan_overdue_trials", 20,
+     lambda q, rng, ctx: q.scan_overdue_trials(max_age_days=next(ctx["scan_ages"]))),
+    ("scan_overdue_trials[incremental]", "scan_overdue_trials", 1,
+     lambda q, rng, ctx: q.scan_overdue_trials()),
+    ("get_overdue_trials", "get_overdue_trials", 1,
+     lambda q, rng, ctx: q.get_overdue_trials()),
+    ("update_trial_status", "update_trial_status", 1,
+     lambda q, rng, ctx: q.update_trial_status(_take_returned_trial(q, ctx), "On_Trial")),
+    ("warm_sku_cache", "warm_sku_cache", 10,
+     lambda q, rng, ctx: q.warm_sku_cache()),
+    ("rebuild_store_stats", "rebuild_store_stats", 20,
+     lambda q, rng, ctx: q.rebuild_store_stats()),
+    ("rebuild_daily_sales", "rebuild_daily_sales", 20,
+     lambda q, rng, ctx: q.rebuild_daily_sales()),
+    ("rebuild_vendor_sales", "rebuild_vendor_sales", 20,
+     lambda q, rng, ctx: q.rebuild_vendor_sales()),
+]
+
+
+def missing_cases():
+    """Public Queries methods without a case in CASES."""
+    public = {
+        name for name in dir(Queries)
+        if not name.startswith("_") and callable(getattr(Queries, name))
+    }
+    return sorted(public - {method for _, method, _, _ in CASES} - NOT_BENCHMARKED)
+
+
+def _context(db, rng):
+    """Sample keys from the database for the cases to draw from."""
+    conn = db.conn
+    days = conn.execute("SELECT MIN(day), MAX(day) FROM daily_sales").fetchone()
+    products = conn.execute("SELECT id, sku, name FROM products").fetchall()
+    sample = rng.sample(products, min(2000, len(products)))
+    return {
+        "first_day": days[0] or "2000-01-01",
+        "last_day": days[1] or "2999-12-31",
+        "product_ids": [row[0] for row in products],
+        "skus": [row[1] for row in sample],
+        "names": [row[2] for row in sample],
+        "vendor_ids": [row[0] for row in conn.execute("SELECT id FROM vendors")],
+        "trial_ids": [row[0] for row in conn.execute("SELECT id FROM trial_ledger")] or [1],
+        "customer_ids": [row[0] for row in conn.execute("SELECT id FROM customers")] or [1],
+        "phones": [row[0] for row in conn.execute("SELECT phone FROM customers")] or ["0700000000"],
+        "open_trials": [row[0] for row in conn.execute("SELECT id FROM trial_ledger WHERE status = 'On_Trial'")],
+        "open_phones": [row[0] for row in conn.execute(
+            "SELECT DISTINCT customer_phone FROM trial_ledger WHERE status = 'On_Trial'")],
+        "scan_ages": itertools.cycle((7, 8)),
+        "returned_trials": [row[0] for row in conn.execute(
+            "SELECT id FROM trial_ledger WHERE status = 'Returned'")],
+    }
+
+
+def run_suite(db_path, repeat, seed=1, only=None):
+    """Benchmarks every case on a scratch copy of db_path; returns {case: summary}."""
+    scratch = temp_db_path("queries")
+    shutil.copyfile(db_path, scratch)
+    db = open_store(scratch)
+    queries = Queries(db)
+    with db.lock:
+        # Enough stock that checkout cases always take the success path
+        db.conn.execute("UPDATE products SET stock_quantity = stock_quantity + 100000")
+        db.conn.commit()
+    rng = random.Random(seed)
+    ctx = _context(db, rng)
+
+    results = {}
+    for name, _, divisor, call in CASES:
+        if only and only not in name:
+            continue
+        runs = max(3, repeat // divisor)
+        # The write paths print a [DB] line per call; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            call(queries, rng, ctx)  # warm-up
+            samples = time_calls(lambda: call(queries, rng, ctx), runs)
+        results[name] = summarize(samples)
+    db.close()
+    return results
+
+
+def compare(baseline, current, threshold, noise_ms):
+    """Prints a comparison table; returns the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<32} {'base p50':>9} {'new p50':>9} {'base p95':>9} {'new p95':>9}  change")
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<32} {'-':>9} {now['p50_ms']:>9.3f} {'-':>9} {now['p95_ms']:>9.3f}  new")
+            continue
+        flags = []
+        for metric in ("p50_ms", "p95_ms"):
+            slower = now[metric] - before[metric]
+            if slower > noise_ms and now[metric] > before[metric] * (1 + threshold):
+                flags.append(metric[:3])
+        ratio = now["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        label = f"x{ratio:.2f}" + (f"  REGRESSION ({', '.join(flags)})" if flags else "")
+        print(f"{name:<32} {before['p50_ms']:>9.3f} {now['p50_ms']:>9.3f} "
+              f"{before['p95_ms']:>9.3f} {now['p95_ms']:>9.3f}  {label}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Store database to benchmark (default: generate one)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--only", help="Only run cases whose name contains this text")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as regression")
+    parser.add_argument("--noise-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    missing = missing_cases()
+    if missing:
+        print(f"[BENCH] Queries methods without a case in CASES: {', '.join(missing)}")
+        return 1
+
+    db_path = args.db
+    if db_path is None:
+        db_path = temp_db_path("generated")
+        generate_store(db_path)
+
+    results = run_suite(db_path, args.repeat, only=args.only)
+
+    print(f"\n{'case':<32} {'n':>5} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}   (ms)")
+    for name, summary in results.items():
+        print(f"{name:<32} {summary['n']:>5} {summary['mean_ms']:>9.3f} {summary['p50_ms']:>9.3f} "
+              f"{summary['p95_ms']:>9.3f} {summary['p99_ms']:>9.3f}")
+
+    if args.json:
+        report = {
+            "meta": {
+                "db": db_path,
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n[BENCH] Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(baseline, results, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"\n[BENCH] {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\n[BENCH] No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
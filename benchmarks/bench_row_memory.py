@@ -0,0 +1,62 @@
+"""
+Memory and time to materialize a large product listing in each row format.
+
+Fetches one list_products_page() of --rows products (100k by default) as
+dicts, sqlite3.Row, plain tuples and Product objects, and reports the
+memory still held by the result (tracemalloc) and the fetch time.
+
+Usage: python -m benchmarks.bench_row_memory [--rows N]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.common import fill_catalogue, open_store, temp_db_path
+from database.db_handler import ROW_DICT, ROW_SQLITE, ROW_TUPLE
+from database.queries import Queries
+from models.product import Product
+
+FORMATS = (
+    ("dict", ROW_DICT),
+    ("Row", ROW_SQLITE),
+    ("tuple", ROW_TUPLE),
+    ("Product", Product),
+)
+
+
+def measure(queries, rows, row_format):
+    """Returns (held MiB, peak MiB, elapsed ms) for one page in row_format."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    page = queries.list_products_page(limit=rows, row_format=row_format)
+    elapsed = (time.perf_counter() - started) * 1000.0
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(page['rows']) == rows
+    del page
+    return held / 2**20, peak / 2**20, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    db = open_store(temp_db_path("row_memory"))
+    fill_catalogue(db, products=args.rows, transactions=0)
+    queries = Queries(db)
+    # The demo seed rows are part of the catalogue too
+    rows = db.execute_query("SELECT COUNT(*) AS n FROM products", fetch_one=True)['n']
+
+    print(f"\n{rows} rows")
+    print(f"{'format':<8} {'held MiB':>9} {'peak MiB':>9} {'bytes/row':>10} {'fetch ms':>9}")
+    for label, row_format in FORMATS:
+        held, peak, elapsed = measure(queries, rows, row_format)
+        print(f"{label:<8} {held:>9.1f} {peak:>9.1f} {held * 2**20 / rows:>10.0f} {elapsed:>9.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
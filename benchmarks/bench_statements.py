@@ -0,0 +1,57 @@
+"""
+Per-call overhead of the statement execution paths for a SKU point lookup.
+
+Each path fetches the same product row by SKU on a warm, file-backed store:
+  * raw       conn.execute(...).fetchone() with no locking or conversion
+  * execute   DatabaseHandler.execute_query (SQL inspected on every call)
+  * run       DatabaseHandler.run with the registered GET_PRODUCT_BY_SKU
+  * queries   Queries.get_product_by_sku (run + method call)
+
+Usage: python -m benchmarks.bench_statements [--products N] [--calls N]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import fill_catalogue, open_store, temp_db_path
+from database.queries import GET_PRODUCT_BY_SKU, Queries
+
+
+def per_call_us(func, skus):
+    started = time.perf_counter()
+    for sku in skus:
+        func(sku)
+    return (time.perf_counter() - started) * 1e6 / len(skus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    db = open_store(temp_db_path("statements"))
+    fill_catalogue(db, products=args.products, transactions=0)
+    queries = Queries(db)
+
+    rng = random.Random(3)
+    skus = [f"BN-{rng.randrange(args.products):07d}" for _ in range(args.calls)]
+    sql = GET_PRODUCT_BY_SKU.sql
+
+    paths = [
+        ("raw", lambda sku: db.conn.execute(sql, (sku,)).fetchone()),
+        ("execute", lambda sku: db.execute_query(sql, (sku,), fetch_one=True)),
+        ("run", lambda sku: db.run(GET_PRODUCT_BY_SKU, (sku,))),
+        ("queries", queries.get_product_by_sku),
+    ]
+
+    print(f"\n{'path':<10} {'us/call':>9} {'calls/s':>10}")
+    for label, func in paths:
+        per_call_us(func, skus[:1000])  # warm the page and statement caches
+        cost = per_call_us(func, skus)
+        print(f"{label:<10} {cost:>9.2f} {1e6 / cost:>10.0f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
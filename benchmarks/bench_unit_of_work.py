@@ -0,0 +1,65 @@
+"""
+Commits and latency per business operation: autocommit vs one unit of work.
+
+The operation is a trial checkout followed by a stock adjustment and a
+one-line sale for the same product, the kind of multi-step action that used
+to commit after every statement:
+  * autocommit   the Queries calls run one after another (a commit each)
+  * unit_of_work the same calls inside db.transaction() (a single commit)
+
+Commits are counted with DatabaseHandler.commit_count.
+
+Usage: python -m benchmarks.bench_unit_of_work [--products N] [--operations N]
+"""
+import argparse
+import contextlib
+import io
+import random
+
+from benchmarks.common import fill_catalogue, open_store, summarize, temp_db_path, time_calls
+from database.queries import Queries
+
+
+def business_operation(queries, product_id):
+    queries.checkout_for_trial("Bench Customer", "0700000000", product_id)
+    queries.update_product_stock(product_id, -1)
+    queries.create_transaction(25.0, "Cash", 1, [(product_id, 1, 25.0)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--operations", type=int, default=500)
+    args = parser.parse_args()
+
+    db = open_store(temp_db_path("unit_of_work"))
+    fill_catalogue(db, products=args.products, transactions=0)
+    with db.lock:
+        db.conn.execute("UPDATE products SET stock_quantity = stock_quantity + 100000")
+        db.conn.commit()
+    product_ids = [row[0] for row in db.conn.execute("SELECT id FROM products")]
+    queries = Queries(db)
+    rng = random.Random(5)
+
+    def autocommit():
+        business_operation(queries, rng.choice(product_ids))
+
+    def unit_of_work():
+        with db.transaction("bench_operation"):
+            business_operation(queries, rng.choice(product_ids))
+
+    print(f"\n{'mode':<14} {'commits/op':>10} {'mean':>9} {'p50':>9} {'p95':>9}   (ms)")
+    for label, func in (("autocommit", autocommit), ("unit_of_work", unit_of_work)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()  # warm-up
+            commits_before = db.commit_count
+            samples = time_calls(func, args.operations)
+        commits = (db.commit_count - commits_before) / args.operations
+        summary = summarize(samples)
+        print(f"{label:<14} {commits:>10.2f} {summary['mean_ms']:>9.3f} "
+              f"{summary['p50_ms']:>9.3f} {summary['p95_ms']:>9.3f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+The benchmarks only need the database layer, so they run without Kivy.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from database.db_handler import DatabaseHandler
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (pct in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms):
+    """Returns mean/p50/p95/p99 of a list of millisecond samples."""
+    return {
+        "n": len(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms) if samples_ms else 0.0,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+    }
+
+
+def time_calls(func, repeat):
+    """Calls func() `repeat` times and returns the per-call latencies in ms."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def temp_db_path(label):
+    """Returns a fresh database path in the temp directory (removes leftovers)."""
+    path = os.path.join(tempfile.gettempdir(), f"store_bench_{label}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return path
+
+
+def open_store(path, pragmas=None):
+    """Opens a DatabaseHandler on path with the schema migrated."""
+    db = DatabaseHandler(path, pragmas=pragmas)
+    db.setup_database()
+    return db
+
+
+def fill_catalogue(db, products=20000, transactions=20000, seed=7):
+    """
+    Bulk-loads a deterministic, device-sized catalogue and sales history
+    directly through the connection (bypassing per-row commits).
+    """
+    rng = random.Random(seed)
+    conn = db.conn
+    with db.lock:
+        conn.executemany(
+            "INSERT OR IGNORE INTO products "
+            "(vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (rng.randint(1, 2), f"Bench Item {i}", f"BN-{i:07d}",
+                 10.0, 25.0, rng.randint(0, 50), rng.choice("SMLX"), rng.choice(("Red", "Blue", "Black")))
+                for i in range(products)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO transactions (total_amount, payment_method, user_id) VALUES (?, ?, 1)",
+            ((round(rng.uniform(5, 500), 2), rng.choice(("Cash", "Card"))) for _ in range(transactions)),
+        )
+        conn.commit()
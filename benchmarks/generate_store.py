@@ -0,0 +1,226 @@
+"""
+Deterministic synthetic store database for performance work.
+
+Builds a migrated store database with the requested number of vendors,
+products, cashiers, customers, transactions (and their line items) and
+trial ledger entries. The same arguments and seed always produce the same
+data; sale and trial timestamps are spread over --days ending at --end-date.
+
+Rows are bulk-loaded with executemany inside one transaction, then the
+daily_sales / vendor_daily_sales rollups and store_stats are rebuilt through
+Queries, exactly like the maintenance commands do.
+
+Usage:
+    python -m benchmarks.generate_store --out /tmp/store_large.db \\
+        --vendors 200 --products 50000 --transactions 250000 --items-per-transaction 4
+"""
+import argparse
+import datetime
+import os
+import random
+import time
+
+from database.db_handler import DatabaseHandler
+from database.queries import Queries
+
+SIZES = ("XS", "S", "M", "L", "XL", "XXL", "28", "30", "32", "34", "36")
+COLORS = ("Black", "White", "Navy", "Blue", "Red", "Green", "Grey", "Beige", "Olive", "Pink")
+GARMENTS = ("T-Shirt", "Hoodie", "Jeans", "Chinos", "Polo", "Jacket", "Dress", "Skirt",
+            "Sweater", "Shorts", "Blazer", "Cardigan", "Shirt", "Joggers", "Coat")
+STYLES = ("Slim Fit", "Relaxed", "Classic", "Oversized", "Cropped", "Vintage", "Linen",
+          "Cotton", "Denim", "Wool", "Stretch", "Organic")
+PAYMENT_METHODS = ("Cash", "Card", "Mobile")
+TRIAL_STATUSES = ("On_Trial", "Returned", "Purchased")
+
+# Share of sales recorded against a customer
+CUSTOMER_SALE_SHARE = 0.15
+
+# Rows per executemany batch while loading
+BATCH_SIZE = 20000
+
+# Mid-size defaults; scale up with the flags (1M items = e.g. 250k x 4).
+DEFAULTS = {
+    "vendors": 50,
+    "products": 20000,
+    "users": 5,
+    "transactions": 50000,
+    "items_per_transaction": 3,
+    "trials": 5000,
+    "days": 365,
+}
+
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _timestamps(rng, count, end_date, days):
+    """count sorted 'YYYY-MM-DD HH:MM:SS' strings within store hours over the last `days` days."""
+    start = datetime.datetime.combine(end_date - datetime.timedelta(days=days - 1), datetime.time(9))
+    stamps = []
+    for _ in range(count):
+        moment = start + datetime.timedelta(days=rng.randrange(days), seconds=rng.randrange(12 * 3600))
+        stamps.append(moment.strftime("%Y-%m-%d %H:%M:%S"))
+    stamps.sort()
+    return stamps
+
+
+def generate_store(path, vendors=50, products=20000, users=5, transactions=50000,
+                   items_per_transaction=3, trials=5000, days=365, end_date=None, seed=42):
+    """
+    Creates (or replaces) the database at path and fills it.
+    Returns a dict of row counts and the build time.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    end_date = end_date or datetime.date(2025, 12, 31)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    db = DatabaseHandler(path)
+    db.setup_database()
+    conn = db.conn
+
+    with db.lock:
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO vendors (name, contact_person, phone) VALUES (?, ?, ?)",
+            ((f"Supplier {i:04d}", f"Contact {i:04d}", f"555-{i:07d}") for i in range(1, vendors + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, 'cashier')",
+            ((f"cashier{i}", f"pass{i}") for i in range(1, users + 1)),
+        )
+        vendor_ids = [row[0] for row in conn.execute("SELECT id FROM vendors")]
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users")]
+
+        def product_rows():
+            for i in range(products):
+                buy = round(rng.uniform(4, 80), 2)
+                yield (
+                    rng.choice(vendor_ids),
+                    f"{rng.choice(STYLES)} {rng.choice(GARMENTS)} {i:06d}",
+                    f"SKU-{i:08d}",
+                    buy,
+                    round(buy * rng.uniform(1.4, 2.6), 2),
+                    rng.randint(0, 60),
+                    rng.choice(SIZES),
+                    rng.choice(COLORS),
+                )
+
+        for batch in _batched(product_rows()):
+            conn.executemany(
+                "INSERT INTO products (vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+        catalogue = conn.execute("SELECT id, sell_price FROM products").fetchall()
+
+        customers = max(1, trials // 3)
+        conn.executemany(
+            "INSERT INTO customers (id, name, phone) VALUES (?, ?, ?)",
+            ((customer + 1, f"Customer {customer:05d}", f"07{customer:08d}") for customer in range(customers)),
+        )
+
+        # Transactions: header rows first, then their line items by rowid
+        first_id = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]) + 1
+        items_total = 0
+        stamps = _timestamps(rng, transactions, end_date, days)
+        for offset in range(0, transactions, BATCH_SIZE):
+            headers = []
+            lines = []
+            for number in range(offset, min(offset + BATCH_SIZE, transactions)):
+                transaction_id = first_id + number
+                count = max(1, int(rng.expovariate(1.0 / items_per_transaction) + 0.5))
+                total = 0.0
+                for product_id, price in rng.sample(catalogue, min(count, len(catalogue))):
+                    quantity = 1 if rng.random() < 0.85 else rng.randint(2, 4)
+                    lines.append((transaction_id, product_id, quantity, price))
+                    total += quantity * price
+                # Some sales are made to known (trial) customers
+                customer_id = rng.randrange(customers) + 1 if rng.random() < CUSTOMER_SALE_SHARE else None
+                headers.append((transaction_id, stamps[number], round(total, 2),
+                                rng.choice(PAYMENT_METHODS), rng.choice(user_ids), customer_id))
+            conn.executemany(
+                "INSERT INTO transactions (id, timestamp, total_amount, payment_method, user_id, customer_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                headers,
+            )
+            conn.executemany(
+                "INSERT INTO transaction_items (transaction_id, product_id, quantity, price_at_sale) "
+                "VALUES (?, ?, ?, ?)",
+                lines,
+            )
+            items_total += len(lines)
+
+        def trial_rows():
+            for stamp in _timestamps(rng, trials, end_date, days):
+                customer = rng.randrange(customers)
+                status = "On_Trial" if rng.random() < 0.2 else rng.choice(TRIAL_STATUSES[1:])
+                yield (f"Customer {customer:05d}", f"07{customer:08d}", customer + 1,
+                       rng.choice(catalogue)[0], stamp, status)
+
+        for batch in _batched(trial_rows()):
+            conn.executemany(
+                "INSERT INTO trial_ledger (customer_name, customer_phone, customer_id, product_id, date_taken, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+        conn.commit()
+
+    queries = Queries(db)
+    queries.rebuild_daily_sales()
+    queries.rebuild_vendor_sales()
+    queries.rebuild_store_stats()
+    with db.lock:
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close()
+
+    summary = {
+        "path": path,
+        "vendors": vendors,
+        "products": products,
+        "users": users,
+        "transactions": transactions,
+        "transaction_items": items_total,
+        "trials": trials,
+        "customers": customers,
+        "seed": seed,
+        "build_s": round(time.perf_counter() - started, 2),
+    }
+    print(f"[DB] Generated store: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Path of the database to create (replaced if present)")
+    for name, default in DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=int, default=default)
+    parser.add_argument("--end-date", default="2025-12-31",
+                        help="Last sales day, YYYY-MM-DD or 'today' (default keeps runs reproducible)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.end_date == "today":
+        end_date = datetime.date.today()
+    else:
+        end_date = datetime.date.fromisoformat(args.end_date)
+    generate_store(
+        args.out, vendors=args.vendors, products=args.products, users=args.users,
+        transactions=args.transactions, items_per_transaction=args.items_per_transaction,
+        trials=args.trials, days=args.days, end_date=end_date, seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,48 @@
 # config.py module
+
+# --- SQLite connection profile ---
+# Applied by DatabaseHandler right after connecting, in this order.
+# Set a value to None to leave SQLite's default in place.
+DB_PRAGMAS = {
+    # Write-ahead log: readers never block the writer and commits append to the
+    # WAL instead of rewriting pages through a rollback journal.
+    "journal_mode": "WAL",
+    # In WAL mode NORMAL only fsyncs at checkpoints; a crash can lose the last
+    # commits but never corrupts the database.
+    "synchronous": "NORMAL",
+    # Memory-map up to 64 MiB of the database file for reads.
+    "mmap_size": 64 * 1024 * 1024,
+    # Negative value = size in KiB (here 8 MiB of page cache).
+    "cache_size": -8000,
+    "temp_store": "MEMORY",
+    # Wait up to 5 s for a lock instead of failing with "database is locked".
+    "busy_timeout": 5000,
+}
+
+# --- Scanning path ---
+# Maximum number of products kept in the in-memory SKU cache (LRU).
+SKU_CACHE_SIZE = 5000
+
+# --- Dashboard ---
+# Products with stock at or below this level count as "low stock".
+LOW_STOCK_THRESHOLD = 3
+
+# --- Overdue trials (Queries.scan_overdue_trials / database/overdue_scanner.py) ---
+# Open trials older than this many days count as overdue.
+TRIAL_OVERDUE_DAYS = 7
+# Seconds between background scans while the app runs.
+OVERDUE_SCAN_INTERVAL = 300
+# Ledger rows examined per unit of work during a scan.
+OVERDUE_SCAN_BATCH = 500
+
+# Compiled statements kept per connection by sqlite3 (Python's default is 128).
+# Covers every registered statement plus the dynamic listing/report variants.
+DB_STATEMENT_CACHE_SIZE = 256
+
+# --- Query instrumentation (database/instrumentation.py) ---
+# Off by default: the handler then only pays one attribute check per statement.
+DB_STATS_ENABLED = False
+# Statements at least this slow (ms) are kept in the slow-query log.
+DB_SLOW_QUERY_MS = 50
+# Number of slow statements kept (oldest are dropped first).
+DB_SLOW_QUERY_LOG_SIZE = 100
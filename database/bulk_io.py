@@ -0,0 +1,288 @@
+"""
+Streaming bulk import and export of products and vendors (CSV or JSONL).
+
+Imports read the file one batch at a time, validate every record through
+Product.from_record() / Vendor.from_record() and upsert the valid ones
+(products on sku, vendors on name) with one executemany per batch. Each
+batch is its own unit of work (DatabaseHandler.transaction()), so memory is
+bounded by the batch size and a 100k-row catalogue costs a few dozen
+commits instead of one per row. Rows whose values did not change are left
+alone, so re-running an import does not churn the FTS index or triggers.
+
+Invalid records are skipped and reported (line number and reason). If a batch
+fails in SQLite it is rolled back as a whole and the import stops; earlier
+batches stay committed, and since the upserts are idempotent the same file
+can simply be imported again.
+
+Exports page through the table by id and write as they go.
+
+The format follows the file extension (.csv, .jsonl or .ndjson) unless given.
+Product records name their vendor with a `vendor` (name) or `vendor_id` column;
+exports include both so a file can move between databases.
+"""
+import csv
+import json
+import os
+import sqlite3
+import time
+
+from database.db_handler import ROW_TUPLE
+from database.statements import ALL, NONE, READ, WRITE, StatementRegistry
+from models.product import Product
+from models.vendor import Vendor
+
+CSV = 'csv'
+JSONL = 'jsonl'
+FORMATS_BY_EXTENSION = {'.csv': CSV, '.jsonl': JSONL, '.ndjson': JSONL}
+
+# Records per executemany / unit of work on import, and rows per export page
+BATCH_SIZE = 5000
+
+# Invalid records listed in the report (the rest are only counted)
+MAX_REPORTED_ERRORS = 50
+
+PRODUCT_EXPORT_COLUMNS = ('id', 'sku', 'name', 'vendor_id', 'vendor', 'buy_price', 'sell_price',
+                          'stock_quantity', 'size', 'color')
+VENDOR_EXPORT_COLUMNS = ('id', 'name', 'contact_person', 'phone')
+
+BULK_STATEMENTS = StatementRegistry()
+
+# Parameter order follows Product.to_tuple()
+UPSERT_PRODUCT = BULK_STATEMENTS.register(
+    "upsert_product",
+    """
+    INSERT INTO products (vendor_id, name, sku, size, color, buy_price, sell_price, stock_quantity)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(sku) DO UPDATE SET
+        vendor_id = COALESCE(excluded.vendor_id, products.vendor_id),
+        name = excluded.name,
+        size = excluded.size,
+        color = excluded.color,
+        buy_price = excluded.buy_price,
+        sell_price = excluded.sell_price,
+        stock_quantity = excluded.stock_quantity
+    WHERE (COALESCE(excluded.vendor_id, products.vendor_id), excluded.name, excluded.size, excluded.color,
+           excluded.buy_price, excluded.sell_price, excluded.stock_quantity)
+       IS NOT (products.vendor_id, products.name, products.size, products.color,
+               products.buy_price, products.sell_price, products.stock_quantity)
+    """,
+    WRITE, NONE)
+
+UPSERT_VENDOR = BULK_STATEMENTS.register(
+    "upsert_vendor",
+    """
+    INSERT INTO vendors (name, contact_person, phone)
+    VALUES (?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        contact_person = COALESCE(excluded.contact_person, vendors.contact_person),
+        phone = COALESCE(excluded.phone, vendors.phone)
+    WHERE (COALESCE(excluded.contact_person, vendors.contact_person), COALESCE(excluded.phone, vendors.phone))
+       IS NOT (vendors.contact_person, vendors.phone)
+    """,
+    WRITE, NONE)
+
+VENDOR_KEYS = BULK_STATEMENTS.register(
+    "vendor_keys",
+    "SELECT id, name FROM vendors",
+    READ, ALL)
+
+EXPORT_PRODUCTS_PAGE = BULK_STATEMENTS.register(
+    "export_products_page",
+    """
+    SELECT p.id, p.sku, p.name, p.vendor_id, v.name, p.buy_price, p.sell_price,
+           p.stock_quantity, p.size, p.color
+    FROM products p
+    LEFT JOIN vendors v ON v.id = p.vendor_id
+    WHERE p.id > ?
+    ORDER BY p.id
+    LIMIT ?
+    """,
+    READ, ALL)
+
+EXPORT_VENDORS_PAGE = BULK_STATEMENTS.register(
+    "export_vendors_page",
+    "SELECT id, name, contact_person, phone FROM vendors WHERE id > ? ORDER BY id LIMIT ?",
+    READ, ALL)
+
+
+def detect_format(path, fmt=None):
+    """Returns CSV or JSONL for path (fmt overrides the extension)."""
+    fmt = fmt or FORMATS_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+    if fmt not in (CSV, JSONL):
+        raise ValueError(f"Cannot tell the format of {path}; use .csv or .jsonl (or pass fmt)")
+    return fmt
+
+
+def _read_records(path, fmt):
+    """
+    Yields (line number, record) without loading the file. CSV records are
+    dicts; JSONL records are the raw line, decoded by _decode().
+    """
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        if fmt == CSV:
+            reader = csv.DictReader(handle)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for number, line in enumerate(handle, 1):
+                if line.strip():
+                    yield number, line
+
+
+def _decode(raw):
+    if not isinstance(raw, str):
+        return raw
+    try:
+        record = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(record, dict):
+        raise ValueError("JSON line is not an object")
+    return record
+
+
+def _new_report(path, fmt):
+    return {
+        'path': path,
+        'format': fmt,
+        'read': 0,
+        'written': 0,     # rows inserted or changed
+        'unchanged': 0,   # valid rows that matched the database already
+        'rejected': 0,
+        'errors': [],
+        'failed': False,
+        'elapsed_s': 0.0,
+    }
+
+
+def _import(db, path, fmt, label, statement, build_row, batch_size, progress, after_batch=None):
+    """Shared import loop: validate, batch, executemany, one unit of work per batch."""
+    fmt = detect_format(path, fmt)
+    report = _new_report(path, fmt)
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        with db.transaction(label) as cursor:
+            cursor.executemany(statement.sql, batch)
+            changed = max(cursor.rowcount, 0)
+            if after_batch is not None:
+                db.after_commit(after_batch)
+        report['written'] += changed
+        report['unchanged'] += len(batch) - changed
+        batch.clear()
+        report['elapsed_s'] = round(time.perf_counter() - started, 3)
+        if progress is not None:
+            progress(report)
+
+    try:
+        for number, raw in _read_records(path, fmt):
+            report['read'] += 1
+            try:
+                batch.append(build_row(_decode(raw)))
+            except ValueError as e:
+                report['rejected'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append(f"line {number}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except sqlite3.Error as e:
+        report['failed'] = True
+        print(f"[DB ERROR] {label} stopped after {report['written'] + report['unchanged']} rows "
+              f"(current batch rolled back): {e}")
+    report['elapsed_s'] = round(time.perf_counter() - started, 3)
+    print(f"[DB] {label}: {report['read']} read, {report['written']} written, "
+          f"{report['unchanged']} unchanged, {report['rejected']} rejected in {report['elapsed_s']} s")
+    return report
+
+
+def import_products(queries, path, fmt=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Upserts products from a CSV/JSONL file (keyed on sku) and returns the
+    import report. Vendors must already exist; a record naming an unknown
+    vendor is rejected. The SKU cache is cleared after every committed batch.
+
+    :param queries: Queries instance (its database and SKU cache are used).
+    :param progress: Optional callable receiving the report after each batch.
+    """
+    db = queries.db
+    vendors = db.run(VENDOR_KEYS, row_format=ROW_TUPLE) or []
+    vendor_by_name = {name: vendor_id for vendor_id, name in vendors}
+    vendor_ids = set(vendor_by_name.values())
+
+    def build_row(record):
+        vendor_name = str(record.get('vendor') or record.get('vendor_name') or '').strip()
+        raw_id = record.get('vendor_id')
+        if vendor_name:
+            vendor_id = vendor_by_name.get(vendor_name)
+            if vendor_id is None:
+                raise ValueError(f"unknown vendor {vendor_name!r}")
+        elif raw_id not in (None, ''):
+            try:
+                vendor_id = int(raw_id)
+            except (TypeError, ValueError):
+                raise ValueError(f"vendor_id is not a valid int: {raw_id!r}") from None
+            if vendor_id not in vendor_ids:
+                raise ValueError(f"unknown vendor_id {vendor_id}")
+        else:
+            vendor_id = None
+        return Product.from_record(record, vendor_id).to_tuple()
+
+    return _import(db, path, fmt, 'import_products', UPSERT_PRODUCT, build_row,
+                   batch_size, progress, after_batch=queries.sku_cache.clear)
+
+
+def import_vendors(queries, path, fmt=None, batch_size=BATCH_SIZE, progress=None):
+    """Upserts vendors from a CSV/JSONL file (keyed on name); returns the import report."""
+    def build_row(record):
+        vendor = Vendor.from_record(record)
+        return vendor.to_tuple() + (vendor.phone,)
+
+    return _import(queries.db, path, fmt, 'import_vendors', UPSERT_VENDOR, build_row, batch_size, progress)
+
+
+def _export(db, path, fmt, label, statement, columns, page_size, progress):
+    """Shared export loop: keyset pages by id, written as they arrive."""
+    fmt = detect_format(path, fmt)
+    started = time.perf_counter()
+    report = {'path': path, 'format': fmt, 'written': 0, 'failed': False, 'elapsed_s': 0.0}
+    after = 0
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = None
+        if fmt == CSV:
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+        while True:
+            rows = db.run(statement, (after, page_size), row_format=ROW_TUPLE)
+            if rows is None:
+                report['failed'] = True
+                break
+            if not rows:
+                break
+            if writer is not None:
+                writer.writerows(rows)
+            else:
+                handle.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+            report['written'] += len(rows)
+            after = rows[-1][0]
+            if progress is not None:
+                report['elapsed_s'] = round(time.perf_counter() - started, 3)
+                progress(report)
+    report['elapsed_s'] = round(time.perf_counter() - started, 3)
+    print(f"[DB] {label}: {report['written']} rows written to {path} in {report['elapsed_s']} s")
+    return report
+
+
+def export_products(queries, path, fmt=None, page_size=BATCH_SIZE, progress=None):
+    """Writes every product (with its vendor name) to a CSV/JSONL file; returns the export report."""
+    return _export(queries.db, path, fmt, 'export_products', EXPORT_PRODUCTS_PAGE,
+                   PRODUCT_EXPORT_COLUMNS, page_size, progress)
+
+
+def export_vendors(queries, path, fmt=None, page_size=BATCH_SIZE, progress=None):
+    """Writes every vendor to a CSV/JSONL file; returns the export report."""
+    return _export(queries.db, path, fmt, 'export_vendors', EXPORT_VENDORS_PAGE,
+                   VENDOR_EXPORT_COLUMNS, page_size, progress)
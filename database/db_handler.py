@@ -1,208 +1,389 @@
+import contextlib
 import sqlite3
 import os
+import threading
+import time
+
+import config
+from database.db_worker import DatabaseWorker
+from database.instrumentation import QueryStats, TimedCursor, TimedLock
+from database.statements import ALL, ONE, SCALAR
+from database.migrations import apply_migrations, get_schema_version
+
+# Row formats accepted by execute_query()/run(). Any class with a
+# from_rows(columns, rows) classmethod (see models/) can be passed instead.
+ROW_TUPLE = 'tuple'  # plain tuples, cheapest to build and hold
+ROW_SQLITE = 'row'   # sqlite3.Row (index by position or column name)
+ROW_DICT = 'dict'    # one dict per row (the default)
+
 
 class DatabaseHandler:
     """
     Handles connection, execution, and closing of the SQLite database.
     """
-    def __init__(self, db_path):
+    def __init__(self, db_path, pragmas=None):
+        """
+        :param db_path: Path of the SQLite file (or ':memory:').
+        :param pragmas: Connection profile {pragma: value}; defaults to config.DB_PRAGMAS.
+        """
         self.db_path = db_path
+        self.pragmas = dict(config.DB_PRAGMAS if pragmas is None else pragmas)
         self.conn = None
         self.cursor = None
+        self.tuple_cursor = None
+        # Serializes all use of the shared connection/cursor between the UI
+        # thread and the background worker.
+        self.lock = threading.RLock()
+        self.worker = None
+        self.schema_version = None
+        self.last_setup_ms = None
+        # Statement statistics (database/instrumentation.py); None = disabled
+        self.stats = None
+        self.error_count = 0
+        # Commits issued through this handler (autocommits and units of work)
+        self.commit_count = 0
+        # Unit-of-work nesting depth and callbacks waiting for the outer commit
+        self._tx_depth = 0
+        self._after_commit = []
+        if config.DB_STATS_ENABLED:
+            self.enable_stats()
         self._connect()
 
     def _connect(self):
         """Establishes the connection and cursor."""
         try:
             # Set the thread check to False for Kivy usage (not strictly necessary but safer)
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn = sqlite3.connect(
+                self.db_path, check_same_thread=False,
+                cached_statements=config.DB_STATEMENT_CACHE_SIZE
+            )
             self.conn.row_factory = sqlite3.Row # Use Row factory for dictionary-like access
             self.cursor = self.conn.cursor()
+            # Same connection, but rows come back as plain tuples
+            self.tuple_cursor = self.conn.cursor()
+            self.tuple_cursor.row_factory = None
+            self._apply_pragmas()
             print(f"[DB] Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             print(f"[DB ERROR] Connection failed: {e}")
 
+    def _apply_pragmas(self):
+        """Applies the connection tuning profile (self.pragmas)."""
+        for name, value in self.pragmas.items():
+            if value is None:
+                continue
+            try:
+                # PRAGMA values cannot be bound as parameters; they come from config.
+                self.conn.execute(f"PRAGMA {name} = {value}").fetchall()
+            except sqlite3.Error as e:
+                print(f"[DB ERROR] Could not apply PRAGMA {name}={value}: {e}")
+
+    def get_pragmas(self):
+        """
+        Reads back the active value of every pragma in the profile.
+        Useful to verify e.g. that WAL was actually enabled (it is not for ':memory:').
+        """
+        active = {}
+        with self.lock:
+            for name in self.pragmas:
+                row = self.conn.execute(f"PRAGMA {name}").fetchone()
+                active[name] = row[0] if row else None
+        return active
+
     def close(self):
-        """Closes the connection."""
+        """Stops the background worker and closes the connection."""
+        if self.worker:
+            self.worker.shutdown(wait=True)
+            self.worker = None
         if self.conn:
             self.conn.close()
+
+    def enable_stats(self, slow_threshold_ms=None, slow_log_size=None):
+        """Starts recording per-statement statistics; returns the QueryStats."""
+        self.stats = QueryStats(
+            slow_threshold_ms=config.DB_SLOW_QUERY_MS if slow_threshold_ms is None else slow_threshold_ms,
+            slow_log_size=config.DB_SLOW_QUERY_LOG_SIZE if slow_log_size is None else slow_log_size,
+        )
+        return self.stats
+
+    def disable_stats(self):
+        """Stops recording; returns the QueryStats collected so far (or None)."""
+        stats, self.stats = self.stats, None
+        return stats
+
+    def locked(self, key):
+        """
+        The handler lock as a context manager for code that runs several
+        statements itself; with stats enabled the wait is recorded under key.
+        """
+        if self.stats is None:
+            return self.lock
+        return TimedLock(self.lock, self.stats, key)
+
+    def timed_cursor(self):
+        """The shared cursor, wrapped so its statements are recorded when stats are enabled."""
+        if self.stats is None:
+            return self.cursor
+        return TimedCursor(self.cursor, self.stats)
+
+    def _commit(self):
+        """Commits the connection and counts it; caller must hold self.lock."""
+        self.conn.commit()
+        self.commit_count += 1
+        if self.stats is not None:
+            self.stats.record_commit()
+
+    @property
+    def in_unit_of_work(self):
+        return self._tx_depth > 0
+
+    @contextlib.contextmanager
+    def transaction(self, label='transaction'):
+        """
+        Unit of work: every statement run inside the block (through the yielded
+        cursor, execute_query() or run(), including nested Queries calls)
+        commits together, once, when the outermost block exits normally. Any
+        exception rolls the block back and propagates.
+
+        Nested blocks become savepoints, so an inner block can fail and be
+        rolled back without discarding the outer one. The handler lock is held
+        for the whole block. label names the operation in the query stats,
+        which count commits per operation.
+
+            with db.transaction('trial_checkout'):
+                queries.checkout_for_trial(...)
+                queries.update_product_stock(product_id, -1)
+        """
+        with self.locked(label):
+            cursor = self.timed_cursor()
+            depth = self._tx_depth
+            pending_callbacks = len(self._after_commit)
+            if depth == 0:
+                started = time.perf_counter()
+                commits_before = self.commit_count
+                # Take the write lock up front so reads and writes in the block agree
+                if not self.conn.in_transaction:
+                    cursor.execute("BEGIN IMMEDIATE")
+            else:
+                savepoint = f"unit_of_work_{depth}"
+                cursor.execute(f"SAVEPOINT {savepoint}")
+            self._tx_depth += 1
+            try:
+                yield cursor
+            except BaseException:
+                self._tx_depth -= 1
+                if depth == 0:
+                    self.conn.rollback()
+                    self._after_commit.clear()
+                    if self.stats is not None:
+                        self.stats.record_operation(
+                            label, (time.perf_counter() - started) * 1000.0,
+                            self.commit_count - commits_before, ok=False
+                        )
+                else:
+                    cursor.execute(f"ROLLBACK TO {savepoint}")
+                    cursor.execute(f"RELEASE {savepoint}")
+                    del self._after_commit[pending_callbacks:]
+                raise
+            self._tx_depth -= 1
+            if depth > 0:
+                cursor.execute(f"RELEASE {savepoint}")
+                return
+            self._commit()
+            callbacks, self._after_commit = self._after_commit, []
+            if self.stats is not None:
+                self.stats.record_operation(
+                    label, (time.perf_counter() - started) * 1000.0, self.commit_count - commits_before
+                )
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback):
+        """
+        Runs callback() once the current unit of work has committed (dropped if
+        it rolls back), or immediately when no unit of work is active. Used for
+        in-memory state such as the SKU cache that must not run ahead of the DB.
+        """
+        if self._tx_depth == 0:
+            callback()
+        else:
+            self._after_commit.append(callback)
+
+    def start_worker(self):
+        """Starts the background DB worker thread (idempotent)."""
+        if self.worker is None:
+            self.worker = DatabaseWorker()
+        return self.worker
+
+    def run_async(self, func, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Runs func(*args, **kwargs) on the background DB worker.
+        callback/error_callback are invoked on the Kivy main thread.
+        Returns a concurrent.futures.Future.
+        """
+        return self.start_worker().submit(
+            func, *args, callback=callback, error_callback=error_callback, **kwargs
+        )
             
-    def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
-        """Executes a query and optionally fetches results."""
+    def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False,
+                      row_format=ROW_DICT):
+        """
+        Executes a query and optionally fetches results.
+        row_format selects how fetched rows are returned (ROW_DICT by default).
+        """
         if not self.conn:
             print("[DB ERROR] Database not connected.")
             return None
 
+        if self.stats is not None:
+            return self._instrumented(
+                self.stats.key_for(query), params, self._cursor_for(row_format),
+                self._execute_locked, query, params, fetch_one, fetch_all, row_format
+            )
+        with self.lock:
+            return self._execute_locked(query, params, fetch_one, fetch_all, row_format)
+
+    def _instrumented(self, key, params, cursor, func, *args):
+        """Runs func(*args) under the lock and records it in self.stats."""
+        stats = self.stats
+        started = time.perf_counter()
+        with self.lock:
+            acquired = time.perf_counter()
+            errors = self.error_count
+            try:
+                result = func(*args)
+            except sqlite3.Error:
+                # Raised inside a unit of work (see _failed)
+                stats.record(key, (time.perf_counter() - acquired) * 1000.0,
+                             lock_wait_ms=(acquired - started) * 1000.0, error=True, params=params)
+                raise
+            finished = time.perf_counter()
+            failed = self.error_count != errors
+            rowcount = cursor.rowcount
+        if isinstance(result, list):
+            rows = len(result)
+        elif result is True or result is None:
+            rows = max(rowcount, 0)
+        else:
+            rows = 1
+        stats.record(
+            key, (finished - acquired) * 1000.0, rows=rows,
+            lock_wait_ms=(acquired - started) * 1000.0, error=failed, params=params
+        )
+        return result
+
+    def _cursor_for(self, row_format):
+        """Dicts are built from sqlite3.Row; everything else starts from tuples."""
+        if row_format == ROW_DICT or row_format == ROW_SQLITE:
+            return self.cursor
+        return self.tuple_cursor
+
+    def _materialize(self, cursor, rows, row_format):
+        """Converts fetched rows to row_format."""
+        if row_format == ROW_DICT:
+            return [dict(row) for row in rows]
+        if row_format == ROW_SQLITE or row_format == ROW_TUPLE:
+            return rows
+        return row_format.from_rows([column[0] for column in cursor.description], rows)
+
+    def _execute_locked(self, query, params, fetch_one, fetch_all, row_format=ROW_DICT):
+        """Body of execute_query; caller must hold self.lock."""
         try:
+            cursor = self._cursor_for(row_format)
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
+                cursor.execute(query)
             
-            # Auto-commit for DML statements
-            if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
-                self.conn.commit()
+            # Auto-commit for DML statements (a unit of work commits once at its end)
+            if not self._tx_depth and query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                self._commit()
             
             if fetch_one:
-                # Return result as dict for consistency
-                result = self.cursor.fetchone()
-                return dict(result) if result else None
+                result = cursor.fetchone()
+                return self._materialize(cursor, [result], row_format)[0] if result else None
             elif fetch_all:
-                # Return results as list of dicts
-                results = self.cursor.fetchall()
-                return [dict(row) for row in results]
+                return self._materialize(cursor, cursor.fetchall(), row_format)
             else:
                 return True
         except sqlite3.Error as e:
-            # Important: Rollback if an error occurs during an uncommitted transaction
-            if self.conn:
-                self.conn.rollback()
             print(f"[DB ERROR] Query failed: {e}\nQuery: {query}\nParams: {params}")
+            self._failed()
+            return None
+
+    def run(self, statement, params=(), row_format=ROW_DICT):
+        """
+        Lean execution path for a registered Statement (see database/statements.py).
+        The commit decision and result shape were fixed at registration, so no
+        SQL string inspection happens per call.
+        Returns the shaped result (rows in row_format), or None on error.
+        """
+        if self.stats is not None:
+            return self._instrumented(
+                statement.name, params, self._cursor_for(row_format),
+                self._run_locked, statement, params, row_format
+            )
+        with self.lock:
+            return self._run_locked(statement, params, row_format)
+
+    def _run_locked(self, statement, params, row_format):
+        """Body of run(); caller must hold self.lock."""
+        try:
+            cursor = self._cursor_for(row_format)
+            cursor.execute(statement.sql, params)
+            if statement.is_write and not self._tx_depth:
+                self._commit()
+            shape = statement.shape
+            if shape == ALL:
+                if row_format == ROW_DICT:
+                    return [dict(row) for row in cursor.fetchall()]
+                return self._materialize(cursor, cursor.fetchall(), row_format)
+            if shape == ONE:
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                if row_format == ROW_DICT:
+                    return dict(row)
+                return self._materialize(cursor, [row], row_format)[0]
+            if shape == SCALAR:
+                row = cursor.fetchone()
+                return row[0] if row else None
+            return True
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Statement {statement.name} failed: {e}\nParams: {params}")
+            self._failed()
             return None
 
+    def _failed(self):
+        """
+        Error handling shared by execute_query() and run(); called from their
+        except blocks. Outside a unit of work the statement is rolled back and
+        the caller gets None. Inside one, the error is re-raised so the whole
+        unit rolls back instead of committing partial work later.
+        """
+        self.error_count += 1
+        if self._tx_depth:
+            raise
+        if self.conn:
+            self.conn.rollback()
+
     def setup_database(self):
-        """Creates all necessary tables and ensures default data exists."""
-        # Fix 4: Changed to CREATE IF NOT EXISTS to prevent destructive drops
-        self._create_users_table()
-        self._create_products_table()
-        self._create_vendors_table()
-        self._create_transactions_table()
-        self._create_transaction_items_table()
-        self._create_trial_ledger_table()
-        
-        self._ensure_admin_user()
-        self._ensure_sample_vendors()
-        self._ensure_sample_products()
-
-    def _create_users_table(self):
-        """
-        Creates the 'users' table if it does not exist.
-        (Fix 4 implemented here: using IF NOT EXISTS).
-        """
-        self.execute_query("DROP TABLE IF EXISTS users")
-        create_table_query = """
-        CREATE TABLE users (
-            id INTEGER PRIMARY KEY,
-            username TEXT NOT NULL UNIQUE,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _ensure_admin_user(self):
-        """Ensures the default 'admin' user exists."""
-        default_username = 'admin'
-        default_password = 'adminpass' 
-        
-        check_query = "SELECT id FROM users WHERE username = ?"
-        user_exists = self.execute_query(check_query, (default_username,), fetch_one=True)
-        
-        if not user_exists:
-            insert_query = "INSERT INTO users (username, password, role) VALUES (?, ?, ?)"
-            self.execute_query(insert_query, (default_username, default_password, 'admin'))
-            print(f"[DB] Inserting default admin user ({default_username}/{default_password}).")
-            
-    def _create_products_table(self):
-        self.execute_query("DROP TABLE IF EXISTS products")
-        create_table_query = """
-        CREATE TABLE products (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            vendor_id INTEGER,
-            sku TEXT UNIQUE,
-            buy_price REAL NOT NULL,
-            sell_price REAL NOT NULL,
-            stock_quantity INTEGER NOT NULL,
-            size TEXT,
-            color TEXT,
-            FOREIGN KEY (vendor_id) REFERENCES vendors(id)
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _create_vendors_table(self):
-        self.execute_query("DROP TABLE IF EXISTS vendors")
-        create_table_query = """
-        CREATE TABLE vendors (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            contact_person TEXT,
-            phone TEXT
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _create_transactions_table(self):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            total_amount REAL NOT NULL,
-            payment_method TEXT,
-            user_id INTEGER,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _create_transaction_items_table(self):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS transaction_items (
-            id INTEGER PRIMARY KEY,
-            transaction_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER NOT NULL,
-            price_at_sale REAL NOT NULL,
-            FOREIGN KEY (transaction_id) REFERENCES transactions(id),
-            FOREIGN KEY (product_id) REFERENCES products(id)
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _create_trial_ledger_table(self):
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS trial_ledger (
-            id INTEGER PRIMARY KEY,
-            customer_name TEXT,
-            customer_phone TEXT,
-            product_id INTEGER NOT NULL,
-            date_taken DATETIME DEFAULT CURRENT_TIMESTAMP,
-            status TEXT NOT NULL, -- 'On_Trial', 'Returned', 'Purchased'
-            FOREIGN KEY (product_id) REFERENCES products(id)
-        );
-        """
-        self.execute_query(create_table_query)
-
-    def _ensure_sample_vendors(self):
-        """Ensures sample vendors exist."""
-        count_query = "SELECT COUNT(id) FROM vendors"
-        result = self.execute_query(count_query, fetch_one=True)
-        count = result['COUNT(id)'] if result and 'COUNT(id)' in result else 0
-        if count == 0:
-            vendors = [
-                ('Vendor A', 'John Doe', '123-456-7890'),
-                ('Vendor B', 'Jane Smith', '098-765-4321'),
-            ]
-            for name, contact_person, phone in vendors:
-                self.execute_query(
-                    "INSERT INTO vendors (name, contact_person, phone) VALUES (?, ?, ?)",
-                    (name, contact_person, phone)
-                )
-            print("[DB] Inserted sample vendors.")
-
-    def _ensure_sample_products(self):
-        """Ensures sample products exist."""
-        products = [
-            (1, 'Blue T-Shirt - M', 'BT-M-101', 10.0, 19.99, 5, 'M', 'Blue'),
-            (2, 'Red Hoodie - L', 'RH-L-102', 30.0, 49.50, 2, 'L', 'Red'),
-            (1, 'Jeans - Size 32', 'JNS-32-103', 50.0, 79.00, 10, '32', 'Blue'),
-        ]
-        for vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color in products:
-            query = """
-            INSERT OR IGNORE INTO products
-            (vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            self.execute_query(query, (vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color))
-        print("[DB] Inserted sample products.")
\ No newline at end of file
+        """
+        Brings the schema up to date through the versioned migrations.
+        On an up-to-date database this is a single PRAGMA user_version read.
+        The elapsed time is kept in self.last_setup_ms for startup diagnostics.
+        """
+        started = time.perf_counter()
+        with self.lock:
+            try:
+                applied = apply_migrations(self.conn)
+            except sqlite3.Error as e:
+                print(f"[DB ERROR] Schema migration failed: {e}")
+                raise
+            self.schema_version = get_schema_version(self.conn)
+        self.last_setup_ms = (time.perf_counter() - started) * 1000.0
+        print(
+            f"[DB] Schema v{self.schema_version} ready in {self.last_setup_ms:.1f} ms "
+            f"({len(applied)} migration(s) applied)."
+        )
+        return applied
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _schedule_on_main_thread(func, *args):
+    """
+    Runs func(*args) on the Kivy main thread via Clock.
+    Falls back to a direct call when Kivy is not available (scripts, benchmarks).
+    """
+    try:
+        from kivy.clock import Clock
+    except ImportError:
+        func(*args)
+        return
+    Clock.schedule_once(lambda dt: func(*args), 0)
+
+
+class DatabaseWorker:
+    """
+    Single background thread that executes database work off the UI thread.
+
+    Every submitted job runs on the same thread, one after the other, so writes
+    are serialized in submission order. Results are returned as
+    concurrent.futures.Future objects; optional callbacks are marshalled back
+    to the Kivy main thread through Clock.
+    """
+    def __init__(self, name="db-worker"):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def submit(self, func, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Queues func(*args, **kwargs) on the worker thread.
+
+        :param callback: Called on the main thread with the result.
+        :param error_callback: Called on the main thread with the exception.
+        :return: Future for the result.
+        """
+        future = self._executor.submit(func, *args, **kwargs)
+        if callback or error_callback:
+            future.add_done_callback(
+                lambda f: self._dispatch(f, callback, error_callback)
+            )
+        return future
+
+    def _dispatch(self, future, callback, error_callback):
+        """Hands the outcome of a finished future to the main thread."""
+        error = future.exception()
+        if error is not None:
+            if error_callback:
+                _schedule_on_main_thread(error_callback, error)
+            else:
+                print(f"[DB ERROR] Background job failed: {error}")
+        elif callback:
+            _schedule_on_main_thread(callback, future.result())
+
+    def shutdown(self, wait=True):
+        """Stops accepting jobs and (optionally) waits for queued ones to finish."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,293 @@
+"""
+Optional per-statement instrumentation for DatabaseHandler.
+
+When DatabaseHandler.stats is None (the default, see config.DB_STATS_ENABLED)
+the handler skips all of this with a single attribute check per call. When
+enabled, every statement run through execute_query(), run() or a
+timed_cursor() is recorded in a QueryStats object:
+
+  * calls, errors, total/max latency and a latency histogram per statement
+  * rows returned (reads) or affected (writes)
+  * time spent waiting for the handler lock
+  * a ring buffer of the most recent statements slower than a threshold
+  * commits, and per unit of work (DatabaseHandler.transaction()) the number
+    of commits it caused, so commits per business operation can be tracked
+
+Statements are keyed by their registered name (database/statements.py) or,
+for dynamic SQL, by the normalised SQL text with repeated placeholder lists
+collapsed so chunked IN/VALUES variants share one entry.
+"""
+import collections
+import json
+import re
+import threading
+import time
+
+from database.statements import name_for_sql
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_VALUES_LIST = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+
+
+def statement_key(sql):
+    """Registered name of sql, or its normalised text."""
+    name = name_for_sql(sql)
+    if name is not None:
+        return name
+    key = _WHITESPACE.sub(" ", sql).strip()
+    key = _PLACEHOLDER_LIST.sub("?...", key)
+    return _VALUES_LIST.sub("(?...), ...", key)
+
+
+class StatementStats:
+    """Counters for one statement key."""
+    __slots__ = ('calls', 'errors', 'rows', 'total_ms', 'max_ms', 'lock_wait_ms', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.lock_wait_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def as_dict(self):
+        histogram = {f"<={bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        histogram[f">{LATENCY_BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 4) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'lock_wait_ms': round(self.lock_wait_ms, 3),
+            'histogram': histogram,
+        }
+
+
+class OperationStats:
+    """Counters for one unit-of-work label."""
+    __slots__ = ('count', 'failures', 'commits', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.commits = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'commits': self.commits,
+            'commits_per_operation': round(self.commits / self.count, 3) if self.count else 0.0,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 4) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class QueryStats:
+    """
+    Thread-safe statement statistics plus a slow-query ring buffer.
+
+    :param slow_threshold_ms: Statements at least this slow go to the slow log.
+    :param slow_log_size: Number of slow statements kept (oldest dropped first).
+    """
+    def __init__(self, slow_threshold_ms=50.0, slow_log_size=100):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._operations = {}
+        self.commits = 0
+        self._keys = {}  # raw sql -> key, so normalisation runs once per distinct text
+        self.slow_log = collections.deque(maxlen=slow_log_size)
+        self.started_at = time.time()
+
+    def key_for(self, sql):
+        key = self._keys.get(sql)
+        if key is None:
+            key = statement_key(sql)
+            if len(self._keys) < 4096:
+                self._keys[sql] = key
+        return key
+
+    def record(self, key, elapsed_ms, rows=0, lock_wait_ms=0.0, error=False, params=None):
+        """Adds one execution of the statement identified by key."""
+        bucket = 0
+        for bound in LATENCY_BUCKETS_MS:
+            if elapsed_ms <= bound:
+                break
+            bucket += 1
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = StatementStats()
+            entry.calls += 1
+            entry.rows += rows
+            entry.total_ms += elapsed_ms
+            entry.lock_wait_ms += lock_wait_ms
+            entry.buckets[bucket] += 1
+            if elapsed_ms > entry.max_ms:
+                entry.max_ms = elapsed_ms
+            if error:
+                entry.errors += 1
+            if elapsed_ms >= self.slow_threshold_ms:
+                self.slow_log.append({
+                    'at': time.time(),
+                    'statement': key,
+                    'elapsed_ms': round(elapsed_ms, 3),
+                    'lock_wait_ms': round(lock_wait_ms, 3),
+                    'rows': rows,
+                    'params': repr(params)[:200] if params is not None else None,
+                })
+
+    def add_rows(self, key, rows):
+        """Adds rows fetched after the statement itself was recorded."""
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is not None:
+                entry.rows += rows
+
+    def record_lock_wait(self, key, lock_wait_ms):
+        """Adds lock wait time for an operation that runs its own statements."""
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = StatementStats()
+            entry.lock_wait_ms += lock_wait_ms
+
+    def record_commit(self):
+        with self._lock:
+            self.commits += 1
+
+    def record_operation(self, label, elapsed_ms, commits, ok=True):
+        """Adds one finished unit of work and the commits it issued."""
+        with self._lock:
+            entry = self._operations.get(label)
+            if entry is None:
+                entry = self._operations[label] = OperationStats()
+            entry.count += 1
+            entry.commits += commits
+            entry.total_ms += elapsed_ms
+            if elapsed_ms > entry.max_ms:
+                entry.max_ms = elapsed_ms
+            if not ok:
+                entry.failures += 1
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._operations.clear()
+            self.commits = 0
+            self.slow_log.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Returns all statistics as plain data, statements sorted by total time."""
+        with self._lock:
+            statements = {key: entry.as_dict() for key, entry in self._statements.items()}
+            operations = {label: entry.as_dict() for label, entry in self._operations.items()}
+            commits = self.commits
+            slow = list(self.slow_log)
+        ordered = dict(sorted(statements.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+        return {
+            'since': self.started_at,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'totals': {
+                'calls': sum(entry['calls'] for entry in statements.values()),
+                'errors': sum(entry['errors'] for entry in statements.values()),
+                'total_ms': round(sum(entry['total_ms'] for entry in statements.values()), 3),
+                'lock_wait_ms': round(sum(entry['lock_wait_ms'] for entry in statements.values()), 3),
+                'commits': commits,
+            },
+            'statements': ordered,
+            'operations': operations,
+            'slow_queries': slow,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def export(self, path):
+        """Writes snapshot() as JSON to path."""
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.to_json())
+        print(f"[DB] Query stats written to {path}")
+
+
+class TimedLock:
+    """Context manager around the handler lock that records the wait time."""
+    __slots__ = ('_lock', '_stats', '_key')
+
+    def __init__(self, lock, stats, key):
+        self._lock = lock
+        self._stats = stats
+        self._key = key
+
+    def __enter__(self):
+        started = time.perf_counter()
+        self._lock.acquire()
+        self._stats.record_lock_wait(self._key, (time.perf_counter() - started) * 1000.0)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        return False
+
+
+class TimedCursor:
+    """
+    Wraps the shared cursor for code that drives it directly (multi-statement
+    transactions); execute() and executemany() are recorded, everything else
+    is passed through.
+    """
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._last_key = None
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.add_rows(self._last_key, len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.add_rows(self._last_key, 1)
+        return row
+
+    def execute(self, sql, params=()):
+        return self._timed(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._timed(self._cursor.executemany, sql, seq_of_params, log_params=False)
+
+    def _timed(self, method, sql, params, log_params=True):
+        started = time.perf_counter()
+        error = False
+        try:
+            return method(sql, params)
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000.0
+            # rowcount is -1 for SELECTs; their rows are counted when fetched
+            rows = self._cursor.rowcount if not error else 0
+            self._last_key = self._stats.key_for(sql)
+            self._stats.record(
+                self._last_key, elapsed, rows=max(rows, 0), error=error,
+                params=params if log_params else None
+            )
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,168 @@
+"""
+Maintenance commands for a store database, runnable without the UI.
+
+Usage:
+    python -m database.maintenance --db path/to/store.db rebuild-daily-sales
+    python -m database.maintenance --db path/to/store.db rebuild-stats
+    python -m database.maintenance --db path/to/store.db rebuild-vendor-sales
+    python -m database.maintenance --db path/to/store.db scan-overdue-trials
+    python -m database.maintenance check-plans
+    python -m database.maintenance --db path/to/store.db import-vendors vendors.csv
+    python -m database.maintenance --db path/to/store.db import-products catalogue.jsonl --batch-size 10000
+    python -m database.maintenance --db path/to/store.db export-products catalogue.csv
+    python -m database.maintenance --db path/to/store.db export-vendors vendors.jsonl
+
+Add --stats stats.json to any database command to write the per-statement
+timings it collected (see database/instrumentation.py).
+"""
+import argparse
+import sys
+
+from database import bulk_io
+from database.db_handler import DatabaseHandler
+from database.queries import Queries
+
+
+def _open(args):
+    db = DatabaseHandler(args.db)
+    if args.stats:
+        db.enable_stats()
+    db.setup_database()
+    return db, Queries(db)
+
+
+def _close(db, args):
+    if args.stats and db.stats is not None:
+        db.stats.export(args.stats)
+    db.close()
+
+
+def cmd_rebuild_daily_sales(args):
+    """Regenerates the daily_sales rollup from the transactions history."""
+    db, queries = _open(args)
+    try:
+        return 0 if queries.rebuild_daily_sales() is not None else 1
+    finally:
+        _close(db, args)
+
+
+def cmd_rebuild_stats(args):
+    """Recomputes the trigger-maintained store_stats counters."""
+    db, queries = _open(args)
+    try:
+        return 0 if queries.rebuild_store_stats() else 1
+    finally:
+        _close(db, args)
+
+
+def cmd_rebuild_vendor_sales(args):
+    """Regenerates the per-vendor daily aggregates from the sales history."""
+    db, queries = _open(args)
+    try:
+        return 0 if queries.rebuild_vendor_sales() is not None else 1
+    finally:
+        _close(db, args)
+
+
+def cmd_scan_overdue_trials(args):
+    """Flags trials open longer than config.TRIAL_OVERDUE_DAYS (resumes from the last checkpoint)."""
+    db, queries = _open(args)
+    try:
+        result = queries.scan_overdue_trials()
+        if result is None:
+            return 1
+        print(f"{result['flagged']} newly overdue in {result['batches']} batch(es); "
+              f"{queries.get_dashboard_stats().get('overdue_trials', 0)} overdue in total.")
+        return 0
+    finally:
+        _close(db, args)
+
+
+def _print_progress(report):
+    if 'read' in report:
+        print(f"  {report['read']} read, {report['written']} written, {report['rejected']} rejected "
+              f"({report['elapsed_s']} s)")
+    else:
+        print(f"  {report['written']} exported ({report['elapsed_s']} s)")
+
+
+def _bulk(args, func, size_arg):
+    if not args.path:
+        print(f"[DB ERROR] {args.command} needs a file path")
+        return 2
+    db, queries = _open(args)
+    try:
+        report = func(queries, args.path, fmt=args.format, progress=_print_progress,
+                      **{size_arg: args.batch_size})
+    except (OSError, ValueError) as e:
+        # Unreadable/unwritable file or unknown format (see bulk_io.detect_format)
+        print(f"[DB ERROR] {args.command} failed: {e}")
+        return 1
+    finally:
+        _close(db, args)
+    for error in report.get('errors', ()):
+        print(f"  - {error}")
+    return 1 if report['failed'] else 0
+
+
+def cmd_import_products(args):
+    """Upserts products (keyed on sku) from a CSV/JSONL file."""
+    return _bulk(args, bulk_io.import_products, 'batch_size')
+
+
+def cmd_import_vendors(args):
+    """Upserts vendors (keyed on name) from a CSV/JSONL file."""
+    return _bulk(args, bulk_io.import_vendors, 'batch_size')
+
+
+def cmd_export_products(args):
+    """Writes the catalogue to a CSV/JSONL file."""
+    return _bulk(args, bulk_io.export_products, 'page_size')
+
+
+def cmd_export_vendors(args):
+    """Writes the vendor list to a CSV/JSONL file."""
+    return _bulk(args, bulk_io.export_vendors, 'page_size')
+
+
+def cmd_check_plans(args):
+    """Runs the EXPLAIN QUERY PLAN regression check (see database/query_plans.py)."""
+    from database.query_plans import check_query_plans
+    failures = check_query_plans(verbose=args.verbose)
+    for failure in failures:
+        print(f"  - {failure}")
+    if not failures:
+        print("All Queries statements use an index or primary key.")
+    return 1 if failures else 0
+
+
+COMMANDS = {
+    "rebuild-daily-sales": cmd_rebuild_daily_sales,
+    "rebuild-stats": cmd_rebuild_stats,
+    "rebuild-vendor-sales": cmd_rebuild_vendor_sales,
+    "scan-overdue-trials": cmd_scan_overdue_trials,
+    "check-plans": cmd_check_plans,
+    "import-products": cmd_import_products,
+    "import-vendors": cmd_import_vendors,
+    "export-products": cmd_export_products,
+    "export-vendors": cmd_export_vendors,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store database maintenance")
+    parser.add_argument("--db", default="store.db", help="Path of the store database")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--stats", metavar="PATH", help="Write query statistics as JSON to PATH")
+    parser.add_argument("--format", choices=(bulk_io.CSV, bulk_io.JSONL),
+                        help="File format for import/export (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, default=bulk_io.BATCH_SIZE,
+                        help="Rows per batch for import/export")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("path", nargs="?", help="File to import from or export to")
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
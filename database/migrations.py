@@ -0,0 +1,557 @@
+"""
+Versioned schema migrations keyed on SQLite's PRAGMA user_version.
+
+Each migration is a (version, description, function) entry in MIGRATIONS. The
+function receives a cursor and runs inside the transaction that also bumps
+user_version, so a migration is applied completely or not at all. Append new
+migrations to the end of the list; never edit one that has already shipped.
+"""
+import config
+from models.customer import normalize_phone
+
+
+def _run_all(cur, statements):
+    """Executes a sequence of SQL statements on the given cursor."""
+    for statement in statements:
+        cur.execute(statement)
+
+
+def _v1_initial_schema(cur):
+    """
+    Base tables plus the default admin user and sample catalogue.
+    Uses IF NOT EXISTS / INSERT OR IGNORE so databases created by older builds
+    (which have the tables but user_version 0) are adopted without data loss.
+    """
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS vendors (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            contact_person TEXT,
+            phone TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            vendor_id INTEGER,
+            sku TEXT UNIQUE,
+            buy_price REAL NOT NULL,
+            sell_price REAL NOT NULL,
+            stock_quantity INTEGER NOT NULL,
+            size TEXT,
+            color TEXT,
+            FOREIGN KEY (vendor_id) REFERENCES vendors(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            total_amount REAL NOT NULL,
+            payment_method TEXT,
+            user_id INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS transaction_items (
+            id INTEGER PRIMARY KEY,
+            transaction_id INTEGER,
+            product_id INTEGER,
+            quantity INTEGER NOT NULL,
+            price_at_sale REAL NOT NULL,
+            FOREIGN KEY (transaction_id) REFERENCES transactions(id),
+            FOREIGN KEY (product_id) REFERENCES products(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS trial_ledger (
+            id INTEGER PRIMARY KEY,
+            customer_name TEXT,
+            customer_phone TEXT,
+            product_id INTEGER NOT NULL,
+            date_taken DATETIME DEFAULT CURRENT_TIMESTAMP,
+            status TEXT NOT NULL, -- 'On_Trial', 'Returned', 'Purchased'
+            FOREIGN KEY (product_id) REFERENCES products(id)
+        )
+        """,
+    ])
+
+    # Default admin user
+    cur.execute(
+        "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
+        ('admin', 'adminpass', 'admin')
+    )
+
+    # Sample vendors and products, one executemany each
+    cur.executemany(
+        "INSERT OR IGNORE INTO vendors (name, contact_person, phone) VALUES (?, ?, ?)",
+        [
+            ('Vendor A', 'John Doe', '123-456-7890'),
+            ('Vendor B', 'Jane Smith', '098-765-4321'),
+        ]
+    )
+    cur.executemany(
+        """
+        INSERT OR IGNORE INTO products
+        (vendor_id, name, sku, buy_price, sell_price, stock_quantity, size, color)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (1, 'Blue T-Shirt - M', 'BT-M-101', 10.0, 19.99, 5, 'M', 'Blue'),
+            (2, 'Red Hoodie - L', 'RH-L-102', 30.0, 49.50, 2, 'L', 'Red'),
+            (1, 'Jeans - Size 32', 'JNS-32-103', 50.0, 79.00, 10, '32', 'Blue'),
+        ]
+    )
+
+
+def fts5_trigram_available(cur):
+    """True when this SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    try:
+        cur.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        cur.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def _v2_product_search_index(cur):
+    """
+    External-content FTS5 trigram index over product name/SKU/size/colour,
+    kept in sync with 'products' by triggers. Stock-only updates do not touch
+    the index (the update trigger is limited to the indexed columns).
+    Skipped on SQLite builds without FTS5 trigram; search then falls back to LIKE.
+    """
+    if not fts5_trigram_available(cur):
+        print("[DB] FTS5 trigram tokenizer unavailable; product search will use LIKE.")
+        return
+    _run_all(cur, [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name, sku, size, color,
+            content='products', content_rowid='id', tokenize='trigram'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts (rowid, name, sku, size, color)
+            VALUES (new.id, new.name, new.sku, new.size, new.color);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, sku, size, color)
+            VALUES ('delete', old.id, old.name, old.sku, old.size, old.color);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, sku, size, color ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, sku, size, color)
+            VALUES ('delete', old.id, old.name, old.sku, old.size, old.color);
+            INSERT INTO products_fts (rowid, name, sku, size, color)
+            VALUES (new.id, new.name, new.sku, new.size, new.color);
+        END
+        """,
+        # Index the rows that already exist
+        "INSERT INTO products_fts (products_fts) VALUES ('rebuild')",
+    ])
+
+
+# Secondary indexes managed by the migrations: name -> CREATE INDEX statement.
+# database/query_plans.py checks that every Queries statement is served by
+# one of these (or a primary key) instead of a full table scan.
+CORE_INDEXES = {
+    "idx_products_vendor": "CREATE INDEX IF NOT EXISTS idx_products_vendor ON products (vendor_id)",
+    "idx_transactions_timestamp": "CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp)",
+    "idx_transaction_items_transaction":
+        "CREATE INDEX IF NOT EXISTS idx_transaction_items_transaction ON transaction_items (transaction_id)",
+    "idx_transaction_items_product":
+        "CREATE INDEX IF NOT EXISTS idx_transaction_items_product ON transaction_items (product_id)",
+    "idx_trial_ledger_product": "CREATE INDEX IF NOT EXISTS idx_trial_ledger_product ON trial_ledger (product_id)",
+    # Partial index: only open trials, ordered the way the ledger lists them
+    "idx_trial_ledger_on_trial":
+        "CREATE INDEX IF NOT EXISTS idx_trial_ledger_on_trial ON trial_ledger (date_taken) "
+        "WHERE status = 'On_Trial'",
+}
+
+
+def _v3_core_indexes(cur):
+    """Creates the CORE_INDEXES set."""
+    _run_all(cur, list(CORE_INDEXES.values()))
+
+
+def _v4_daily_sales_rollup(cur):
+    """
+    Per-day sales rollup keyed by (local day, user, payment method), maintained
+    by Queries.create_transaction in the same commit as the sale. Backfilled
+    from the existing transactions.
+    """
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS daily_sales (
+            day TEXT NOT NULL,                      -- 'YYYY-MM-DD', store local time
+            user_id INTEGER NOT NULL DEFAULT 0,     -- 0 = no user recorded
+            payment_method TEXT NOT NULL DEFAULT '',
+            total_amount REAL NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, user_id, payment_method)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT OR REPLACE INTO daily_sales (day, user_id, payment_method, total_amount, transaction_count)
+        SELECT date(timestamp, 'localtime'), COALESCE(user_id, 0), COALESCE(payment_method, ''),
+               SUM(total_amount), COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3
+        """,
+    ])
+
+
+# Recomputes every store_stats counter from the base tables.
+STORE_STATS_REFRESH = """
+UPDATE store_stats SET
+    pending_trials = (SELECT COUNT(*) FROM trial_ledger WHERE status = 'On_Trial'),
+    total_units = (SELECT COALESCE(SUM(stock_quantity), 0) FROM products),
+    inventory_value = (SELECT COALESCE(SUM(stock_quantity * buy_price), 0) FROM products),
+    low_stock_count = (SELECT COUNT(*) FROM products WHERE stock_quantity <= store_stats.low_stock_threshold),
+    transaction_count = (SELECT COUNT(*) FROM transactions),
+    lifetime_sales = (SELECT COALESCE(SUM(total_amount), 0) FROM transactions)
+WHERE id = 1
+"""
+
+
+def _v5_store_stats(cur):
+    """
+    Single-row store_stats table kept current by triggers on products,
+    trial_ledger and transactions, so the dashboard reads one row instead of
+    aggregating growing tables.
+    """
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS store_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            pending_trials INTEGER NOT NULL DEFAULT 0,
+            total_units INTEGER NOT NULL DEFAULT 0,
+            inventory_value REAL NOT NULL DEFAULT 0,    -- stock at buy price
+            low_stock_count INTEGER NOT NULL DEFAULT 0,
+            low_stock_threshold INTEGER NOT NULL DEFAULT 3,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            lifetime_sales REAL NOT NULL DEFAULT 0
+        )
+        """,
+        # --- products ---
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_products_ai AFTER INSERT ON products BEGIN
+            UPDATE store_stats SET
+                total_units = total_units + new.stock_quantity,
+                inventory_value = inventory_value + new.stock_quantity * new.buy_price,
+                low_stock_count = low_stock_count + (new.stock_quantity <= low_stock_threshold)
+            WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_products_ad AFTER DELETE ON products BEGIN
+            UPDATE store_stats SET
+                total_units = total_units - old.stock_quantity,
+                inventory_value = inventory_value - old.stock_quantity * old.buy_price,
+                low_stock_count = low_stock_count - (old.stock_quantity <= low_stock_threshold)
+            WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_products_au
+        AFTER UPDATE OF stock_quantity, buy_price ON products BEGIN
+            UPDATE store_stats SET
+                total_units = total_units + new.stock_quantity - old.stock_quantity,
+                inventory_value = inventory_value
+                    + new.stock_quantity * new.buy_price - old.stock_quantity * old.buy_price,
+                low_stock_count = low_stock_count
+                    + (new.stock_quantity <= low_stock_threshold) - (old.stock_quantity <= low_stock_threshold)
+            WHERE id = 1;
+        END
+        """,
+        # --- trial_ledger ---
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_trials_ai AFTER INSERT ON trial_ledger BEGIN
+            UPDATE store_stats SET pending_trials = pending_trials + (new.status = 'On_Trial') WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_trials_ad AFTER DELETE ON trial_ledger BEGIN
+            UPDATE store_stats SET pending_trials = pending_trials - (old.status = 'On_Trial') WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_trials_au AFTER UPDATE OF status ON trial_ledger BEGIN
+            UPDATE store_stats SET
+                pending_trials = pending_trials + (new.status = 'On_Trial') - (old.status = 'On_Trial')
+            WHERE id = 1;
+        END
+        """,
+        # --- transactions ---
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_transactions_ai AFTER INSERT ON transactions BEGIN
+            UPDATE store_stats SET
+                transaction_count = transaction_count + 1,
+                lifetime_sales = lifetime_sales + new.total_amount
+            WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_transactions_ad AFTER DELETE ON transactions BEGIN
+            UPDATE store_stats SET
+                transaction_count = transaction_count - 1,
+                lifetime_sales = lifetime_sales - old.total_amount
+            WHERE id = 1;
+        END
+        """,
+    ])
+    cur.execute(
+        "INSERT OR IGNORE INTO store_stats (id, low_stock_threshold) VALUES (1, ?)",
+        (config.LOW_STOCK_THRESHOLD,)
+    )
+    cur.execute(STORE_STATS_REFRESH)
+
+
+def _v6_vendor_daily_sales(cur):
+    """
+    Per-vendor, per-day sales aggregates (units, revenue, cost at sale time),
+    maintained by Queries.create_transaction. Backfilled from history using
+    the current buy prices, since older sales did not record their cost.
+    """
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS vendor_daily_sales (
+            day TEXT NOT NULL,                  -- 'YYYY-MM-DD', store local time
+            vendor_id INTEGER NOT NULL,         -- 0 = product without vendor
+            units INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            cost REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, vendor_id)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_vendor_daily_sales_vendor ON vendor_daily_sales (vendor_id, day)",
+        """
+        INSERT OR REPLACE INTO vendor_daily_sales (day, vendor_id, units, revenue, cost)
+        SELECT date(t.timestamp, 'localtime'), COALESCE(p.vendor_id, 0),
+               SUM(ti.quantity), SUM(ti.quantity * ti.price_at_sale), SUM(ti.quantity * p.buy_price)
+        FROM transaction_items ti
+        JOIN transactions t ON t.id = ti.transaction_id
+        JOIN products p ON p.id = ti.product_id
+        GROUP BY 1, 2
+        """,
+    ])
+
+
+# Indexes backing the keyset-paginated inventory listing (Queries.list_products_page)
+INVENTORY_INDEXES = {
+    "idx_products_name": "CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)",
+    "idx_products_stock": "CREATE INDEX IF NOT EXISTS idx_products_stock ON products (stock_quantity)",
+    "idx_products_vendor_name": "CREATE INDEX IF NOT EXISTS idx_products_vendor_name ON products (vendor_id, name)",
+}
+
+
+def _v7_inventory_indexes(cur):
+    """Creates the INVENTORY_INDEXES set (sort orders of the inventory browser)."""
+    _run_all(cur, list(INVENTORY_INDEXES.values()))
+
+
+# Indexes backing the per-customer lookups (Queries.find_customer_by_phone,
+# search_customers_by_phone, get_customer_history, get_outstanding_trial_value)
+CUSTOMER_INDEXES = {
+    # Unique: one customer per normalized phone; serves exact and prefix (range) lookups
+    "idx_customers_phone": "CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_phone ON customers (phone)",
+    "idx_trial_ledger_customer":
+        "CREATE INDEX IF NOT EXISTS idx_trial_ledger_customer ON trial_ledger (customer_id, date_taken)",
+    # Partial: most sales are walk-ins without a customer
+    "idx_transactions_customer":
+        "CREATE INDEX IF NOT EXISTS idx_transactions_customer ON transactions (customer_id, timestamp) "
+        "WHERE customer_id IS NOT NULL",
+}
+
+
+def _v8_customers(cur):
+    """
+    customers table keyed by normalized phone, referenced from trial_ledger
+    and transactions. Backfilled from the ledger's free-text customer fields
+    (one customer per normalized phone, named as on its latest entry); the
+    text columns stay for display. Older sales carry no customer details, so
+    their customer_id stays NULL.
+    """
+    cur.connection.create_function("normalize_phone", 1, normalize_phone, deterministic=True)
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            phone TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "ALTER TABLE trial_ledger ADD COLUMN customer_id INTEGER REFERENCES customers(id)",
+        "ALTER TABLE transactions ADD COLUMN customer_id INTEGER REFERENCES customers(id)",
+        """
+        INSERT INTO customers (phone, name, created_at)
+        SELECT phone, customer_name, first_seen
+        FROM (
+            SELECT normalize_phone(customer_phone) AS phone, customer_name,
+                   MIN(date_taken) OVER (PARTITION BY normalize_phone(customer_phone)) AS first_seen,
+                   ROW_NUMBER() OVER (PARTITION BY normalize_phone(customer_phone) ORDER BY id DESC) AS latest
+            FROM trial_ledger
+            WHERE customer_phone IS NOT NULL
+        )
+        WHERE phone IS NOT NULL AND latest = 1
+        """,
+    ])
+    _run_all(cur, list(CUSTOMER_INDEXES.values()))
+    cur.execute(
+        """
+        UPDATE trial_ledger
+        SET customer_id = (SELECT id FROM customers WHERE phone = normalize_phone(trial_ledger.customer_phone))
+        WHERE customer_phone IS NOT NULL
+        """
+    )
+
+
+def _v9_overdue_trials(cur):
+    """
+    Support tables for the incremental overdue-trial scan
+    (Queries.scan_overdue_trials): job_checkpoints records how far a
+    background job has read, overdue_trials holds the open trials found
+    overdue. Triggers drop an entry when its trial is closed (or re-add it if
+    it is reopened behind the checkpoint) and keep store_stats.overdue_trials
+    current for the dashboard.
+    """
+    _run_all(cur, [
+        """
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            job TEXT PRIMARY KEY,
+            last_key TEXT NOT NULL DEFAULT '',      -- last processed sort key (e.g. date_taken)
+            last_id INTEGER NOT NULL DEFAULT 0,     -- tie-breaker within last_key
+            params TEXT,                            -- settings the checkpoint is valid for
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS overdue_trials (
+            trial_id INTEGER PRIMARY KEY REFERENCES trial_ledger(id),
+            customer_id INTEGER,
+            product_id INTEGER NOT NULL,
+            date_taken DATETIME NOT NULL,
+            flagged_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_overdue_trials_date ON overdue_trials (date_taken)",
+        "ALTER TABLE store_stats ADD COLUMN overdue_trials INTEGER NOT NULL DEFAULT 0",
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_overdue_ai AFTER INSERT ON overdue_trials BEGIN
+            UPDATE store_stats SET overdue_trials = overdue_trials + 1 WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS store_stats_overdue_ad AFTER DELETE ON overdue_trials BEGIN
+            UPDATE store_stats SET overdue_trials = overdue_trials - 1 WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS overdue_trials_closed
+        AFTER UPDATE OF status ON trial_ledger
+        WHEN old.status = 'On_Trial' AND new.status != 'On_Trial' BEGIN
+            DELETE FROM overdue_trials WHERE trial_id = new.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS overdue_trials_reopened
+        AFTER UPDATE OF status ON trial_ledger
+        WHEN old.status != 'On_Trial' AND new.status = 'On_Trial' BEGIN
+            -- The scan will not revisit rows behind its checkpoint, so flag them here
+            INSERT OR IGNORE INTO overdue_trials (trial_id, customer_id, product_id, date_taken)
+            SELECT new.id, new.customer_id, new.product_id, new.date_taken
+            FROM job_checkpoints
+            WHERE job = 'overdue_trials' AND (new.date_taken, new.id) <= (last_key, last_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS overdue_trials_deleted AFTER DELETE ON trial_ledger BEGIN
+            DELETE FROM overdue_trials WHERE trial_id = old.id;
+        END
+        """,
+    ])
+
+
+# Vendor sort of the inventory listing (Queries.list_products_page); products
+# without a vendor count as vendor 0 so the keyset cursor never holds a NULL
+VENDOR_SORT_INDEXES = {
+    "idx_products_vendor_sort":
+        "CREATE INDEX IF NOT EXISTS idx_products_vendor_sort ON products (COALESCE(vendor_id, 0), name)",
+}
+
+
+def _v10_vendor_sort_index(cur):
+    """Creates the VENDOR_SORT_INDEXES set."""
+    _run_all(cur, list(VENDOR_SORT_INDEXES.values()))
+
+
+# Ordered list of (version, description, function). Versions must be 1..N.
+MIGRATIONS = [
+    (1, "Initial schema and seed data", _v1_initial_schema),
+    (2, "FTS5 trigram product search index", _v2_product_search_index),
+    (3, "Core secondary indexes", _v3_core_indexes),
+    (4, "Daily sales rollup", _v4_daily_sales_rollup),
+    (5, "Trigger-maintained store_stats counters", _v5_store_stats),
+    (6, "Per-vendor daily sales aggregates", _v6_vendor_daily_sales),
+    (7, "Inventory listing indexes", _v7_inventory_indexes),
+    (8, "Customers keyed by phone, referenced from trials and sales", _v8_customers),
+    (9, "Overdue trial tracking with job checkpoints", _v9_overdue_trials),
+    (10, "NULL-safe vendor sort index for the inventory listing", _v10_vendor_sort_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Returns the schema version stored in the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Brings the database up to LATEST_VERSION.
+
+    When the schema is current this is a single PRAGMA read. Otherwise every
+    pending migration runs in its own transaction together with the
+    user_version bump. Returns the list of versions that were applied.
+    """
+    current = get_schema_version(conn)
+    if current >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            migrate(cur)
+            # PRAGMA does not accept bound parameters; version is an int from MIGRATIONS.
+            cur.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        print(f"[DB] Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
@@ -0,0 +1,65 @@
+import config
+
+
+class OverdueTrialScanner:
+    """
+    Runs Queries.scan_overdue_trials on the DB worker at a fixed interval.
+
+    The scan itself is incremental (it resumes from a checkpoint), so a
+    scheduled run that finds nothing new costs one index probe. Ticks come
+    from the Kivy Clock on the main thread and only queue the job; a tick
+    that arrives while the previous scan is still queued or running is
+    skipped. on_scan, if given, receives each scan result on the main thread.
+    """
+    def __init__(self, queries, interval=None, max_age_days=None, on_scan=None):
+        self.queries = queries
+        self.interval = interval or config.OVERDUE_SCAN_INTERVAL
+        self.max_age_days = max_age_days
+        self.on_scan = on_scan
+        self.last_result = None
+        self._event = None
+        self._pending = False
+
+    @property
+    def running(self):
+        return self._event is not None
+
+    def start(self):
+        """Schedules a scan now and then every interval seconds."""
+        if self._event is not None:
+            return
+        from kivy.clock import Clock
+        self._event = Clock.schedule_interval(self._tick, self.interval)
+        Clock.schedule_once(self._tick, 0)
+
+    def stop(self):
+        """Cancels the schedule; a scan already queued still completes."""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def scan_now(self):
+        """Queues one scan unless one is already pending. Returns True if queued."""
+        if self._pending:
+            return False
+        self._pending = True
+        self.queries.run_async(
+            self.queries.scan_overdue_trials,
+            max_age_days=self.max_age_days,
+            callback=self._on_done,
+            error_callback=self._on_error,
+        )
+        return True
+
+    def _tick(self, dt):
+        self.scan_now()
+
+    def _on_done(self, result):
+        self._pending = False
+        self.last_result = result
+        if result is not None and self.on_scan:
+            self.on_scan(result)
+
+    def _on_error(self, error):
+        self._pending = False
+        print(f"[DB ERROR] Overdue trial scan failed: {error}")
@@ -1,6 +1,363 @@
 import datetime
 import sqlite3
 
+import config
+from database.db_handler import ROW_DICT
+from database.migrations import STORE_STATS_REFRESH
+from database.sku_cache import SkuCache
+from database.statements import ALL, NONE, ONE, SCALAR, WRITE, StatementRegistry
+from models.customer import normalize_phone, phone_prefix_range
+from models.trial_ledger import TrialLedgerEntry
+
+class InsufficientStockError(sqlite3.Error):
+    """
+    Raised inside create_transaction when the cart asks for more than is in stock.
+    shortages maps product_id -> (available, requested) for every short product.
+    """
+    def __init__(self, shortages):
+        self.shortages = shortages
+        details = "; ".join(
+            f"product {product_id}: {available} < {requested}"
+            for product_id, (available, requested) in shortages.items()
+        )
+        super().__init__(f"Insufficient stock for {details}")
+
+
+class TrialStateError(sqlite3.Error):
+    """
+    Raised inside the batch trial operations when a requested ledger entry is
+    not (or no longer) On_Trial. trial_ids lists every such entry.
+    """
+    def __init__(self, trial_ids):
+        self.trial_ids = sorted(trial_ids)
+        super().__init__(f"Trial entries not on trial: {', '.join(map(str, self.trial_ids))}")
+
+
+def _row_value(row, column, position):
+    """Reads one column from a row in any DatabaseHandler row format."""
+    if isinstance(row, tuple):
+        return row[position]
+    if isinstance(row, (dict, sqlite3.Row)):
+        return row[column]
+    return getattr(row, column)
+
+
+# --- Statement registry ---
+# Every fixed SQL statement issued by Queries, declared once with its kind and
+# result shape and executed through DatabaseHandler.run(). Statements whose
+# text depends on arguments (filters, sort orders, IN lists) are built per
+# call and go through execute_query().
+STATEMENTS = StatementRegistry()
+
+GET_USER_BY_CREDENTIALS = STATEMENTS.register(
+    "get_user_by_credentials",
+    "SELECT id, username, role FROM users WHERE username = ? AND password = ?",
+    shape=ONE)
+
+TOTAL_SALES_FOR_DAY = STATEMENTS.register(
+    "total_sales_for_day",
+    "SELECT SUM(total_amount) FROM daily_sales WHERE day = ?",
+    shape=SCALAR)
+
+PENDING_TRIALS_COUNT = STATEMENTS.register(
+    "pending_trials_count",
+    "SELECT pending_trials FROM store_stats WHERE id = 1",
+    shape=SCALAR)
+
+GET_STORE_STATS = STATEMENTS.register(
+    "get_store_stats",
+    "SELECT * FROM store_stats WHERE id = 1",
+    shape=ONE)
+
+SET_LOW_STOCK_THRESHOLD = STATEMENTS.register(
+    "set_low_stock_threshold",
+    "UPDATE store_stats SET low_stock_threshold = ? WHERE id = 1",
+    WRITE, NONE)
+
+REFRESH_STORE_STATS = STATEMENTS.register("refresh_store_stats", STORE_STATS_REFRESH, WRITE, NONE)
+
+CLEAR_DAILY_SALES = STATEMENTS.register("clear_daily_sales", "DELETE FROM daily_sales", WRITE, NONE)
+
+REBUILD_DAILY_SALES = STATEMENTS.register(
+    "rebuild_daily_sales",
+    """
+    INSERT INTO daily_sales (day, user_id, payment_method, total_amount, transaction_count)
+    SELECT date(timestamp, 'localtime'), COALESCE(user_id, 0), COALESCE(payment_method, ''),
+           SUM(total_amount), COUNT(*)
+    FROM transactions
+    GROUP BY 1, 2, 3
+    """,
+    WRITE, NONE)
+
+# Adds one committed sale to its rollup row (same transaction as the sale)
+UPSERT_DAILY_SALES = STATEMENTS.register(
+    "upsert_daily_sales",
+    """
+    INSERT INTO daily_sales (day, user_id, payment_method, total_amount, transaction_count)
+    SELECT date(timestamp, 'localtime'), COALESCE(user_id, 0), COALESCE(payment_method, ''), total_amount, 1
+    FROM transactions
+    WHERE id = ?
+    ON CONFLICT (day, user_id, payment_method) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1
+    """,
+    WRITE, NONE)
+
+CLEAR_VENDOR_SALES = STATEMENTS.register("clear_vendor_sales", "DELETE FROM vendor_daily_sales", WRITE, NONE)
+
+REBUILD_VENDOR_SALES = STATEMENTS.register(
+    "rebuild_vendor_sales",
+    """
+    INSERT INTO vendor_daily_sales (day, vendor_id, units, revenue, cost)
+    SELECT date(t.timestamp, 'localtime'), COALESCE(p.vendor_id, 0),
+           SUM(ti.quantity), SUM(ti.quantity * ti.price_at_sale), SUM(ti.quantity * p.buy_price)
+    FROM transaction_items ti
+    JOIN transactions t ON t.id = ti.transaction_id
+    JOIN products p ON p.id = ti.product_id
+    GROUP BY 1, 2
+    """,
+    WRITE, NONE)
+
+# Adds one committed sale's lines to the per-vendor aggregates (same transaction)
+UPSERT_VENDOR_SALES = STATEMENTS.register(
+    "upsert_vendor_sales",
+    """
+    INSERT INTO vendor_daily_sales (day, vendor_id, units, revenue, cost)
+    SELECT date(t.timestamp, 'localtime'), COALESCE(p.vendor_id, 0),
+           SUM(ti.quantity), SUM(ti.quantity * ti.price_at_sale), SUM(ti.quantity * p.buy_price)
+    FROM transaction_items ti
+    JOIN transactions t ON t.id = ti.transaction_id
+    JOIN products p ON p.id = ti.product_id
+    WHERE ti.transaction_id = ?
+    GROUP BY 1, 2
+    ON CONFLICT (day, vendor_id) DO UPDATE SET
+        units = units + excluded.units,
+        revenue = revenue + excluded.revenue,
+        cost = cost + excluded.cost
+    """,
+    WRITE, NONE)
+
+GET_PRODUCT_BY_SKU = STATEMENTS.register(
+    "get_product_by_sku",
+    "SELECT * FROM products WHERE sku = ?",
+    shape=ONE)
+
+WARM_SKU_CACHE = STATEMENTS.register(
+    "warm_sku_cache",
+    """
+    SELECT * FROM products
+    ORDER BY stock_quantity > 0 DESC, id DESC
+    LIMIT ?
+    """)
+
+# The WHERE condition prevents stock from going below zero if we are decrementing.
+UPDATE_PRODUCT_STOCK = STATEMENTS.register(
+    "update_product_stock",
+    """
+    UPDATE products 
+    SET stock_quantity = stock_quantity + ? 
+    WHERE id = ? 
+    AND (stock_quantity + ?) >= 0
+    """,
+    WRITE, NONE)
+
+HAS_PRODUCT_FTS = STATEMENTS.register(
+    "has_product_fts",
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'",
+    shape=SCALAR)
+
+SEARCH_PRODUCTS_FTS = STATEMENTS.register(
+    "search_products_fts",
+    """
+    SELECT p.id, p.name, p.sku, p.sell_price, p.stock_quantity, p.size, p.color
+    FROM products_fts
+    JOIN products p ON p.id = products_fts.rowid
+    WHERE products_fts MATCH ?
+    ORDER BY bm25(products_fts, 4.0, 8.0, 1.0, 1.0), p.name ASC
+    LIMIT 20
+    """)
+
+SEARCH_PRODUCTS_LIKE = STATEMENTS.register(
+    "search_products_like",
+    """
+    SELECT id, name, sku, sell_price, stock_quantity, size, color
+    FROM products
+    WHERE LOWER(name) LIKE ? OR LOWER(sku) LIKE ?
+    ORDER BY name ASC
+    LIMIT 20
+    """)
+
+INSERT_TRANSACTION = STATEMENTS.register(
+    "insert_transaction",
+    "INSERT INTO transactions (total_amount, payment_method, user_id, customer_id) VALUES (?, ?, ?, ?)",
+    WRITE, NONE)
+
+INSERT_TRANSACTION_ITEM = STATEMENTS.register(
+    "insert_transaction_item",
+    "INSERT INTO transaction_items (transaction_id, product_id, quantity, price_at_sale) VALUES (?, ?, ?, ?)",
+    WRITE, NONE)
+
+# Guarded per-product decrement for small carts (see _take_cart_stock)
+TAKE_STOCK = STATEMENTS.register(
+    "take_stock",
+    "UPDATE products SET stock_quantity = stock_quantity - ? WHERE id = ? AND stock_quantity >= ?",
+    WRITE, NONE)
+
+TAKE_TRIAL_STOCK = STATEMENTS.register(
+    "take_trial_stock",
+    "UPDATE products SET stock_quantity = stock_quantity - 1 WHERE id = ? AND stock_quantity >= 1",
+    WRITE, NONE)
+
+CHECKOUT_FOR_TRIAL = STATEMENTS.register(
+    "checkout_for_trial",
+    """
+    INSERT INTO trial_ledger (customer_name, customer_phone, product_id, customer_id, status)
+    VALUES (?, ?, ?, ?, 'On_Trial')
+    """,
+    WRITE, NONE)
+
+GET_ON_TRIAL_ITEMS = STATEMENTS.register(
+    "get_on_trial_items",
+    """
+    SELECT 
+        tl.id, tl.customer_name, tl.customer_phone, tl.date_taken, 
+        p.name, p.size, p.color, p.sell_price, p.id as product_id
+    FROM trial_ledger tl
+    JOIN products p ON tl.product_id = p.id
+    WHERE tl.status = 'On_Trial'
+    ORDER BY tl.date_taken DESC
+    """)
+
+REOPEN_TRIAL = STATEMENTS.register(
+    "reopen_trial",
+    "UPDATE trial_ledger SET status = 'On_Trial' WHERE id = ? AND status = 'Returned'",
+    WRITE, NONE)
+
+OPEN_TRIAL_IDS_FOR_CUSTOMER = STATEMENTS.register(
+    "open_trial_ids_for_customer",
+    "SELECT id FROM trial_ledger WHERE customer_id = ? AND status = 'On_Trial' ORDER BY id")
+
+# --- Customers (phone = normalized phone, see models/customer.py) ---
+
+UPSERT_CUSTOMER = STATEMENTS.register(
+    "upsert_customer",
+    """
+    INSERT INTO customers (phone, name) VALUES (?, ?)
+    ON CONFLICT(phone) DO UPDATE SET name = excluded.name
+    WHERE excluded.name IS NOT NULL AND excluded.name IS NOT customers.name
+    """,
+    WRITE, NONE)
+
+CUSTOMER_ID_BY_PHONE = STATEMENTS.register(
+    "customer_id_by_phone",
+    "SELECT id FROM customers WHERE phone = ?",
+    shape=SCALAR)
+
+FIND_CUSTOMER_BY_PHONE = STATEMENTS.register(
+    "find_customer_by_phone",
+    "SELECT id, name, phone, created_at FROM customers WHERE phone = ?",
+    shape=ONE)
+
+SEARCH_CUSTOMERS_BY_PHONE = STATEMENTS.register(
+    "search_customers_by_phone",
+    "SELECT id, name, phone, created_at FROM customers WHERE phone >= ? AND phone < ? ORDER BY phone LIMIT ?")
+
+CUSTOMER_TRIAL_HISTORY = STATEMENTS.register(
+    "customer_trial_history",
+    """
+    SELECT tl.id, tl.date_taken, tl.status, tl.product_id, p.name, p.size, p.color, p.sell_price
+    FROM trial_ledger tl
+    JOIN products p ON p.id = tl.product_id
+    WHERE tl.customer_id = ?
+    ORDER BY tl.date_taken DESC, tl.id DESC
+    LIMIT ?
+    """)
+
+CUSTOMER_TRANSACTIONS = STATEMENTS.register(
+    "customer_transactions",
+    """
+    SELECT id, timestamp, total_amount, payment_method
+    FROM transactions
+    WHERE customer_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+    """)
+
+OUTSTANDING_TRIAL_VALUE = STATEMENTS.register(
+    "outstanding_trial_value",
+    """
+    SELECT COUNT(*) AS items, COALESCE(SUM(p.sell_price), 0) AS value
+    FROM trial_ledger tl
+    JOIN products p ON p.id = tl.product_id
+    WHERE tl.customer_id = ? AND tl.status = 'On_Trial'
+    """,
+    shape=ONE)
+
+# Checkpoint row of the overdue scan (also named in the v9 reopen trigger)
+OVERDUE_SCAN_JOB = 'overdue_trials'
+
+GET_JOB_CHECKPOINT = STATEMENTS.register(
+    "get_job_checkpoint",
+    "SELECT last_key, last_id, params FROM job_checkpoints WHERE job = ?",
+    shape=ONE)
+
+SAVE_JOB_CHECKPOINT = STATEMENTS.register(
+    "save_job_checkpoint",
+    """
+    INSERT INTO job_checkpoints (job, last_key, last_id, params, updated_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(job) DO UPDATE SET
+        last_key = excluded.last_key,
+        last_id = excluded.last_id,
+        params = excluded.params,
+        updated_at = excluded.updated_at
+    """,
+    WRITE, NONE)
+
+# Keyset over the partial On_Trial index: only entries past the checkpoint
+# and taken on or before the cutoff.
+NEXT_OVERDUE_TRIALS = STATEMENTS.register(
+    "next_overdue_trials",
+    """
+    SELECT id, customer_id, product_id, date_taken
+    FROM trial_ledger
+    WHERE status = 'On_Trial' AND date_taken <= ? AND (date_taken, id) > (?, ?)
+    ORDER BY date_taken, id
+    LIMIT ?
+    """,
+    shape=ALL)
+
+FLAG_OVERDUE_TRIAL = STATEMENTS.register(
+    "flag_overdue_trial",
+    "INSERT OR IGNORE INTO overdue_trials (trial_id, customer_id, product_id, date_taken) VALUES (?, ?, ?, ?)",
+    WRITE, NONE)
+
+CLEAR_OVERDUE_TRIALS = STATEMENTS.register(
+    "clear_overdue_trials",
+    "DELETE FROM overdue_trials",
+    WRITE, NONE)
+
+REFRESH_OVERDUE_COUNT = STATEMENTS.register(
+    "refresh_overdue_count",
+    "UPDATE store_stats SET overdue_trials = (SELECT COUNT(*) FROM overdue_trials) WHERE id = 1",
+    WRITE, NONE)
+
+GET_OVERDUE_TRIALS = STATEMENTS.register(
+    "get_overdue_trials",
+    """
+    SELECT o.trial_id, o.date_taken, o.flagged_at, o.customer_id,
+           tl.customer_name, tl.customer_phone,
+           p.id AS product_id, p.name, p.size, p.color, p.sell_price
+    FROM overdue_trials o
+    JOIN trial_ledger tl ON tl.id = o.trial_id
+    JOIN products p ON p.id = o.product_id
+    WHERE (o.date_taken, o.trial_id) > (?, ?)
+    ORDER BY o.date_taken, o.trial_id
+    LIMIT ?
+    """,
+    shape=ALL)
+
+
 class Queries:
     """
     Centralized class for all high-level database operations,
@@ -9,6 +366,19 @@ class Queries:
     """
     def __init__(self, db_handler):
         self.db = db_handler
+        self._product_fts = None  # Lazily detected, see _has_product_fts()
+        # In-process SKU -> product cache for the barcode scanning path
+        self.sku_cache = SkuCache(config.SKU_CACHE_SIZE)
+
+    def run_async(self, method, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Runs a Queries method on the background DB worker instead of the UI thread.
+        Example: queries.run_async(queries.search_products, "tee", callback=on_results)
+        The callbacks are delivered on the Kivy main thread.
+        """
+        return self.db.run_async(
+            method, *args, callback=callback, error_callback=error_callback, **kwargs
+        )
 
     # --- User Queries ---
 
@@ -17,52 +387,267 @@ class Queries:
         Retrieves user data by username and password.
         Returns a dict of user details or None.
         """
-        query = "SELECT id, username, role FROM users WHERE username = ? AND password = ?"
-        # execute_query is set up to return dicts now
-        return self.db.execute_query(query, (username, password), fetch_one=True)
+        return self.db.run(GET_USER_BY_CREDENTIALS, (username, password))
 
     # --- Dashboard Queries (Fix 3 Implementation) ---
     
     def get_total_sales_for_today(self):
         """
-        Calculates the total sales amount for the current date.
+        Calculates the total sales amount for the current (local) date.
+        Reads the daily_sales rollup, so the cost does not grow with history.
         """
-        # ISO 8601 format compatible with SQLite DATETIME column
-        today_start = datetime.datetime.now().strftime("%Y-%m-%d 00:00:00")
-        query = "SELECT SUM(total_amount) FROM transactions WHERE timestamp >= ?"
-        
-        # We fetch raw data here as it's a SUM, not a row object
-        result = self.db.execute_query(query, (today_start,), fetch_one=True) 
-        # Check if result is a dict (from handler) or raw tuple/list
-        if isinstance(result, dict) and 'SUM(total_amount)' in result:
-             return result['SUM(total_amount)'] if result['SUM(total_amount)'] is not None else 0.0
-        elif isinstance(result, tuple) and result[0] is not None:
-             return result[0]
-        return 0.0
+        today = datetime.date.today().isoformat()
+        total = self.db.run(TOTAL_SALES_FOR_DAY, (today,))
+        return total if total is not None else 0.0
 
 
     def get_pending_trials_count(self):
         """
         Counts the number of items currently marked as 'On_Trial'.
+        Read from the trigger-maintained store_stats row.
         """
-        query = "SELECT COUNT(id) FROM trial_ledger WHERE status = 'On_Trial'"
-        
-        # We fetch raw data here as it's a COUNT, not a row object
-        result = self.db.execute_query(query, fetch_one=True)
-        
-        if isinstance(result, dict) and 'COUNT(id)' in result:
-             return result['COUNT(id)'] if result['COUNT(id)'] is not None else 0
-        elif isinstance(result, tuple) and result[0] is not None:
-             return result[0]
-        return 0
+        return self.db.run(PENDING_TRIALS_COUNT) or 0
 
+    def get_dashboard_stats(self):
+        """
+        All dashboard figures from one store_stats row plus today's rollup:
+        {'sales_today', 'pending_trials', 'total_units', 'inventory_value',
+         'low_stock_count', 'low_stock_threshold', 'transaction_count', 'lifetime_sales',
+         'overdue_trials'}
+        """
+        stats = self.db.run(GET_STORE_STATS) or {}
+        stats.pop('id', None)
+        stats['sales_today'] = self.get_total_sales_for_today()
+        return stats
+
+    def rebuild_store_stats(self, low_stock_threshold=None):
+        """
+        Recomputes every store_stats counter from the base tables (and
+        optionally changes the low-stock threshold). Returns True on success.
+        """
+        try:
+            with self.db.transaction('rebuild_store_stats') as cursor:
+                if low_stock_threshold is not None:
+                    cursor.execute(SET_LOW_STOCK_THRESHOLD.sql, (low_stock_threshold,))
+                cursor.execute(REFRESH_STORE_STATS.sql)
+                cursor.execute(REFRESH_OVERDUE_COUNT.sql)
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] store_stats rebuild failed (rolled back): {e}")
+            return False
+        return True
+
+
+    # --- Sales Reports (daily_sales rollup) ---
+
+    # SQL expressions that turn a 'YYYY-MM-DD' day into a reporting bucket
+    SALES_PERIODS = {
+        'day': "day",
+        'week': "strftime('%Y-W%W', day)",
+        'month': "substr(day, 1, 7)",
+        'all': "'all'",
+    }
+
+    def get_sales_totals(self, start_day, end_day, period='day', user_id=None, payment_method=None):
+        """
+        Sales totals between start_day and end_day (inclusive, 'YYYY-MM-DD'),
+        grouped by period ('day', 'week', 'month' or 'all').
+        Reads only the rollup rows for the range: O(days), not O(transactions).
+
+        :return: [{'period': ..., 'total_amount': ..., 'transaction_count': ...}, ...]
+        """
+        if period not in self.SALES_PERIODS:
+            raise ValueError(f"Unknown sales period: {period}")
+        bucket = self.SALES_PERIODS[period]
+        conditions = ["day BETWEEN ? AND ?"]
+        params = [start_day, end_day]
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if payment_method is not None:
+            conditions.append("payment_method = ?")
+            params.append(payment_method)
+        query = f"""
+        SELECT {bucket} AS period,
+               SUM(total_amount) AS total_amount,
+               SUM(transaction_count) AS transaction_count
+        FROM daily_sales
+        WHERE {' AND '.join(conditions)}
+        GROUP BY 1
+        ORDER BY 1
+        """
+        return self.db.execute_query(query, tuple(params), fetch_all=True) or []
+
+    def rebuild_daily_sales(self):
+        """
+        Regenerates the daily_sales rollup from the full transactions history
+        in one transaction. Returns the number of rollup rows written, or None on error.
+        """
+        try:
+            with self.db.transaction('rebuild_daily_sales') as cursor:
+                cursor.execute(CLEAR_DAILY_SALES.sql)
+                cursor.execute(REBUILD_DAILY_SALES.sql)
+                rows = cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] daily_sales rebuild failed (rolled back): {e}")
+            return None
+        print(f"[DB] daily_sales rebuilt: {rows} rows.")
+        return rows
+
+    # --- Vendor Reports (vendor_daily_sales aggregates) ---
+
+    VENDOR_REPORT_ORDER = {
+        'revenue': "revenue DESC",
+        'units': "units DESC",
+        'margin': "margin DESC",
+        'name': "vendor_name ASC",
+    }
+
+    def get_vendor_report(self, start_day, end_day, period='day', vendor_id=None, row_format=ROW_DICT):
+        """
+        Units, revenue, cost and margin per vendor per time bucket between
+        start_day and end_day (inclusive, 'YYYY-MM-DD'). period is one of
+        SALES_PERIODS. Served from vendor_daily_sales: O(days x vendors).
+        row_format is passed to DatabaseHandler (e.g. ROW_TUPLE for exports).
+
+        :return: [{'period', 'vendor_id', 'vendor_name', 'units', 'revenue',
+                   'cost', 'margin'}, ...] ordered by period, then revenue.
+        """
+        if period not in self.SALES_PERIODS:
+            raise ValueError(f"Unknown sales period: {period}")
+        bucket = self.SALES_PERIODS[period]
+        conditions = ["s.day BETWEEN ? AND ?"]
+        params = [start_day, end_day]
+        if vendor_id is not None:
+            conditions.append("s.vendor_id = ?")
+            params.append(vendor_id)
+        query = f"""
+        SELECT {bucket} AS period, s.vendor_id, COALESCE(v.name, 'No vendor') AS vendor_name,
+               SUM(s.units) AS units, SUM(s.revenue) AS revenue, SUM(s.cost) AS cost,
+               SUM(s.revenue) - SUM(s.cost) AS margin
+        FROM vendor_daily_sales s
+        LEFT JOIN vendors v ON v.id = s.vendor_id
+        WHERE {' AND '.join(conditions)}
+        GROUP BY 1, s.vendor_id
+        ORDER BY 1, revenue DESC
+        """
+        return self.db.execute_query(query, tuple(params), fetch_all=True, row_format=row_format) or []
+
+    def get_top_vendors(self, start_day, end_day, limit=10, order_by='revenue'):
+        """
+        Top-N vendors over a date range, ranked by 'revenue', 'units', 'margin'
+        (or listed by 'name'). Same row shape as get_vendor_report().
+        """
+        if order_by not in self.VENDOR_REPORT_ORDER:
+            raise ValueError(f"Unknown vendor ranking: {order_by}")
+        query = f"""
+        SELECT 'all' AS period, s.vendor_id, COALESCE(v.name, 'No vendor') AS vendor_name,
+               SUM(s.units) AS units, SUM(s.revenue) AS revenue, SUM(s.cost) AS cost,
+               SUM(s.revenue) - SUM(s.cost) AS margin
+        FROM vendor_daily_sales s
+        LEFT JOIN vendors v ON v.id = s.vendor_id
+        WHERE s.day BETWEEN ? AND ?
+        GROUP BY s.vendor_id
+        ORDER BY {self.VENDOR_REPORT_ORDER[order_by]}
+        LIMIT ?
+        """
+        return self.db.execute_query(query, (start_day, end_day, limit), fetch_all=True) or []
+
+    def rebuild_vendor_sales(self):
+        """
+        Regenerates vendor_daily_sales from the full sales history in one
+        transaction (costs use current buy prices). Returns rows written or None.
+        """
+        try:
+            with self.db.transaction('rebuild_vendor_sales') as cursor:
+                cursor.execute(CLEAR_VENDOR_SALES.sql)
+                cursor.execute(REBUILD_VENDOR_SALES.sql)
+                rows = cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] vendor_daily_sales rebuild failed (rolled back): {e}")
+            return None
+        print(f"[DB] vendor_daily_sales rebuilt: {rows} rows.")
+        return rows
 
     # --- Product/Inventory Queries ---
 
     def get_product_by_sku(self, sku):
         """Retrieves a single product by SKU."""
-        query = "SELECT * FROM products WHERE sku = ?"
-        return self.db.execute_query(query, (sku,), fetch_one=True)
+        return self.db.run(GET_PRODUCT_BY_SKU, (sku,))
+
+    def lookup_sku(self, sku):
+        """
+        Exact SKU/barcode lookup for scanners.
+        Served from the SKU cache when possible; misses read the row and cache it.
+        """
+        if not sku:
+            return None
+        product = self.sku_cache.get(sku)
+        if product is not None:
+            return product
+        generation = self.sku_cache.generation()
+        product = self.get_product_by_sku(sku)
+        if product:
+            self.sku_cache.put(product, generation)
+        return product
+
+    def lookup_skus(self, skus):
+        """
+        Resolves a burst of scanned codes at once: cached codes are served from
+        the SKU cache, the rest with one IN query per MAX_VALUES_ROWS codes.
+        :return: {sku: product dict}; unknown codes are simply absent.
+        """
+        found = {}
+        missing = []
+        for sku in dict.fromkeys(sku for sku in skus if sku):
+            product = self.sku_cache.get(sku)
+            if product is not None:
+                found[sku] = product
+            else:
+                missing.append(sku)
+        if not missing:
+            return found
+
+        generation = self.sku_cache.generation()
+        for start in range(0, len(missing), self.MAX_VALUES_ROWS):
+            chunk = missing[start:start + self.MAX_VALUES_ROWS]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.db.execute_query(
+                f"SELECT * FROM products WHERE sku IN ({placeholders})", tuple(chunk), fetch_all=True
+            ) or []
+            for product in rows:
+                self.sku_cache.put(product, generation)
+                found[product['sku']] = product
+        return found
+
+    def warm_sku_cache(self, limit=None):
+        """
+        Preloads the SKU cache (called at login, off the UI thread).
+        In-stock products are loaded first, newest first, up to the cache capacity.
+        """
+        limit = limit or self.sku_cache.capacity
+        rows = self.db.run(WARM_SKU_CACHE, (limit,)) or []
+        self.sku_cache.put_many(rows)
+        print(f"[DB] SKU cache warmed with {len(rows)} products.")
+        return len(rows)
+
+    # Columns that update_product() is allowed to change
+    EDITABLE_PRODUCT_FIELDS = ('name', 'vendor_id', 'sku', 'buy_price', 'sell_price', 'size', 'color')
+
+    def update_product(self, product_id, **fields):
+        """
+        Edits product details, e.g. update_product(3, sell_price=24.99, color='Navy').
+        Stock is changed through update_product_stock() instead.
+        """
+        unknown = set(fields) - set(self.EDITABLE_PRODUCT_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update product field(s): {', '.join(sorted(unknown))}")
+        if not fields:
+            return True
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE products SET {assignments} WHERE id = ?"
+        result = self.db.execute_query(query, tuple(fields.values()) + (product_id,))
+        self.sku_cache.invalidate_product(product_id)
+        return result
 
     def update_product_stock(self, product_id, quantity_change):
         """
@@ -74,96 +659,635 @@ class Queries:
         (Fix 12: Using a single atomic update statement to prevent stock from going below zero, 
         which addresses the oversell risk in a non-concurrent environment.)
         """
-        query = """
-        UPDATE products 
-        SET stock_quantity = stock_quantity + ? 
-        WHERE id = ? 
-        AND (stock_quantity + ?) >= 0;
+        result = self.db.run(UPDATE_PRODUCT_STOCK, (quantity_change, product_id, quantity_change))
+        # The guard may have skipped the update, so drop the entry rather than patching it
+        self.sku_cache.invalidate_product(product_id)
+        return result
+
+    # sort key -> (ORDER BY columns, matching keyset cursor columns)
+    # sort -> (SQL expression, row column, cursor value for NULL) per key.
+    # Products without a vendor sort first as vendor 0 (vendor ids start at 1):
+    # a NULL inside the row-value seek would compare as NULL and end the listing.
+    PRODUCT_LIST_SORTS = {
+        'name': (("p.name", 'name', None), ("p.id", 'id', None)),
+        'stock': (("p.stock_quantity", 'stock_quantity', None), ("p.id", 'id', None)),
+        'vendor': (("COALESCE(p.vendor_id, 0)", 'vendor_id', 0), ("p.name", 'name', None), ("p.id", 'id', None)),
+    }
+
+    # Columns of list_products_page() rows, in SELECT order
+    PRODUCT_LIST_COLUMNS = ('id', 'name', 'sku', 'vendor_id', 'buy_price', 'sell_price',
+                            'stock_quantity', 'size', 'color', 'vendor_name')
+
+    def list_products_page(self, sort='name', after=None, limit=50,
+                           vendor_id=None, search=None, low_stock_only=False, row_format=ROW_DICT):
+        """
+        One page of the inventory listing using keyset pagination, so every page
+        costs the same no matter how deep the user has scrolled.
+
+        :param sort: 'name', 'stock' or 'vendor' (vendor, then name).
+        :param after: Cursor returned with the previous page (None for the first page).
+        :param limit: Page size.
+        :param vendor_id: Only products of this vendor.
+        :param search: Name/SKU filter (FTS index for 3+ characters, else name prefix).
+        :param low_stock_only: Only products at or below the store_stats low-stock threshold.
+        :param row_format: Row format of 'rows' (dicts by default; tuples or Product
+            objects are much smaller for large pages).
+        :return: {'rows': [product dicts with vendor_name], 'next_cursor': tuple or None}
+        """
+        if sort not in self.PRODUCT_LIST_SORTS:
+            raise ValueError(f"Unknown product sort: {sort}")
+        keys = self.PRODUCT_LIST_SORTS[sort]
+        expressions = ', '.join(expression for expression, _, _ in keys)
+        conditions = []
+        params = []
+        if after is not None:
+            # Row-value comparison resumes after the cursor row; the range term on
+            # the leading key is what lets SQLite seek into an expression index
+            conditions.append(f"{keys[0][0]} >= ?")
+            conditions.append(f"({expressions}) > ({', '.join('?' for _ in keys)})")
+            params.append(after[0])
+            params.extend(after)
+        if vendor_id is not None:
+            conditions.append("p.vendor_id = ?")
+            params.append(vendor_id)
+        if search:
+            if len(search) >= 3 and self._has_product_fts():
+                conditions.append("p.id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)")
+                params.append('"' + search.replace('"', '""') + '"')
+            else:
+                conditions.append("p.name >= ? AND p.name < ?")
+                params.extend((search, search + '\uffff'))
+        if low_stock_only:
+            conditions.append("p.stock_quantity <= (SELECT low_stock_threshold FROM store_stats WHERE id = 1)")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+        SELECT p.id, p.name, p.sku, p.vendor_id, p.buy_price, p.sell_price,
+               p.stock_quantity, p.size, p.color, v.name AS vendor_name
+        FROM products p
+        LEFT JOIN vendors v ON v.id = p.vendor_id
+        {where}
+        ORDER BY {expressions}
+        LIMIT ?
         """
-        # The WHERE condition prevents stock from going below zero if we are decrementing.
-        return self.db.execute_query(query, (quantity_change, product_id, quantity_change))
+        params.append(limit)
+        rows = self.db.execute_query(query, tuple(params), fetch_all=True, row_format=row_format) or []
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            values = (
+                (_row_value(last, column, self.PRODUCT_LIST_COLUMNS.index(column)), null_key)
+                for _, column, null_key in keys
+            )
+            next_cursor = tuple(null_key if value is None else value for value, null_key in values)
+        return {'rows': rows, 'next_cursor': next_cursor}
 
     def search_products(self, query):
         """
-        Fuzzy search for products by name or SKU.
-        Returns list of product dicts with relevant fields.
+        Fuzzy search for products by name, SKU, size or colour.
+        Returns list of product dicts with relevant fields, best matches first.
+
+        Uses the FTS5 trigram index (products_fts) when it exists: every word of
+        3+ characters must appear somewhere in the indexed columns, and results
+        are ranked by bm25 with name/SKU hits weighted above size/colour.
+        Very short queries (trigram needs 3 characters) and SQLite builds
+        without FTS5 fall back to the LIKE scan.
         """
         if not query:
             return []
+        terms = [term for term in query.split() if len(term) >= 3]
+        if terms and self._has_product_fts():
+            # Quote each term so FTS5 treats punctuation (e.g. '-' in SKUs) literally
+            match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            return self.db.run(SEARCH_PRODUCTS_FTS, (match,)) or []
+
         search_term = f'%{query.lower()}%'
-        sql = """
-        SELECT id, name, sku, sell_price, stock_quantity, size, color
-        FROM products
-        WHERE LOWER(name) LIKE ? OR LOWER(sku) LIKE ?
-        ORDER BY name ASC
-        LIMIT 20
-        """
-        results = self.db.execute_query(sql, (search_term, search_term), fetch_all=True)
-        return results or []
+        return self.db.run(SEARCH_PRODUCTS_LIKE, (search_term, search_term)) or []
+
+    def _has_product_fts(self):
+        """Checks once whether the products_fts index was created by the migrations."""
+        if self._product_fts is None:
+            self._product_fts = bool(self.db.run(HAS_PRODUCT_FTS))
+        return self._product_fts
 
     # --- Transaction Queries ---
 
-    def create_transaction(self, total_amount, payment_method, user_id, items_list):
+    def create_transaction(self, total_amount, payment_method, user_id, items_list, customer_id=None):
         """
         Creates a new transaction and related transaction items (fully atomic).
-        Checks stock before updating, direct cursor ops, single commit.
+
+        Set-based: one stock check across all products in the cart, one
+        executemany for the line items and one UPDATE ... FROM for the stock
+        decrement, all inside one unit of work (db.transaction()). If any
+        product is short, nothing is written and the InsufficientStockError
+        (logged) lists every short product. Called inside a caller's unit of
+        work it becomes a savepoint and commits with the caller.
+
+        :param items_list: [(product_id, quantity, price_at_sale), ...]
+        :param customer_id: Customer the sale belongs to (None for walk-in sales).
+        :return: The new transaction ID, or None if it was rolled back.
         """
         try:
-            # 1. Insert Transaction Header
-            transaction_query = "INSERT INTO transactions (total_amount, payment_method, user_id) VALUES (?, ?, ?)"
-            self.db.cursor.execute(transaction_query, (total_amount, payment_method, user_id))
-            transaction_id = self.db.cursor.lastrowid
-            
-            # 2. For each item: check stock, insert item, update stock
-            for product_id, quantity, price_at_sale in items_list:
-                # Check sufficient stock
-                check_query = "SELECT stock_quantity FROM products WHERE id = ?"
-                self.db.cursor.execute(check_query, (product_id,))
-                stock_row = self.db.cursor.fetchone()
-                if not stock_row or stock_row[0] < quantity:
-                    raise sqlite3.Error(f"Insufficient stock for product {product_id}: {stock_row[0] if stock_row else 0} < {quantity}")
-                
-                # Insert item details
-                item_query = "INSERT INTO transaction_items (transaction_id, product_id, quantity, price_at_sale) VALUES (?, ?, ?, ?)"
-                self.db.cursor.execute(item_query, (transaction_id, product_id, quantity, price_at_sale))
-                
-                # Update stock atomically (direct cursor, no intermediate commit)
-                update_query = "UPDATE products SET stock_quantity = stock_quantity - ? WHERE id = ?"
-                self.db.cursor.execute(update_query, (quantity, product_id))
-            
-            # 3. Single commit for all ops
-            self.db.conn.commit()
-            print(f"[DB] Transaction {transaction_id} committed successfully.")
-            return transaction_id
-        
+            with self.db.transaction('create_transaction') as cursor:
+                transaction_id = self._create_transaction_locked(
+                    cursor, total_amount, payment_method, user_id, items_list, customer_id
+                )
         except sqlite3.Error as e:
-            self.db.conn.rollback()
             print(f"[DB ERROR] Transaction failed (rolled back): {e}")
             return None
+        state = "recorded (commits with the enclosing unit of work)" if self.db.in_unit_of_work else "committed"
+        print(f"[DB] Transaction {transaction_id} {state} successfully.")
+        return transaction_id
+
+    def _create_transaction_locked(self, cursor, total_amount, payment_method, user_id, items_list, customer_id=None):
+        # Total quantity per product (the same product may appear on several lines)
+        needed = {}
+        for product_id, quantity, _ in items_list:
+            needed[product_id] = needed.get(product_id, 0) + quantity
+
+        # 1. Guarded stock decrement (raises before anything is written if short)
+        self._take_cart_stock(cursor, needed)
+
+        # 2. Insert Transaction Header
+        cursor.execute(INSERT_TRANSACTION.sql, (total_amount, payment_method, user_id, customer_id))
+        transaction_id = cursor.lastrowid
+        cursor.execute(UPSERT_DAILY_SALES.sql, (transaction_id,))
+
+        # 3. All line items in one prepared statement
+        cursor.executemany(
+            INSERT_TRANSACTION_ITEM.sql,
+            ((transaction_id, product_id, quantity, price_at_sale)
+             for product_id, quantity, price_at_sale in items_list)
+        )
+
+        cursor.execute(UPSERT_VENDOR_SALES.sql, (transaction_id,))
+
+        # 4. The unit of work commits once; the cache follows the commit
+        self.db.after_commit(lambda: self._patch_cached_stock(needed))
+        return transaction_id
+
+    # Carts with up to this many distinct products take stock with one guarded
+    # UPDATE per product. Larger carts use one IN lookup plus a VALUES-joined
+    # UPDATE, whose fixed cost only pays off from about this size on
+    # (benchmarks/bench_create_transaction.py).
+    SET_BASED_STOCK_MIN_PRODUCTS = 50
+
+    def _take_cart_stock(self, cursor, needed):
+        """
+        Subtracts needed ({product_id: quantity}) from stock, never below zero.
+        Raises InsufficientStockError listing every short product.
+        """
+        if len(needed) < self.SET_BASED_STOCK_MIN_PRODUCTS:
+            short = []
+            for product_id, quantity in needed.items():
+                cursor.execute(TAKE_STOCK.sql, (quantity, product_id, quantity))
+                if cursor.rowcount != 1:
+                    short.append(product_id)
+            if short:
+                stock = self._fetch_stock_levels(cursor, short)
+                raise InsufficientStockError(
+                    {product_id: (stock.get(product_id, 0), needed[product_id]) for product_id in short}
+                )
+            return
+
+        # One stock check for the whole cart
+        stock = self._fetch_stock_levels(cursor, list(needed))
+        shortages = {
+            product_id: (stock.get(product_id, 0), quantity)
+            for product_id, quantity in needed.items()
+            if stock.get(product_id, 0) < quantity
+        }
+        if shortages:
+            raise InsufficientStockError(shortages)
+
+        # Set-based stock decrement (guarded, so it can never go negative)
+        updated = 0
+        pairs = list(needed.items())
+        for start in range(0, len(pairs), self.MAX_VALUES_ROWS):
+            chunk = pairs[start:start + self.MAX_VALUES_ROWS]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            update_query = f"""
+            UPDATE products
+            SET stock_quantity = products.stock_quantity - d.qty
+            FROM (SELECT column1 AS product_id, column2 AS qty FROM (VALUES {values})) AS d
+            WHERE products.id = d.product_id AND products.stock_quantity >= d.qty
+            """
+            cursor.execute(update_query, [v for pair in chunk for v in pair])
+            updated += cursor.rowcount
+        if updated != len(needed):
+            raise sqlite3.Error("Stock changed during checkout; transaction aborted.")
+
+    def _patch_cached_stock(self, deltas):
+        for product_id, quantity in deltas.items():
+            self.sku_cache.patch_stock(product_id, -quantity)
+
+    # Rows per VALUES list / IN list, keeping bound parameters well under
+    # SQLite's historical 999-variable limit.
+    MAX_VALUES_ROWS = 400
+
+    def _fetch_stock_levels(self, cursor, product_ids):
+        """Returns {product_id: stock_quantity} for the given IDs (chunked IN queries)."""
+        stock = {}
+        for start in range(0, len(product_ids), self.MAX_VALUES_ROWS):
+            chunk = product_ids[start:start + self.MAX_VALUES_ROWS]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                f"SELECT id, stock_quantity FROM products WHERE id IN ({placeholders})", chunk
+            )
+            stock.update((row[0], row[1]) for row in cursor.fetchall())
+        return stock
 
     # --- Trial Ledger Queries ---
 
     def checkout_for_trial(self, customer_name, customer_phone, product_id):
-        """Registers a product checked out for trial."""
-        query = "INSERT INTO trial_ledger (customer_name, customer_phone, product_id, status) VALUES (?, ?, ?, 'On_Trial')"
-        return self.db.execute_query(query, (customer_name, customer_phone, product_id))
+        """
+        Registers a product checked out for trial and takes one unit out of
+        stock, in one unit of work. The customer is looked up (or created) by
+        phone number. Returns True, or None if the product is out of stock or
+        the checkout failed.
+        """
+        try:
+            with self.db.transaction('checkout_for_trial') as cursor:
+                cursor.execute(TAKE_TRIAL_STOCK.sql, (product_id,))
+                if cursor.rowcount != 1:
+                    raise InsufficientStockError({product_id: (0, 1)})
+                customer_id = self._customer_id_locked(cursor, customer_phone, customer_name)
+                cursor.execute(CHECKOUT_FOR_TRIAL.sql, (customer_name, customer_phone, product_id, customer_id))
+                self.db.after_commit(lambda: self.sku_cache.patch_stock(product_id, -1))
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Trial checkout failed (rolled back): {e}")
+            return None
+        return True
         
     def get_on_trial_items(self):
         """
         Retrieves all items currently on trial, joined with product details.
         """
-        query = """
+        return self.db.run(GET_ON_TRIAL_ITEMS)
+
+    def get_on_trial_items_page(self, after=None, limit=50, customer=None, phone=None, row_format=ROW_DICT):
+        """
+        One page of open trials, newest first, using keyset pagination on
+        (date_taken, id) over the partial On_Trial index.
+
+        :param after: Cursor returned with the previous page (None for the first page).
+        :param customer: Case-insensitive substring of the customer name.
+        :param phone: Prefix of the customer phone number, in any format ("555 01"
+            matches 555-0101); matched on the normalized customers.phone index.
+        :param row_format: Row format of 'rows' (dicts by default, or e.g. TrialLedgerEntry).
+        :return: {'rows': [dicts shaped like get_on_trial_items()], 'next_cursor': tuple or None}
+        """
+        joins = ""
+        conditions = ["tl.status = 'On_Trial'"]
+        params = []
+        if phone:
+            bounds = phone_prefix_range(phone)
+            if bounds is None:
+                return {'rows': [], 'next_cursor': None}
+            joins = "JOIN customers c ON c.id = tl.customer_id"
+            conditions.append("c.phone >= ? AND c.phone < ?")
+            params.extend(bounds)
+        if after is not None:
+            conditions.append("(tl.date_taken, tl.id) < (?, ?)")
+            params.extend(after)
+        if customer:
+            conditions.append("tl.customer_name LIKE ?")
+            params.append(f"%{customer}%")
+        query = f"""
         SELECT 
             tl.id, tl.customer_name, tl.customer_phone, tl.date_taken, 
             p.name, p.size, p.color, p.sell_price, p.id as product_id
         FROM trial_ledger tl
+        {joins}
         JOIN products p ON tl.product_id = p.id
-        WHERE tl.status = 'On_Trial'
-        ORDER BY tl.date_taken DESC;
+        WHERE {' AND '.join(conditions)}
+        ORDER BY tl.date_taken DESC, tl.id DESC
+        LIMIT ?
+        """
+        params.append(limit)
+        rows = self.db.execute_query(query, tuple(params), fetch_all=True, row_format=row_format) or []
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = (_row_value(last, 'date_taken', 3), _row_value(last, 'id', 0))
+        return {'rows': rows, 'next_cursor': next_cursor}
+
+    def iter_on_trial_items(self, chunk_size=200, customer=None, phone=None):
         """
-        return self.db.execute_query(query, fetch_all=True)
+        Streams open trials as lists of TrialLedgerEntry objects, chunk_size at a
+        time, newest first. Each chunk is a separate keyset query, so the DB lock
+        is not held between chunks and memory stays bounded.
+        """
+        cursor = None
+        while True:
+            page = self.get_on_trial_items_page(cursor, chunk_size, customer, phone, row_format=TrialLedgerEntry)
+            if page['rows']:
+                yield page['rows']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
 
     def update_trial_status(self, ledger_id, new_status):
-        """Updates the status of a specific trial ledger entry."""
-        query = "UPDATE trial_ledger SET status = ? WHERE id = ?"
-        return self.db.execute_query(query, (new_status, ledger_id))
\ No newline at end of file
+        """
+        Status changes that keep stock consistent. Only 'On_Trial' is accepted
+        here: it reopens a Returned entry and takes its unit back out of stock,
+        in one unit of work. Settle trials with return_trial_items() /
+        convert_trials_to_sale() (ValueError otherwise).
+        Returns True, or None if the entry is not Returned or is out of stock.
+        """
+        if new_status in ('Returned', 'Purchased'):
+            raise ValueError(
+                f"Trial status {new_status!r} moves stock or money; "
+                "use return_trial_items() or convert_trials_to_sale() instead"
+            )
+        if new_status != 'On_Trial':
+            raise ValueError(f"Unknown trial status: {new_status!r}")
+        try:
+            with self.db.transaction('reopen_trial') as cursor:
+                cursor.execute(REOPEN_TRIAL.sql, (ledger_id,))
+                if cursor.rowcount != 1:
+                    raise TrialStateError([ledger_id])
+                product_id = self._open_trials(cursor, [ledger_id])[ledger_id][0]
+                cursor.execute(TAKE_TRIAL_STOCK.sql, (product_id,))
+                if cursor.rowcount != 1:
+                    raise InsufficientStockError({product_id: (0, 1)})
+                self.db.after_commit(lambda: self.sku_cache.patch_stock(product_id, -1))
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Trial reopen failed (rolled back): {e}")
+            return None
+        return True
+
+    # Batch trial operations. Each runs as one unit of work with set-based
+    # statements (chunked IN / VALUES lists), and is all-or-nothing: if any
+    # requested entry is not On_Trial, nothing changes (TrialStateError).
+
+    def return_trial_items(self, trial_ids):
+        """
+        Marks the given open trial entries Returned and puts their units back
+        in stock. Returns the number of entries returned, or None on error.
+        """
+        try:
+            with self.db.transaction('return_trial_items') as cursor:
+                returned = self._return_trials_locked(cursor, list(dict.fromkeys(trial_ids)))
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Trial return failed (rolled back): {e}")
+            return None
+        print(f"[DB] {returned} trial item(s) returned to stock.")
+        return returned
+
+    def convert_trials_to_sale(self, trial_ids, payment_method, user_id):
+        """
+        Sells the given open trial entries as one transaction at the current
+        sell prices and marks them Purchased (their stock already left with
+        the trial). Returns the new transaction ID, or None on error.
+        """
+        try:
+            with self.db.transaction('convert_trials_to_sale') as cursor:
+                transaction_id = self._convert_trials_locked(
+                    cursor, list(dict.fromkeys(trial_ids)), payment_method, user_id
+                )
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Trial sale failed (rolled back): {e}")
+            return None
+        print(f"[DB] Trial items sold as transaction {transaction_id}.")
+        return transaction_id
+
+    def settle_customer_trials(self, customer_phone, user_id, purchased_ids=(), payment_method='Cash'):
+        """
+        Closes every open trial of the customer with this phone number in one
+        unit of work: the entries in purchased_ids become one sale, all the
+        others are returned to stock.
+
+        :return: {'returned': count, 'purchased': count, 'transaction_id': ID or None},
+                 or None on error (e.g. a purchased ID that is not open for this customer).
+        """
+        try:
+            with self.db.transaction('settle_customer_trials') as cursor:
+                cursor.execute(CUSTOMER_ID_BY_PHONE.sql, (normalize_phone(customer_phone),))
+                row = cursor.fetchone()
+                open_ids = []
+                if row is not None:
+                    cursor.execute(OPEN_TRIAL_IDS_FOR_CUSTOMER.sql, (row[0],))
+                    open_ids = [row[0] for row in cursor.fetchall()]
+                purchased = list(dict.fromkeys(purchased_ids))
+                foreign = set(purchased) - set(open_ids)
+                if foreign:
+                    raise TrialStateError(foreign)
+                kept = set(purchased)
+                to_return = [trial_id for trial_id in open_ids if trial_id not in kept]
+                result = {
+                    'returned': self._return_trials_locked(cursor, to_return) if to_return else 0,
+                    'purchased': len(purchased),
+                    'transaction_id': (
+                        self._convert_trials_locked(cursor, purchased, payment_method, user_id)
+                        if purchased else None
+                    ),
+                }
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Settling trials for {customer_phone} failed (rolled back): {e}")
+            return None
+        print(f"[DB] Trials settled for {customer_phone}: {result}")
+        return result
+
+    def _open_trials(self, cursor, trial_ids):
+        """
+        Returns {trial_id: (product_id, sell_price, customer_id)} for the requested entries,
+        raising TrialStateError unless every one of them is On_Trial.
+        """
+        trials = {}
+        for start in range(0, len(trial_ids), self.MAX_VALUES_ROWS):
+            chunk = trial_ids[start:start + self.MAX_VALUES_ROWS]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                f"""
+                SELECT tl.id, tl.product_id, p.sell_price, tl.customer_id
+                FROM trial_ledger tl
+                JOIN products p ON p.id = tl.product_id
+                WHERE tl.id IN ({placeholders}) AND tl.status = 'On_Trial'
+                """,
+                chunk
+            )
+            trials.update((row[0], (row[1], row[2], row[3])) for row in cursor.fetchall())
+        missing = set(trial_ids) - set(trials)
+        if missing:
+            raise TrialStateError(missing)
+        return trials
+
+    def _set_trial_status(self, cursor, trial_ids, status):
+        """Moves On_Trial entries to status (chunked IN updates); returns rows changed."""
+        changed = 0
+        for start in range(0, len(trial_ids), self.MAX_VALUES_ROWS):
+            chunk = trial_ids[start:start + self.MAX_VALUES_ROWS]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(
+                f"UPDATE trial_ledger SET status = ? WHERE id IN ({placeholders}) AND status = 'On_Trial'",
+                [status] + chunk
+            )
+            changed += cursor.rowcount
+        if changed != len(trial_ids):
+            raise sqlite3.Error("Trial ledger changed during the operation; aborted.")
+        return changed
+
+    def _return_trials_locked(self, cursor, trial_ids):
+        trials = self._open_trials(cursor, trial_ids)
+        units = {}
+        for product_id, _, _ in trials.values():
+            units[product_id] = units.get(product_id, 0) + 1
+
+        pairs = list(units.items())
+        for start in range(0, len(pairs), self.MAX_VALUES_ROWS):
+            chunk = pairs[start:start + self.MAX_VALUES_ROWS]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            cursor.execute(
+                f"""
+                UPDATE products
+                SET stock_quantity = products.stock_quantity + d.qty
+                FROM (SELECT column1 AS product_id, column2 AS qty FROM (VALUES {values})) AS d
+                WHERE products.id = d.product_id
+                """,
+                [v for pair in chunk for v in pair]
+            )
+        returned = self._set_trial_status(cursor, trial_ids, TrialLedgerEntry.STATUS_RETURNED)
+        # _patch_cached_stock() subtracts, so returned units are passed as negative
+        self.db.after_commit(lambda: self._patch_cached_stock({pid: -qty for pid, qty in units.items()}))
+        return returned
+
+    def _convert_trials_locked(self, cursor, trial_ids, payment_method, user_id):
+        trials = self._open_trials(cursor, trial_ids)
+        # One line per product and price
+        lines = {}
+        for product_id, price, _ in trials.values():
+            lines[(product_id, price)] = lines.get((product_id, price), 0) + 1
+        total_amount = round(sum(price * quantity for (_, price), quantity in lines.items()), 2)
+        # The sale belongs to a customer when all its trials do
+        customers = {customer_id for _, _, customer_id in trials.values()}
+        customer_id = customers.pop() if len(customers) == 1 else None
+
+        cursor.execute(INSERT_TRANSACTION.sql, (total_amount, payment_method, user_id, customer_id))
+        transaction_id = cursor.lastrowid
+        cursor.execute(UPSERT_DAILY_SALES.sql, (transaction_id,))
+        cursor.executemany(
+            INSERT_TRANSACTION_ITEM.sql,
+            ((transaction_id, product_id, quantity, price) for (product_id, price), quantity in lines.items())
+        )
+        cursor.execute(UPSERT_VENDOR_SALES.sql, (transaction_id,))
+        self._set_trial_status(cursor, trial_ids, TrialLedgerEntry.STATUS_PURCHASED)
+        return transaction_id
+
+    # --- Customer Queries ---
+
+    def get_or_create_customer(self, phone, name=None):
+        """
+        Returns the ID of the customer with this phone number (normalized),
+        creating it if needed; a given name replaces the stored one.
+        Returns None if the phone has no digits or on error.
+        """
+        try:
+            with self.db.transaction('get_or_create_customer') as cursor:
+                return self._customer_id_locked(cursor, phone, name)
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Customer lookup failed: {e}")
+            return None
+
+    def _customer_id_locked(self, cursor, phone, name=None):
+        phone = normalize_phone(phone)
+        if phone is None:
+            return None
+        name = (name or '').strip() or None
+        cursor.execute(UPSERT_CUSTOMER.sql, (phone, name))
+        cursor.execute(CUSTOMER_ID_BY_PHONE.sql, (phone,))
+        return cursor.fetchone()[0]
+
+    def find_customer_by_phone(self, phone, row_format=ROW_DICT):
+        """Exact lookup on the normalized phone; returns the customer row or None."""
+        phone = normalize_phone(phone)
+        if phone is None:
+            return None
+        return self.db.run(FIND_CUSTOMER_BY_PHONE, (phone,), row_format=row_format)
+
+    def search_customers_by_phone(self, prefix, limit=20, row_format=ROW_DICT):
+        """
+        Customers whose normalized phone starts with prefix, in phone order
+        (a range scan on the phone index). Returns a list (empty for no digits).
+        """
+        bounds = phone_prefix_range(prefix)
+        if bounds is None:
+            return []
+        return self.db.run(SEARCH_CUSTOMERS_BY_PHONE, bounds + (limit,), row_format=row_format) or []
+
+    def get_customer_history(self, customer_id, limit=50):
+        """
+        A customer's most recent trials (any status, with product details) and
+        sales, newest first, each read through the customer_id indexes.
+        :return: {'trials': [...], 'transactions': [...]}
+        """
+        return {
+            'trials': self.db.run(CUSTOMER_TRIAL_HISTORY, (customer_id, limit)) or [],
+            'transactions': self.db.run(CUSTOMER_TRANSACTIONS, (customer_id, limit)) or [],
+        }
+
+    def get_outstanding_trial_value(self, customer_id):
+        """Items the customer still has on trial and their total sell value: {'items', 'value'}."""
+        return self.db.run(OUTSTANDING_TRIAL_VALUE, (customer_id,)) or {'items': 0, 'value': 0.0}
+
+
+    # --- Overdue Trials ---
+
+    def scan_overdue_trials(self, max_age_days=None, batch_size=None, now=None):
+        """
+        Flags On_Trial entries taken more than max_age_days ago in the
+        overdue_trials table (which keeps store_stats.overdue_trials current).
+
+        The scan is incremental: it walks the partial On_Trial index in
+        (date_taken, id) order from the checkpoint saved by the previous run,
+        so each ledger entry is read once however often the scan is scheduled.
+        Entries closed since they were flagged, or reopened behind the
+        checkpoint, are handled by triggers (migration v9). Every batch is one
+        unit of work that also advances the checkpoint, so an interrupted
+        scan resumes where it stopped. Changing max_age_days starts over.
+
+        :param now: UTC datetime to measure ages from (defaults to now; date_taken is UTC).
+        :return: {'flagged', 'batches', 'reset', 'cutoff', 'checkpoint'} or None on failure.
+        """
+        max_age_days = config.TRIAL_OVERDUE_DAYS if max_age_days is None else max_age_days
+        batch_size = batch_size or config.OVERDUE_SCAN_BATCH
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        cutoff = (now - datetime.timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+        params = f"max_age_days={max_age_days}"
+        result = {'flagged': 0, 'batches': 0, 'reset': False, 'cutoff': cutoff, 'checkpoint': None}
+        try:
+            while True:
+                with self.db.transaction('scan_overdue_trials') as cursor:
+                    cursor.execute(GET_JOB_CHECKPOINT.sql, (OVERDUE_SCAN_JOB,))
+                    checkpoint = cursor.fetchone()
+                    if checkpoint is None or checkpoint[2] != params:
+                        # First run, or flagged entries were judged by another age
+                        cursor.execute(CLEAR_OVERDUE_TRIALS.sql)
+                        last_key, last_id = '', 0
+                        result['reset'] = checkpoint is not None
+                    else:
+                        last_key, last_id = checkpoint[0], checkpoint[1]
+                    cursor.execute(NEXT_OVERDUE_TRIALS.sql, (cutoff, last_key, last_id, batch_size))
+                    rows = [tuple(row) for row in cursor.fetchall()]
+                    if rows:
+                        cursor.executemany(FLAG_OVERDUE_TRIAL.sql, rows)
+                        last_key, last_id = rows[-1][3], rows[-1][0]
+                    cursor.execute(SAVE_JOB_CHECKPOINT.sql, (OVERDUE_SCAN_JOB, last_key, last_id, params))
+                result['flagged'] += len(rows)
+                result['batches'] += 1
+                result['checkpoint'] = (last_key, last_id)
+                if len(rows) < batch_size:
+                    break
+        except sqlite3.Error as e:
+            print(f"[DB ERROR] Overdue trial scan stopped after {result['flagged']} entries: {e}")
+            return None
+        if result['flagged'] or result['reset']:
+            print(f"[DB] Overdue trial scan: {result['flagged']} newly overdue (taken before {cutoff})")
+        return result
+
+    def get_overdue_trials(self, limit=50, after=None, row_format=ROW_DICT):
+        """
+        Flagged overdue trials, oldest first, with customer and product details.
+        Pass the (date_taken, trial_id) of the last row as after for the next page.
+        """
+        after_key, after_id = after or ('', 0)
+        return self.db.run(GET_OVERDUE_TRIALS, (after_key, after_id, limit), row_format=row_format) or []
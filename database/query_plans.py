@@ -0,0 +1,210 @@
+"""
+Query-plan regression check for every statement issued by Queries.
+
+Each public Queries method is exercised against a scratch in-memory database.
+Every SQL statement it runs is captured through the connection's trace
+callback (with bound values expanded) and passed through EXPLAIN QUERY PLAN.
+The check fails if any statement does a full table scan that is not listed
+in ALLOWED_SCANS, or if a public Queries method is not covered by EXERCISES.
+Every statement in the Queries statement registry is also explained on its
+own, so a registered statement that no exercise happens to reach is still
+checked (ALLOWED_STATEMENT_SCANS lists the accepted scans by statement name).
+The bulk import/export statements (database/bulk_io.py) are explained the same way.
+
+Usage: python -m database.query_plans   (exit status 1 on failure)
+"""
+import datetime
+import itertools
+import re
+import sys
+import types
+
+from database.bulk_io import BULK_STATEMENTS
+from database.db_handler import DatabaseHandler
+from database.migrations import CORE_INDEXES, CUSTOMER_INDEXES, INVENTORY_INDEXES, VENDOR_SORT_INDEXES
+from database.queries import STATEMENTS, Queries
+
+# (method name, args, kwargs) run in this order against the scratch database.
+EXERCISES = [
+    ("get_user_by_credentials", ("admin", "adminpass"), {}),
+    ("get_product_by_sku", ("BT-M-101",), {}),
+    ("lookup_sku", ("RH-L-102",), {}),
+    ("lookup_skus", (["BT-M-101", "JNS-32-103", "NOPE-1"],), {}),
+    ("warm_sku_cache", (), {}),
+    ("search_products", ("shirt",), {}),
+    ("search_products", ("M",), {}),
+    ("update_product", (1,), {"sell_price": 21.0}),
+    ("update_product_stock", (1, 1), {}),
+    ("create_transaction", (19.99, "Cash", 1, [(1, 1, 19.99), (3, 1, 79.0)]), {}),
+    ("checkout_for_trial", ("Asha", "555-0101", 2), {}),
+    ("checkout_for_trial", ("Ravi", "555-0102", 3), {}),
+    ("checkout_for_trial", ("Asha", "555-0101", 1), {}),
+    ("checkout_for_trial", ("Asha", "555-0101", 3), {}),
+    ("checkout_for_trial", ("Mina", "555-0103", 1), {}),
+    ("scan_overdue_trials", (), {"now": datetime.datetime(2999, 1, 1)}),
+    ("scan_overdue_trials", (), {"max_age_days": 30, "now": datetime.datetime(2999, 1, 1)}),
+    ("get_overdue_trials", (), {"after": ("2000-01-01 00:00:00", 1)}),
+    ("get_on_trial_items", (), {}),
+    ("return_trial_items", ([1],), {}),
+    ("update_trial_status", (1, "On_Trial"), {}),
+    ("convert_trials_to_sale", ([2], "Card", 1), {}),
+    ("return_trial_items", ([5],), {}),
+    ("settle_customer_trials", ("555-0101", 1), {"purchased_ids": [3]}),
+    ("get_or_create_customer", ("+1 555 0104",), {"name": "Lee"}),
+    ("find_customer_by_phone", ("555-0101",), {}),
+    ("search_customers_by_phone", ("555",), {}),
+    ("get_customer_history", (1,), {}),
+    ("get_outstanding_trial_value", (2,), {}),
+    ("get_total_sales_for_today", (), {}),
+    ("get_pending_trials_count", (), {}),
+    ("get_sales_totals", ("2000-01-01", "2999-12-31"), {"period": "week", "payment_method": "Cash"}),
+    ("rebuild_daily_sales", (), {}),
+    ("get_dashboard_stats", (), {}),
+    ("rebuild_store_stats", (), {"low_stock_threshold": 2}),
+    ("get_vendor_report", ("2000-01-01", "2999-12-31"), {"period": "month"}),
+    ("get_vendor_report", ("2000-01-01", "2999-12-31"), {"vendor_id": 1}),
+    ("get_top_vendors", ("2000-01-01", "2999-12-31"), {"limit": 5, "order_by": "margin"}),
+    ("rebuild_vendor_sales", (), {}),
+    ("list_products_page", (), {"sort": "name", "after": ("Jeans", 3)}),
+    ("list_products_page", (), {"sort": "stock", "after": (2, 2), "low_stock_only": True}),
+    ("list_products_page", (), {"sort": "vendor", "after": (1, "Blue", 1)}),
+    ("update_product", (2,), {"vendor_id": None}),
+    ("list_products_page", (), {"sort": "vendor", "after": (0, "A", 0), "limit": 1}),
+    ("list_products_page", (), {"vendor_id": 1, "search": "Je"}),
+    ("list_products_page", (), {"search": "shirt"}),
+    ("get_on_trial_items_page", (), {"after": ("2999-01-01 00:00:00", 99), "customer": "as", "phone": "555"}),
+    ("iter_on_trial_items", (), {"chunk_size": 1}),
+]
+
+# Methods that never touch SQL themselves.
+NOT_SQL = {"run_async"}
+
+# (method name, table) -> reason a full scan is acceptable.
+ALLOWED_SCANS = {
+    ("search_products", "products"): "LIKE fallback for queries shorter than the trigram minimum",
+    ("warm_sku_cache", "products"): "deliberately loads the catalogue into the SKU cache",
+    ("rebuild_daily_sales", "transactions"): "maintenance command that re-aggregates all history",
+    ("rebuild_store_stats", "products"): "maintenance command that recounts the catalogue",
+    ("rebuild_store_stats", "transactions"): "maintenance command that re-aggregates all history",
+    ("rebuild_vendor_sales", "transaction_items"): "maintenance command that re-aggregates all history",
+    ("scan_overdue_trials", "overdue_trials"): "first run or changed age clears the flagged list",
+}
+
+# (statement name, table) -> reason a full scan is acceptable.
+ALLOWED_STATEMENT_SCANS = {
+    ("search_products_like", "products"): ALLOWED_SCANS[("search_products", "products")],
+    ("warm_sku_cache", "products"): ALLOWED_SCANS[("warm_sku_cache", "products")],
+    ("rebuild_daily_sales", "transactions"): ALLOWED_SCANS[("rebuild_daily_sales", "transactions")],
+    ("refresh_store_stats", "products"): ALLOWED_SCANS[("rebuild_store_stats", "products")],
+    ("refresh_store_stats", "transactions"): ALLOWED_SCANS[("rebuild_store_stats", "transactions")],
+    ("rebuild_vendor_sales", "transaction_items"): ALLOWED_SCANS[("rebuild_vendor_sales", "transaction_items")],
+    ("clear_overdue_trials", "overdue_trials"): ALLOWED_SCANS[("scan_overdue_trials", "overdue_trials")],
+    ("vendor_keys", "vendors"): "bulk import loads the (small) vendor list once per run",
+}
+
+# Statements that have no plan worth checking ('--' marks SQLite's own
+# sub-statements from triggers and virtual tables).
+_SKIP = re.compile(r"^\s*(--|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA|INSERT\s+INTO\s+\w+\s*\([^)]*\)\s*VALUES)", re.I)
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def _table_of(detail, aliases):
+    """Maps a plan line like 'SCAN p' back to the real table name."""
+    match = _FULL_SCAN.match(detail)
+    if not match:
+        return None
+    name = match.group(1)
+    return aliases.get(name, name)
+
+
+def _aliases(sql):
+    """Collects 'FROM table alias' / 'JOIN table alias' pairs from a statement."""
+    found = {}
+    for table, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", sql, re.I):
+        if alias.upper() not in ("WHERE", "JOIN", "ON", "ORDER", "GROUP", "LIMIT", "LEFT", "INNER", "SET"):
+            found[alias] = table
+    return found
+
+
+def explain(conn, sql):
+    """Returns the EXPLAIN QUERY PLAN detail lines for sql."""
+    params = [None] * sql.count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def check_query_plans(verbose=False):
+    """
+    Runs the exercises and returns a list of failure messages (empty = pass).
+    """
+    failures = []
+    db = DatabaseHandler(":memory:")
+    db.setup_database()
+    queries = Queries(db)
+
+    # Every managed index must exist after setup
+    existing = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for name in list(CORE_INDEXES) + list(INVENTORY_INDEXES) + list(CUSTOMER_INDEXES) + list(VENDOR_SORT_INDEXES):
+        if name not in existing:
+            failures.append(f"Managed index {name} was not created")
+
+    public = {
+        name for name in dir(Queries)
+        if not name.startswith("_") and callable(getattr(Queries, name))
+    }
+    covered = {name for name, _, _ in EXERCISES}
+    for name in sorted(public - covered - NOT_SQL):
+        failures.append(f"Queries.{name} has no entry in EXERCISES")
+
+    for method_name, args, kwargs in EXERCISES:
+        captured = []
+        db.conn.set_trace_callback(captured.append)
+        try:
+            result = getattr(queries, method_name)(*args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                # Streaming APIs only run their SQL while being consumed
+                list(result)
+        finally:
+            db.conn.set_trace_callback(None)
+
+        for sql in captured:
+            if _SKIP.match(sql) or "sqlite_master" in sql:
+                continue
+            aliases = _aliases(sql)
+            for detail in explain(db.conn, sql):
+                if verbose:
+                    print(f"{method_name:<28} {detail}")
+                table = _table_of(detail, aliases)
+                if table is None or (method_name, table) in ALLOWED_SCANS:
+                    continue
+                statement = " ".join(sql.split())
+                failures.append(f"{method_name}: full scan of {table}\n    {statement}")
+
+    for statement in itertools.chain(STATEMENTS, BULK_STATEMENTS):
+        if _SKIP.match(statement.sql) or "sqlite_master" in statement.sql:
+            continue
+        aliases = _aliases(statement.sql)
+        for detail in explain(db.conn, statement.sql):
+            if verbose:
+                print(f"{'[' + statement.name + ']':<28} {detail}")
+            table = _table_of(detail, aliases)
+            if table is None or (statement.name, table) in ALLOWED_STATEMENT_SCANS:
+                continue
+            failures.append(f"statement {statement.name}: full scan of {table}")
+
+    db.close()
+    return failures
+
+
+def main():
+    verbose = "-v" in sys.argv[1:]
+    failures = check_query_plans(verbose=verbose)
+    if failures:
+        print(f"\n{len(failures)} query plan problem(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nAll Queries statements use an index or primary key.")
+
+
+if __name__ == "__main__":
+    main()
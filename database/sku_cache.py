@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+
+class SkuCache:
+    """
+    Bounded, thread-safe LRU cache of product rows keyed by SKU.
+
+    Used by the scanning path so an exact barcode hit never touches SQLite.
+    Entries are product dicts as returned by Queries.get_product_by_sku().
+    Writers keep it honest through invalidate_product()/patch_stock();
+    every invalidation bumps a generation counter so a row read from the
+    database before a concurrent write can never be stored after it.
+    """
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._entries = OrderedDict()  # sku -> product dict
+        self._sku_by_id = {}           # product id -> sku
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, sku):
+        """Returns a copy of the cached product for sku, or None."""
+        with self._lock:
+            product = self._entries.get(sku)
+            if product is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sku)
+            self.hits += 1
+            return dict(product)
+
+    def generation(self):
+        """Token to take before reading from the DB; pass it to put()."""
+        return self._generation
+
+    def put(self, product, generation=None):
+        """
+        Stores a product row. If generation is given and any invalidation has
+        happened since it was taken, the (possibly stale) row is discarded.
+        """
+        sku = product.get('sku')
+        if not sku:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store(sku, dict(product))
+
+    def put_many(self, products):
+        """Bulk insert used when warming the cache."""
+        with self._lock:
+            for product in products:
+                if product.get('sku'):
+                    self._store(product['sku'], dict(product))
+
+    def _store(self, sku, product):
+        """Inserts under the lock and evicts least recently used entries."""
+        old_sku = self._sku_by_id.get(product['id'])
+        if old_sku is not None and old_sku != sku:
+            self._entries.pop(old_sku, None)
+        self._entries[sku] = product
+        self._entries.move_to_end(sku)
+        self._sku_by_id[product['id']] = sku
+        while len(self._entries) > self.capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._sku_by_id.pop(evicted['id'], None)
+
+    def invalidate_product(self, product_id):
+        """Drops the entry for product_id (after an edit or unknown stock change)."""
+        with self._lock:
+            self._generation += 1
+            sku = self._sku_by_id.pop(product_id, None)
+            if sku is not None:
+                self._entries.pop(sku, None)
+
+    def patch_stock(self, product_id, quantity_change):
+        """Applies a committed stock change to the cached row, if present."""
+        with self._lock:
+            self._generation += 1
+            sku = self._sku_by_id.get(product_id)
+            if sku is not None:
+                self._entries[sku]['stock_quantity'] += quantity_change
+
+    def clear(self):
+        """Empties the cache (e.g. after bulk imports)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._sku_by_id.clear()
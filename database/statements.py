@@ -0,0 +1,70 @@
+"""
+Prepared-statement registry.
+
+Queries declares each fixed SQL statement once, together with whether it
+writes and what shape of result it returns. DatabaseHandler.run() executes a
+Statement without any per-call parsing of the SQL text, and because the text
+of a registered statement never changes, sqlite3's statement cache keeps it
+compiled between calls.
+"""
+
+READ = 'read'
+WRITE = 'write'
+
+# Result shapes
+ONE = 'one'        # first row as a dict, or None
+ALL = 'all'        # list of dicts
+SCALAR = 'scalar'  # first column of the first row, or None
+NONE = 'none'      # no result set; returns True
+
+# SQL text -> statement name across all registries (used by instrumentation)
+_NAMES_BY_SQL = {}
+
+
+def name_for_sql(sql):
+    """Name of the registered statement whose SQL is exactly sql, or None."""
+    return _NAMES_BY_SQL.get(sql)
+
+
+class Statement:
+    """A named SQL statement with its read/write kind and result shape."""
+    __slots__ = ('name', 'sql', 'kind', 'shape', 'is_write')
+
+    def __init__(self, name, sql, kind=READ, shape=ALL):
+        if kind not in (READ, WRITE):
+            raise ValueError(f"Unknown statement kind: {kind}")
+        if shape not in (ONE, ALL, SCALAR, NONE):
+            raise ValueError(f"Unknown result shape: {shape}")
+        self.name = name
+        # Normalised once here instead of on every call
+        self.sql = sql.strip()
+        self.kind = kind
+        self.shape = shape
+        self.is_write = kind == WRITE
+
+    def __repr__(self):
+        return f"Statement({self.name!r}, kind={self.kind!r}, shape={self.shape!r})"
+
+
+class StatementRegistry:
+    """Ordered collection of Statement objects, addressable by name."""
+    def __init__(self):
+        self._statements = {}
+
+    def register(self, name, sql, kind=READ, shape=ALL):
+        """Declares a statement; names must be unique."""
+        if name in self._statements:
+            raise ValueError(f"Statement already registered: {name}")
+        statement = Statement(name, sql, kind, shape)
+        self._statements[name] = statement
+        _NAMES_BY_SQL.setdefault(statement.sql, name)
+        return statement
+
+    def __getitem__(self, name):
+        return self._statements[name]
+
+    def __iter__(self):
+        return iter(self._statements.values())
+
+    def __len__(self):
+        return len(self._statements)
@@ -1,25 +1,32 @@
 import os
-from kivy.app import App
-from kivymd.app import MDApp
-from kivy.uix.screenmanager import ScreenManager
-# Import the Kivy Builder to manually load .kv files
-from kivy.lang import Builder 
-from kivy.core.window import Window # Import Window to set initial size
+import time
+
+# Taken before the Kivy imports so the startup report covers them too
+_PROCESS_STARTED = time.perf_counter()
+
+# Opt-in startup profiler (STORE_PROFILE_STARTUP=1 or "-- --profile-startup");
+# started before any heavy import so their cost shows up in the report.
+from utils import startup_profiler
+startup_profiler.start_if_requested()
+
+with startup_profiler.phase("kivy imports"):
+    from kivy.app import App
+    from kivymd.app import MDApp
+    from kivy.clock import Clock
+    from kivy.core.window import Window # Import Window to set initial size
 
 # Set the default window size (often helps prevent blank screens on initial run)
-Window.size = (400, 700) 
+with startup_profiler.phase("window size"):
+    Window.size = (400, 700) 
 
-# 1. Database and Query Imports
-from database.db_handler import DatabaseHandler
-from database.queries import Queries
+with startup_profiler.phase("app imports"):
+    # 1. Database and Query Imports
+    from database.db_handler import DatabaseHandler
+    from database.queries import Queries
+    from database.overdue_scanner import OverdueTrialScanner
 
-# 2. Screen Imports
-from screens.login_screen import LoginScreen
-from screens.dashboard import DashboardScreen
-from screens.inventory import InventoryScreen
-from screens.billing_screen import BillingScreen as PosScreen 
-from screens.ledger_screen import LedgerScreen
-from screens.reports_screen import ReportsScreen
+    # 2. Screens are imported on first navigation (see screens/registry.py)
+    from screens.registry import LazyScreenManager
 
 class ClothingStoreApp(MDApp):
     """
@@ -28,6 +35,7 @@ class ClothingStoreApp(MDApp):
     """
     db = None
     queries = None
+    overdue_scanner = None
     
     # User state properties
     user = None
@@ -39,49 +47,33 @@ class ClothingStoreApp(MDApp):
         self.theme_cls.accent_palette = "LightBlue"
         self.theme_cls.theme_style = "Light"
 
-        # --- 1. Load All KV Files Explicitly ---
-        kv_files_dir = os.path.join(os.path.dirname(__file__), "screens")
-        kv_files = [f for f in os.listdir(kv_files_dir) if f.endswith(".kv")]
-        
-        for kv_file in kv_files:
-            try:
-                # Ensure correct path is used for loading
-                Builder.load_file(os.path.join(kv_files_dir, kv_file))
-                print(f"[KV Loader] Loaded: {kv_file}")
-            except Exception as e:
-                print(f"[KV ERROR] Failed to load {kv_file}: {e}")
-                
-        # --- 2. Database Initialization ---
-        self._initialize_database()
-
-        # --- 3. Screen Manager Setup ---
-        sm = ScreenManager()
-        
-        # Instantiate all screens
-        login_screen = LoginScreen(name='login')
-        dashboard_screen = DashboardScreen(name='dashboard')
-        inventory_screen = InventoryScreen(name='inventory')
-        pos_screen = PosScreen(name='pos')
-        ledger_screen = LedgerScreen(name='ledger')
-        reports_screen = ReportsScreen(name='reports')
-        
-        # Inject dependencies into screens
-        screens = [login_screen, dashboard_screen, inventory_screen, pos_screen, ledger_screen, reports_screen]
-        for screen in screens:
-            screen.set_dependencies(self.db, self.queries)
-
-        # Add screens to the manager
-        sm.add_widget(login_screen)
-        sm.add_widget(dashboard_screen)
-        sm.add_widget(inventory_screen)
-        sm.add_widget(pos_screen)
-        sm.add_widget(ledger_screen)
-        sm.add_widget(reports_screen)
-
-        # Start on the login screen
-        sm.current = 'login'
+        build_started = time.perf_counter()
+
+        # --- 1. Database Initialization ---
+        with startup_profiler.phase("initialize database"):
+            self._initialize_database()
+
+        # --- 2. Screen Manager Setup ---
+        # Only the login screen (and its KV) is built now; every other screen
+        # is imported, loaded and wired when it is first shown.
+        with startup_profiler.phase("screen manager"):
+            sm = LazyScreenManager(self.db, self.queries)
+
+            # Start on the login screen
+            sm.current = 'login'
+
+        build_ms = (time.perf_counter() - build_started) * 1000.0
+        print(f"[Startup] build() took {build_ms:.1f} ms")
+        Clock.schedule_once(self._report_startup, 0)
         return sm
 
+    def _report_startup(self, dt):
+        """Runs on the first frame: total time from process start to a visible login screen."""
+        startup_ms = (time.perf_counter() - _PROCESS_STARTED) * 1000.0
+        print(f"[Startup] First frame {startup_ms:.1f} ms after process start")
+        startup_profiler.mark("first frame")
+        startup_profiler.finish(self.user_data_dir)
+
     def _initialize_database(self):
         """Initializes the database connection and queries."""
         # Use a path within the app's standard data directory
@@ -91,14 +83,32 @@ class ClothingStoreApp(MDApp):
         self.db = DatabaseHandler(db_path)
         
         # Create tables and initial data (if needed)
-        self.db.setup_database()
+        with startup_profiler.phase("setup_database"):
+            self.db.setup_database()
         
         # Instantiate the high-level queries interface
         self.queries = Queries(self.db)
+
+        # Background thread that screens use (via queries.run_async) for DB work
+        self.db.start_worker()
+
+        # Periodic overdue-trial scan on that worker (see database/overdue_scanner.py)
+        self.overdue_scanner = OverdueTrialScanner(self.queries, on_scan=self._on_overdue_scan)
+        self.overdue_scanner.start()
+
+    def _on_overdue_scan(self, result):
+        """Refreshes the dashboard figures when a scan flagged new overdue trials."""
+        if result['flagged'] or result['reset']:
+            if self.root is not None and self.root.current == 'dashboard':
+                self.root.current_screen.update_ui(0)
         
     def on_stop(self):
         """Called when the application stops."""
+        if self.overdue_scanner:
+            self.overdue_scanner.stop()
         if self.db:
+            if self.db.stats is not None:
+                self.db.stats.export(os.path.join(self.user_data_dir, 'db_stats.json'))
             self.db.close()
             print("[INFO] Database connection closed.")
             
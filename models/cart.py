@@ -0,0 +1,169 @@
+class CartLine:
+    """
+    One product line in the POS cart.
+    """
+    __slots__ = ('product_id', 'name', 'price', 'qty', 'stock_quantity')
+
+    def __init__(self, product_id: int, name: str, price: float, qty: int = 1, stock_quantity: int = 0):
+        """
+        :param product_id: ID of the product sold on this line.
+        :param name: Product name shown in the cart.
+        :param price: Unit sell price at the time it was added.
+        :param qty: Number of units.
+        :param stock_quantity: Stock known when the product was added (upper bound for qty).
+        """
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.qty = qty
+        self.stock_quantity = stock_quantity
+
+    @property
+    def total(self):
+        return round(self.qty * self.price, 2)
+
+    def __repr__(self):
+        return f"CartLine(product_id={self.product_id}, name='{self.name}', qty={self.qty}, price={self.price})"
+
+
+class Cart:
+    """
+    Ordered POS cart with an id -> line index and a running total.
+
+    Adding a product, changing a quantity and looking up a line or its row are
+    O(1); removing a line only shifts the rows after it, as the view's own
+    data list must. The total is kept in integer cents and adjusted by the
+    delta of each change, so it never needs re-summing.
+
+    Every change is reported to the listeners as listener(event, position,
+    line), where position is the line's row in display order, so a view can
+    refresh just that row:
+
+        ADDED    line appended at position
+        UPDATED  quantity of the line at position changed
+        REMOVED  line removed from position
+        CLEARED  cart emptied (position and line are None)
+    """
+    ADDED = 'added'
+    UPDATED = 'updated'
+    REMOVED = 'removed'
+    CLEARED = 'cleared'
+
+    def __init__(self):
+        self._lines = {}      # product_id -> CartLine, in insertion (display) order
+        self._positions = {}  # product_id -> display row
+        self._total_cents = 0
+        self._listeners = []
+
+    # --- Listeners ---
+
+    def bind(self, listener):
+        """Registers listener(event, position, line)."""
+        self._listeners.append(listener)
+
+    def unbind(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, event, position, line):
+        for listener in self._listeners:
+            listener(event, position, line)
+
+    # --- Queries ---
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def __contains__(self, product_id):
+        return product_id in self._lines
+
+    def get(self, product_id):
+        return self._lines.get(product_id)
+
+    @property
+    def total(self):
+        return self._total_cents / 100.0
+
+    @property
+    def unit_count(self):
+        return sum(line.qty for line in self._lines.values())
+
+    def position(self, product_id):
+        """Display row of the line for product_id, or None."""
+        return self._positions.get(product_id)
+
+    def items_list(self):
+        """Lines as [(product_id, quantity, price_at_sale), ...] for Queries.create_transaction()."""
+        return [(line.product_id, line.qty, line.price) for line in self._lines.values()]
+
+    # --- Changes ---
+
+    @staticmethod
+    def _cents(amount):
+        return int(round(amount * 100))
+
+    def add(self, product, qty=1):
+        """
+        Adds qty units of a product dict (id, name, sell_price, stock_quantity).
+        Returns the affected CartLine, or None if the stock would be exceeded.
+        """
+        line = self._lines.get(product['id'])
+        if line is not None:
+            return self.set_quantity(line.product_id, line.qty + qty)
+
+        stock = product.get('stock_quantity', 0)
+        if qty < 1 or stock < qty:
+            return None
+        line = CartLine(
+            product_id=product['id'],
+            name=product.get('name', 'Unknown Product'),
+            price=round(product.get('sell_price', 0.0), 2),
+            qty=qty,
+            stock_quantity=stock,
+        )
+        self._positions[line.product_id] = len(self._lines)
+        self._lines[line.product_id] = line
+        self._total_cents += self._cents(line.price) * qty
+        self._emit(self.ADDED, len(self._lines) - 1, line)
+        return line
+
+    def set_quantity(self, product_id, qty):
+        """
+        Sets the quantity of a line; 0 or less removes it.
+        Returns the line (None if it was removed, unknown, or stock is too low).
+        """
+        line = self._lines.get(product_id)
+        if line is None:
+            return None
+        if qty <= 0:
+            self.remove(product_id)
+            return None
+        if qty > line.stock_quantity:
+            return None
+        if qty != line.qty:
+            self._total_cents += self._cents(line.price) * (qty - line.qty)
+            line.qty = qty
+            self._emit(self.UPDATED, self.position(product_id), line)
+        return line
+
+    def remove(self, product_id):
+        """Removes the line for product_id; returns it (or None if absent)."""
+        if product_id not in self._lines:
+            return None
+        position = self._positions.pop(product_id)
+        line = self._lines.pop(product_id)
+        for key, row in self._positions.items():
+            if row > position:
+                self._positions[key] = row - 1
+        self._total_cents -= self._cents(line.price) * line.qty
+        self._emit(self.REMOVED, position, line)
+        return line
+
+    def clear(self):
+        self._lines.clear()
+        self._positions.clear()
+        self._total_cents = 0
+        self._emit(self.CLEARED, None, None)
@@ -0,0 +1,83 @@
+def normalize_phone(phone):
+    """
+    Canonical form of a phone number used as the customer key: digits only,
+    keeping a leading '+'. Returns None when nothing usable is left.
+    Also registered as the SQL function normalize_phone() (see migrations.py).
+    """
+    if phone is None:
+        return None
+    text = str(phone).strip()
+    digits = "".join(ch for ch in text if ch.isdigit())
+    if not digits:
+        return None
+    return "+" + digits if text.startswith("+") else digits
+
+
+def phone_prefix_range(prefix):
+    """
+    (low, high) bounds so that `phone >= low AND phone < high` matches every
+    normalized phone starting with prefix, served by the phone index.
+    Returns None if the prefix has no digits.
+    """
+    low = normalize_phone(prefix)
+    if low is None:
+        return None
+    # The last character is a digit, so its successor never overflows past ':'
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+class Customer:
+    """
+    Represents a store customer, identified by a normalized phone number.
+    Trial ledger entries and sales reference customers by ID.
+    Uses __slots__ so customer listings do not carry a __dict__ per row.
+    """
+    __slots__ = ('id', 'name', 'phone', 'created_at')
+
+    def __init__(self, id: int = None, name: str = None, phone: str = None, created_at: str = None):
+        """
+        Initializes a Customer object.
+
+        :param id: Primary key ID (None for new customers).
+        :param name: Customer name as last given.
+        :param phone: Phone number (stored normalized, see normalize_phone()).
+        :param created_at: Timestamp of the first visit.
+        """
+        self.id = id
+        self.name = name
+        self.phone = normalize_phone(phone)
+        self.created_at = created_at
+
+    @classmethod
+    def from_db_row(cls, row):
+        """
+        Creates a Customer from a database row. Rows with column names
+        (sqlite3.Row or dict) are mapped by name; plain tuples are
+        (id, name, phone, created_at).
+        """
+        if row is None:
+            return None
+        if hasattr(row, 'keys'):
+            columns = list(row.keys())
+            return cls.from_rows(columns, [tuple(row[column] for column in columns)])[0]
+        if len(row) == 4:
+            return cls(id=row[0], name=row[1], phone=row[2], created_at=row[3])
+        return None
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """
+        Bulk constructor used by DatabaseHandler when a query is run with
+        row_format=Customer. Columns without a matching attribute are ignored.
+        """
+        picks = [(index, column) for index, column in enumerate(columns) if column in cls.__slots__]
+        customers = []
+        for row in rows:
+            customer = cls()
+            for index, attribute in picks:
+                setattr(customer, attribute, row[index])
+            customers.append(customer)
+        return customers
+
+    def __repr__(self):
+        return f"Customer(id={self.id}, name='{self.name}', phone='{self.phone}')"
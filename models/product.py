@@ -1,11 +1,51 @@
+import math
+
+
+def _parse_number(record, field, kind, default=None):
+    """Reads field from an import record as kind (float/int); raises ValueError."""
+    value = record.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if default is None:
+            raise ValueError(f"missing {field}")
+        return default
+    # JSON true/false would otherwise pass as 1/0, and int() truncates 1.5
+    if isinstance(value, bool) or (kind is int and isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"{field} is not a valid {kind.__name__}: {value!r}")
+    try:
+        number = kind(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a valid {kind.__name__}: {value!r}") from None
+    # float() accepts "nan"/"inf" (and JSON NaN/Infinity); SQLite would store NaN as NULL
+    if not math.isfinite(number):
+        raise ValueError(f"{field} is not a finite number: {value!r}")
+    if number < 0:
+        raise ValueError(f"{field} cannot be negative: {value!r}")
+    return number
+
+
 class Product:
     """
     Represents an individual clothing item (Product) in the inventory.
     This class includes all necessary fields for inventory management and sales.
+    Uses __slots__ so large listings do not carry a __dict__ per product.
     """
+    __slots__ = ('id', 'vendor_id', 'name', 'barcode', 'size', 'color',
+                 'buy_price', 'sell_price', 'stock_quantity', 'vendor_name')
+
+    # Column names in the products table that differ from the attribute name
+    COLUMN_ALIASES = {'sku': 'barcode'}
+
+    # Column order of "SELECT * FROM products"
+    TABLE_COLUMNS = ('id', 'name', 'vendor_id', 'sku', 'buy_price', 'sell_price',
+                     'stock_quantity', 'size', 'color')
+
+    # Column order of Queries.search_products()
+    SEARCH_COLUMNS = ('id', 'name', 'sku', 'sell_price', 'stock_quantity', 'size', 'color')
+
     def __init__(self, id: int = None, vendor_id: int = None, name: str = None, 
                  barcode: str = None, size: str = None, color: str = None, 
-                 buy_price: float = 0.0, sell_price: float = 0.0, stock_quantity: int = 0):
+                 buy_price: float = 0.0, sell_price: float = 0.0, stock_quantity: int = 0,
+                 vendor_name: str = None):
         """
         Initializes a Product object.
 
@@ -18,6 +58,7 @@ class Product:
         :param buy_price: Cost price (for profit calculation).
         :param sell_price: Retail price.
         :param stock_quantity: Current quantity in stock.
+        :param vendor_name: Vendor name for display (from listing JOINs).
         """
         self.id = id
         self.vendor_id = vendor_id
@@ -28,6 +69,7 @@ class Product:
         self.buy_price = buy_price
         self.sell_price = sell_price
         self.stock_quantity = stock_quantity
+        self.vendor_name = vendor_name
 
     def to_tuple(self):
         """
@@ -39,28 +81,75 @@ class Product:
                 self.buy_price, self.sell_price, self.stock_quantity)
 
     @classmethod
-    def from_db_row(cls, row: tuple, full_details=True):
+    def from_db_row(cls, row, full_details=True):
+        """
+        Creates a Product object from a single database row.
+
+        Rows with column names (sqlite3.Row or dict) are mapped by name.
+        Plain tuples are positional:
+        If full_details=True, the order of "SELECT * FROM products" (TABLE_COLUMNS).
+        If full_details=False, the order of Queries.search_products() (SEARCH_COLUMNS).
         """
-        Creates a Product object from a database result row.
-        
-        If full_details=True (8 fields from Product table):
-        (id, vendor_id, name, barcode, size, color, buy_price, sell_price, stock_quantity)
-        
-        If full_details=False (for search results):
-        (id, name, barcode, size, sell_price, stock_quantity, vendor_name)
+        if row is None:
+            return None
+        if hasattr(row, 'keys'):
+            columns = list(row.keys())
+            return cls.from_rows(columns, [tuple(row[column] for column in columns)])[0]
+        columns = cls.TABLE_COLUMNS if full_details else cls.SEARCH_COLUMNS
+        if len(row) != len(columns):
+            return None
+        return cls.from_rows(columns, [row])[0]
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """
+        Bulk constructor used by DatabaseHandler when a query is run with
+        row_format=Product. Columns without a matching attribute are ignored.
+
+        :param columns: Column names of the result set, in order.
+        :param rows: Sequence of tuples in that column order.
+        """
+        picks = []
+        for index, column in enumerate(columns):
+            attribute = cls.COLUMN_ALIASES.get(column, column)
+            if attribute in cls.__slots__:
+                picks.append((index, attribute))
+        products = []
+        append = products.append
+        for row in rows:
+            product = cls()
+            for index, attribute in picks:
+                setattr(product, attribute, row[index])
+            append(product)
+        return products
+
+    @classmethod
+    def from_record(cls, record, vendor_id=None):
+        """
+        Validated Product from an import record (a CSV row of strings or a
+        decoded JSON object), as used by database/bulk_io.py.
+        Raises ValueError describing the first problem found.
+
+        :param record: Mapping with sku (or barcode), name, buy_price, sell_price
+                       and optionally stock_quantity, size, color.
+        :param vendor_id: Resolved vendor ID (the record's vendor is looked up by the caller).
         """
-        if full_details and len(row) >= 9:
-             return cls(id=row[0], vendor_id=row[1], name=row[2], barcode=row[3], size=row[4], 
-                        color=row[5], buy_price=row[6], sell_price=row[7], stock_quantity=row[8])
-        
-        # Handle partial data from search_products query (7 fields)
-        elif not full_details and len(row) == 7:
-            # Note: vendor_id, color, and buy_price are missing here, set to None/0.0
-            p = cls(id=row[0], name=row[1], barcode=row[2], size=row[3], sell_price=row[4], stock_quantity=row[5])
-            p.vendor_name = row[6] # Add vendor_name property for display
-            return p
-
-        return None
+        sku = str(record.get('sku') or record.get('barcode') or '').strip()
+        if not sku:
+            raise ValueError("missing sku")
+        name = str(record.get('name') or '').strip()
+        if not name:
+            raise ValueError("missing name")
+        return cls(
+            vendor_id=vendor_id,
+            name=name,
+            barcode=sku,
+            size=str(record.get('size') or '').strip() or None,
+            color=str(record.get('color') or '').strip() or None,
+            buy_price=_parse_number(record, 'buy_price', float),
+            sell_price=_parse_number(record, 'sell_price', float),
+            stock_quantity=_parse_number(record, 'stock_quantity', int, default=0),
+        )
 
     def __repr__(self):
         return f"Product(id={self.id}, name='{self.name}', barcode='{self.barcode}', stock={self.stock_quantity})"
\ No newline at end of file
@@ -2,14 +2,18 @@ class TrialLedgerEntry:
     """
     Represents an entry in the Trial Ledger (New Feature).
     Tracks items that have been taken out by a customer without immediate payment.
+    Uses __slots__ so long ledger listings do not carry a __dict__ per entry.
     """
+    __slots__ = ('id', 'customer_name', 'customer_phone', 'product_id', 'date_taken',
+                 'status', 'product_name', 'product_price', 'customer_id')
+
     STATUS_ON_TRIAL = 'On_Trial'
     STATUS_RETURNED = 'Returned'
     STATUS_PURCHASED = 'Purchased'
 
     def __init__(self, id: int = None, customer_name: str = None, customer_phone: str = None,
                  product_id: int = None, date_taken: str = None, status: str = STATUS_ON_TRIAL,
-                 product_name: str = None, product_price: float = 0.0):
+                 product_name: str = None, product_price: float = 0.0, customer_id: int = None):
         """
         Initializes a Trial Ledger Entry object.
 
@@ -21,6 +25,7 @@ class TrialLedgerEntry:
         :param status: Current status ('On_Trial', 'Returned', 'Purchased').
         :param product_name: Name of the product (fetched via JOIN).
         :param product_price: Sell price of the product (fetched via JOIN).
+        :param customer_id: ID in the customers table (None for entries without a phone).
         """
         self.id = id
         self.customer_name = customer_name
@@ -32,6 +37,7 @@ class TrialLedgerEntry:
         # Denormalized fields for UI display (from JOIN query in queries.py)
         self.product_name = product_name
         self.product_price = product_price 
+        self.customer_id = customer_id
 
     def to_tuple(self):
         """
@@ -41,12 +47,17 @@ class TrialLedgerEntry:
         return (self.customer_name, self.customer_phone, self.product_id) # date_taken and status are added in queries.py
 
     @classmethod
-    def from_db_row(cls, row: tuple):
+    def from_db_row(cls, row):
         """
         Creates a TrialLedgerEntry object from a database result row.
-        Assumes the row comes from Queries.get_on_trial_items():
+        Assumes the row comes from Queries.get_on_trial_items(); rows with
+        column names (sqlite3.Row or dict) are mapped by name, plain tuples are
         (tl.id, tl.customer_name, tl.customer_phone, tl.date_taken, p.name, p.size, p.color, p.sell_price, p.id as product_id)
         """
+        if row is None:
+            return None
+        if hasattr(row, 'keys'):
+            return cls.from_dict(row)
         if len(row) == 9:
             # Extract data from the joined query result
             ledger_id, cust_name, cust_phone, date_taken, prod_name, size, color, sell_price, product_id = row
@@ -66,5 +77,47 @@ class TrialLedgerEntry:
             )
         return None
 
+    @classmethod
+    def from_dict(cls, row: dict):
+        """
+        Creates a TrialLedgerEntry from a dict row as returned by
+        Queries.get_on_trial_items_page() (same columns as get_on_trial_items()).
+        """
+        return cls(
+            id=row['id'],
+            customer_name=row['customer_name'],
+            customer_phone=row['customer_phone'],
+            product_id=row['product_id'],
+            date_taken=row['date_taken'],
+            status=cls.STATUS_ON_TRIAL,
+            product_name=f"{row['name']} ({row['color']}/{row['size']})",
+            product_price=row['sell_price']
+        )
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """
+        Bulk constructor used by DatabaseHandler when a query shaped like
+        get_on_trial_items() is run with row_format=TrialLedgerEntry.
+        """
+        index = {column: position for position, column in enumerate(columns)}
+        i_id, i_name, i_phone = index['id'], index['customer_name'], index['customer_phone']
+        i_date, i_product = index['date_taken'], index['product_id']
+        i_pname, i_size, i_color, i_price = index['name'], index['size'], index['color'], index['sell_price']
+        on_trial = cls.STATUS_ON_TRIAL
+        return [
+            cls(
+                id=row[i_id],
+                customer_name=row[i_name],
+                customer_phone=row[i_phone],
+                product_id=row[i_product],
+                date_taken=row[i_date],
+                status=on_trial,
+                product_name=f"{row[i_pname]} ({row[i_color]}/{row[i_size]})",
+                product_price=row[i_price]
+            )
+            for row in rows
+        ]
+
     def __repr__(self):
         return f"TrialLedgerEntry(id={self.id}, customer='{self.customer_name}', item='{self.product_name}', status='{self.status}')"
\ No newline at end of file
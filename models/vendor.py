@@ -3,8 +3,15 @@ class Vendor:
     Represents a Vendor (supplier) in the Clothing Store application.
     This class is used to structure data fetched from the database
     and to pass structured data to the Queries layer for insertion/update.
+    Uses __slots__ so vendor listings do not carry a __dict__ per row.
     """
-    def __init__(self, id: int = None, name: str = None, contact_info: str = None, total_items_supplied: int = 0):
+    __slots__ = ('id', 'name', 'contact_info', 'phone', 'total_items_supplied')
+
+    # Column names in the vendors table that differ from the attribute name
+    COLUMN_ALIASES = {'contact_person': 'contact_info'}
+
+    def __init__(self, id: int = None, name: str = None, contact_info: str = None, total_items_supplied: int = 0,
+                 phone: str = None):
         """
         Initializes a Vendor object.
 
@@ -12,10 +19,12 @@ class Vendor:
         :param name: Vendor company name (required).
         :param contact_info: Contact details (e.g., phone, email).
         :param total_items_supplied: Calculated field from the DB (read-only for model).
+        :param phone: Vendor phone number.
         """
         self.id = id
         self.name = name
         self.contact_info = contact_info
+        self.phone = phone
         self.total_items_supplied = total_items_supplied
 
     def to_tuple(self, include_id=False):
@@ -29,12 +38,18 @@ class Vendor:
         return data
 
     @classmethod
-    def from_db_row(cls, row: tuple):
+    def from_db_row(cls, row):
         """
         Creates a Vendor object from a database result row.
-        Assumes the DB query returns fields in this order:
+        Rows with column names (sqlite3.Row or dict) are mapped by name.
+        Plain tuples are assumed to be in this order:
         (id, name, contact_info, total_items_supplied)
         """
+        if row is None:
+            return None
+        if hasattr(row, 'keys'):
+            columns = list(row.keys())
+            return cls.from_rows(columns, [tuple(row[column] for column in columns)])[0]
         if len(row) == 4:
             return cls(id=row[0], name=row[1], contact_info=row[2], total_items_supplied=row[3])
         # Handle simple fetch (e.g., SELECT id, name)
@@ -42,5 +57,41 @@ class Vendor:
             return cls(id=row[0], name=row[1])
         return None
 
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """
+        Bulk constructor used by DatabaseHandler when a query is run with
+        row_format=Vendor. Columns without a matching attribute are ignored.
+        """
+        picks = []
+        for index, column in enumerate(columns):
+            attribute = cls.COLUMN_ALIASES.get(column, column)
+            if attribute in cls.__slots__:
+                picks.append((index, attribute))
+        vendors = []
+        for row in rows:
+            vendor = cls()
+            for index, attribute in picks:
+                setattr(vendor, attribute, row[index])
+            vendors.append(vendor)
+        return vendors
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Validated Vendor from an import record (CSV row or JSON object) with
+        name and optionally contact_person (or contact_info) and phone.
+        Raises ValueError if the name is missing.
+        """
+        name = str(record.get('name') or '').strip()
+        if not name:
+            raise ValueError("missing name")
+        contact = record.get('contact_person') or record.get('contact_info')
+        return cls(
+            name=name,
+            contact_info=str(contact).strip() if contact else None,
+            phone=str(record.get('phone') or '').strip() or None,
+        )
+
     def __repr__(self):
-        return f"Vendor(id={self.id}, name='{self.name}', contact='{self.contact_info[:20]}...')"
\ No newline at end of file
+        return f"Vendor(id={self.id}, name='{self.name}', contact='{(self.contact_info or '')[:20]}...')"
\ No newline at end of file
@@ -1,11 +1,13 @@
 # screens/billing_screen.py
 
 from kivymd.uix.screen import MDScreen
-from kivy.properties import ObjectProperty, StringProperty, ListProperty
+from kivy.properties import ObjectProperty, StringProperty, ListProperty, BooleanProperty
 from kivymd.uix.list import TwoLineListItem
 from kivymd.app import MDApp
 from kivy.clock import Clock # Used for debounce/scheduling
 
+from models.cart import Cart
+
 class BillingScreen(MDScreen):
     """
     Screen dedicated to Point of Sale (POS) operations (imported as PosScreen in main.py).
@@ -15,11 +17,35 @@ class BillingScreen(MDScreen):
     
     # State Management for POS
     search_query = StringProperty("")
-    # Stores items as a list of dictionaries: [{'id': 101, 'name': 'T-Shirt', 'price': 19.99, 'qty': 1, 'total': 19.99}]
-    cart_items = ListProperty([])
+    # Formatted cart total, kept current from the cart's change events
+    cart_total = StringProperty("0.00")
     # Search results for product list
     search_results = ListProperty([])
+    # True while a sale is being committed on the DB worker. The cart is locked
+    # meanwhile (the submitted lines are cleared on success); scans keep
+    # queueing and are added to the next cart once the sale is settled.
+    checkout_in_progress = BooleanProperty(False)
+    # Enter in the search field queues the text as a barcode scan (see submit_scan)
+    scanner_mode = BooleanProperty(True)
+    # Feedback for the last scan batch (e.g. unknown codes)
+    scan_status = StringProperty("")
+
+    # Free-text search debounce bounds (seconds); the delay adapts to typing speed
+    SEARCH_DEBOUNCE_MIN = 0.15
+    SEARCH_DEBOUNCE_MAX = 0.5
     
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # The cart model owns the lines; the cart RecycleView's data is patched
+        # row by row from its events instead of being rebuilt on every change.
+        self.cart = Cart()
+        self.cart.bind(self._on_cart_changed)
+        # Scans waiting to be resolved, in arrival order
+        self._scan_queue = []
+        self._scan_in_flight = False
+        self._last_keystroke = None
+        self._typing_gap = None
+
     def set_dependencies(self, db_handler, queries_handler):
         """Method called from main.py to inject DB and Queries objects."""
         self.db = db_handler
@@ -32,85 +58,223 @@ class BillingScreen(MDScreen):
         
     def reset_cart(self):
         """Clears the current transaction cart."""
-        self.cart_items = []
+        self.cart.clear()
         
+    def _cart_locked(self):
+        """True (with a message) while a checkout owns the cart."""
+        if self.checkout_in_progress:
+            print("Checkout in progress: the cart cannot be changed until it finishes.")
+        return self.checkout_in_progress
+
     def add_item_to_cart(self, product_data):
         """Adds a selected item to the cart, handling quantity updates."""
-        
-        # We need to create a deep copy of cart_items to modify and reassign
-        # it, which correctly triggers the Kivy ListProperty update.
-        temp_cart = list(self.cart_items)
-        found = False
-        
-        # Check if the item is already in the cart
-        for item in temp_cart:
-            # Assuming product_data has a unique identifier like 'id'
-            if item['id'] == product_data['id']:
-                if item.get('stock_quantity', 0) < item['qty'] + 1:
-                    print(f"Cannot add more {item['name']}: low stock ({item.get('stock_quantity')})")
-                    return
-                item['qty'] += 1
-                item['total'] = round(item['qty'] * item['price'], 2)
-                found = True
-                break
-                
-        if not found:
-            stock_qty = product_data.get('stock_quantity', 0)
-            if stock_qty < 1:
+        if self._cart_locked():
+            return
+        line = self.cart.add(product_data)
+        if line is None:
+            existing = self.cart.get(product_data.get('id'))
+            if existing:
+                print(f"Cannot add more {existing.name}: low stock ({existing.stock_quantity})")
+            else:
                 print(f"Out of stock: {product_data.get('name')}")
-                return
-            # Add new item
-            new_item = {
-                'id': product_data.get('id', 0),
-                'name': product_data.get('name', 'Unknown Product'),
-                'price': round(product_data.get('sell_price', 0.0), 2),
-                'qty': 1,
-                'total': round(product_data.get('sell_price', 0.0), 2),
-                'stock_quantity': stock_qty,
-            }
-            temp_cart.append(new_item)
-            
-        # Reassign the temporary list to trigger the Kivy ListProperty update
-        self.cart_items = temp_cart
-        
-        print(f"Item added: {product_data.get('name')}. Current items in cart: {len(self.cart_items)}")
+            return
+
+        print(f"Item added: {product_data.get('name')}. Current items in cart: {len(self.cart)}")
+
+    def change_item_quantity(self, product_id, delta):
+        """Adds delta units to a cart line (removing it when it reaches zero)."""
+        if self._cart_locked():
+            return
+        line = self.cart.get(product_id)
+        if line is None:
+            return
+        if self.cart.set_quantity(product_id, line.qty + delta) is None and line.qty + delta > 0:
+            print(f"Cannot add more {line.name}: low stock ({line.stock_quantity})")
+
+    def remove_item_from_cart(self, product_id):
+        """Drops a whole line from the cart."""
+        if self._cart_locked():
+            return
+        self.cart.remove(product_id)
         
     def get_cart_total(self):
-        """Calculates the total price of all items in the cart."""
-        total = sum(item['total'] for item in self.cart_items)
-        return f"{total:.2f}"
+        """Returns the running cart total, formatted."""
+        return f"{self.cart.total:.2f}"
+
+    @staticmethod
+    def _cart_row(line):
+        """RecycleView data for one cart line."""
+        return {
+            'product_id': line.product_id,
+            'text': line.name,
+            'secondary_text': f"x{line.qty} @ ${line.price:.2f} = ${line.total:.2f}",
+        }
+
+    def _on_cart_changed(self, event, position, line):
+        """Mirrors one cart change into the cart list and the total label."""
+        self.cart_total = self.get_cart_total()
+        if 'cart_rv' not in self.ids:
+            return
+        data = self.ids.cart_rv.data
+        if event == Cart.ADDED:
+            data.append(self._cart_row(line))
+        elif event == Cart.UPDATED:
+            data[position] = self._cart_row(line)
+        elif event == Cart.REMOVED:
+            del data[position]
+        else:
+            self.ids.cart_rv.data = []
 
 
     def process_search(self, query):
         """
-        Handles the product search input using debounce.
+        Handles the product search input using an adaptive debounce: fast
+        typists get results sooner, slow typists are not searched mid-word.
         """
         self.search_query = query
         # Cancel any previous scheduled search
         Clock.unschedule(self._perform_search)
-        # Schedule the search to run after 0.5 seconds of no new input
-        Clock.schedule_once(self._perform_search, 0.5)
+        if not query:
+            self._last_keystroke = None
+            return
+        Clock.schedule_once(self._perform_search, self._search_delay())
+
+    def _search_delay(self):
+        """Debounce delay from a moving average of the gaps between keystrokes."""
+        now = Clock.get_boottime()
+        if self._last_keystroke is not None:
+            gap = min(now - self._last_keystroke, self.SEARCH_DEBOUNCE_MAX)
+            self._typing_gap = gap if self._typing_gap is None else 0.7 * self._typing_gap + 0.3 * gap
+        self._last_keystroke = now
+        if self._typing_gap is None:
+            return self.SEARCH_DEBOUNCE_MAX
+        return min(max(2 * self._typing_gap, self.SEARCH_DEBOUNCE_MIN), self.SEARCH_DEBOUNCE_MAX)
+
+    # --- Barcode scanning ---
+
+    def submit_scan(self, text):
+        """
+        Called on Enter in the search field (barcode scanners send one after
+        each code). In scanner mode the code is queued and the field cleared
+        at once, so the next scan can start immediately; queued codes are
+        resolved in batches by _flush_scans().
+        """
+        code = text.strip()
+        Clock.unschedule(self._perform_search)
+        if not self.scanner_mode:
+            # Plain search field: Enter just skips the debounce
+            self._perform_search(0)
+            return
+        self.search_query = ""  # any free-text result still in flight is now stale
+        self.ids.search_input.text = ""
+        if not code:
+            return
+        self._scan_queue.append(code)
+        # Every code that arrives before the next frame joins the same batch
+        Clock.unschedule(self._flush_scans)
+        Clock.schedule_once(self._flush_scans, 0)
+
+    def _flush_scans(self, dt=0):
+        """
+        Resolves all queued scans with one lookup (one batch in flight at a
+        time). Scans stay queued while a checkout is in progress.
+        """
+        if self._scan_in_flight or self.checkout_in_progress or not self._scan_queue or not self.queries:
+            return
+        codes, self._scan_queue = self._scan_queue, []
+
+        # Every code already cached: apply now, without a DB round trip
+        cache = self.queries.sku_cache
+        cached = {}
+        for code in codes:
+            product = cache.get(code)
+            if product is None:
+                break
+            cached[code] = product
+        else:
+            self._apply_scans(codes, cached)
+            return
+
+        self._scan_in_flight = True
+        self.queries.run_async(
+            self.queries.lookup_skus, codes,
+            callback=lambda found: self._on_scans_resolved(codes, found),
+            error_callback=lambda error: self._on_scans_resolved(codes, {})
+        )
+
+    def _on_scans_resolved(self, codes, found):
+        """Main-thread continuation of _flush_scans."""
+        self._scan_in_flight = False
+        self._apply_scans(codes, found)
+        # Scans that arrived while this batch was in flight
+        if self._scan_queue:
+            self._flush_scans()
+
+    def _apply_scans(self, codes, found):
+        """Adds scanned products to the cart in scan order and reports unknown codes."""
+        unknown = []
+        for code in codes:
+            product = found.get(code)
+            if product:
+                self.add_item_to_cart(product)
+            else:
+                unknown.append(code)
+        if unknown:
+            self.scan_status = f"Unknown code(s): {', '.join(unknown)}"
+            print(f"Unknown scanned code(s): {unknown}")
+        else:
+            self.scan_status = f"Scanned {len(codes)} item(s)"
 
     def _perform_search(self, dt):
         """Performs the actual product search based on search_query."""
         if self.search_query and self.queries:
-            results = self.queries.search_products(self.search_query)
-            
-            print(f"Search results for '{self.search_query}': {len(results)} found.")
-            
-            # Auto-add if exact match (e.g., successful SKU scan)
-            if len(results) == 1:
-                self.add_item_to_cart(results[0])
-                # Clear search query field after successful scan/match
-                self.ids.search_input.text = ""
-            
-            self.search_results = results
+            # Scanner fast path: an exact SKU already in the cache is added
+            # immediately, without a DB round trip.
+            product = self.queries.sku_cache.get(self.search_query.strip())
+            if product:
+                self._on_search_results(self.search_query, [product])
+                return
+
+            # The query runs on the DB worker; results come back via Clock.
+            self.queries.run_async(
+                self._resolve_search, self.search_query,
+                callback=lambda results, query=self.search_query: self._on_search_results(query, results)
+            )
+
+    def _resolve_search(self, query):
+        """Runs on the DB worker: exact SKU lookup first, fuzzy search otherwise."""
+        product = self.queries.lookup_sku(query.strip())
+        if product:
+            return [product]
+        return self.queries.search_products(query)
+
+    def _on_search_results(self, query, results):
+        """Applies search results on the main thread (ignores stale queries)."""
+        if query != self.search_query:
+            return
+
+        print(f"Search results for '{query}': {len(results)} found.")
+        
+        # Auto-add if exact match (e.g., successful SKU scan)
+        if len(results) == 1:
+            self.add_item_to_cart(results[0])
+            # Clear search query field after successful scan/match
+            self.ids.search_input.text = ""
+        
+        self.search_results = results
         
     def complete_transaction(self):
         """Completes the real sale transaction."""
-        if not self.cart_items:
+        if not len(self.cart):
             print("Cannot complete transaction: Cart is empty.")
             return
+        if self.checkout_in_progress:
+            print("Transaction already in progress.")
+            return
+        if self._scan_in_flight or self._scan_queue:
+            # Scanned items still on their way must not miss this sale
+            print("Still resolving scanned items; try again in a moment.")
+            return
         
         from kivymd.app import MDApp
         app = MDApp.get_running_app()
@@ -118,19 +282,35 @@ class BillingScreen(MDScreen):
             print("No logged in user.")
             return
         
-        total_amount = sum(item['total'] for item in self.cart_items)
-        items_list = [(item['id'], item['qty'], item['price']) for item in self.cart_items]
+        total_amount = self.cart.total
+        items_list = self.cart.items_list()
         payment_method = "Cash"  # TODO: Add payment method selector
         user_id = app.user['id']
         
-        transaction_id = self.queries.create_transaction(
-            total_amount, payment_method, user_id, items_list
+        # The commit happens on the DB worker so a slow fsync cannot freeze the till.
+        self.checkout_in_progress = True
+        self.queries.run_async(
+            self.queries.create_transaction, total_amount, payment_method, user_id, items_list,
+            callback=lambda transaction_id: self._on_transaction_done(transaction_id, total_amount),
+            error_callback=self._on_transaction_error
         )
+
+    def _on_transaction_done(self, transaction_id, total_amount):
+        """Main-thread continuation of complete_transaction."""
+        self.checkout_in_progress = False
         if transaction_id:
             print(f"Transaction #{transaction_id} completed! Total: ${total_amount:.2f}")
             self.reset_cart()
         else:
             print("Transaction failed (e.g., insufficient stock or DB error).")
+        # Codes scanned during the checkout go into the (new or kept) cart
+        self._flush_scans()
+
+    def _on_transaction_error(self, error):
+        """An unexpected error on the DB worker: unlock the till and keep the cart for a retry."""
+        self.checkout_in_progress = False
+        print(f"Transaction failed: {error}")
+        self._flush_scans()
             
     def go_back_to_dashboard(self):
         """Navigates back to the dashboard screen."""
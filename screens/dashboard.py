@@ -35,12 +35,17 @@ class DashboardScreen(MDScreen):
         
         # 2. Update Stats (Fix 3: Populating data from DB)
         if self.queries:
-            sales_today = self.queries.get_total_sales_for_today()
-            pending_trials_count = self.queries.get_pending_trials_count()
+            # A single store_stats row read, done on the DB worker so entering
+            # the dashboard never blocks a frame; labels are filled in the callback.
+            self.queries.run_async(self.queries.get_dashboard_stats, callback=self._apply_stats)
         else:
             # Fallback for development if queries object is not yet set
-            sales_today = 0.00
-            pending_trials_count = 0
+            self._apply_stats({})
+
+    def _apply_stats(self, stats):
+        """Runs on the main thread: pushes the figures into the UI labels."""
+        sales_today = stats.get('sales_today', 0.0)
+        pending_trials_count = stats.get('pending_trials', 0)
 
         # Update UI Labels
         if 'sales_today' in self.ids:
@@ -50,6 +55,18 @@ class DashboardScreen(MDScreen):
         if 'pending_trials' in self.ids:
             self.ids.pending_trials.text = f"{pending_trials_count} items"
 
+        if 'stock_units' in self.ids:
+            self.ids.stock_units.text = f"{stats.get('total_units', 0):,} units"
+
+        if 'inventory_value' in self.ids:
+            self.ids.inventory_value.text = f"${stats.get('inventory_value', 0.0):,.2f}"
+
+        if 'low_stock' in self.ids:
+            self.ids.low_stock.text = f"{stats.get('low_stock_count', 0)} products"
+
+        if 'overdue_trials' in self.ids:
+            self.ids.overdue_trials.text = f"{stats.get('overdue_trials', 0)} items"
+
     def logout(self):
         """Resets user state and navigates back to the login screen."""
         app = MDApp.get_running_app()
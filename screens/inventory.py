@@ -1,16 +1,38 @@
 from kivymd.uix.screen import MDScreen
+from kivy.clock import Clock
+from kivy.properties import StringProperty, BooleanProperty
 
 class InventoryScreen(MDScreen):
     """
     Screen for managing product inventory: viewing stock, adding new products,
     and adjusting stock levels.
+
+    The product list is a RecycleView fed page by page from
+    Queries.list_products_page(): only the first page is loaded on enter, and
+    the next one is fetched (on the DB worker) when the user scrolls near the
+    end, so start-up cost and widget count do not depend on catalogue size.
     """
     name = 'inventory'
 
+    # Rows fetched per page
+    page_size = 50
+    # Fetch the next page when the scroll position gets this close to the bottom (0..1)
+    prefetch_threshold = 0.15
+
+    sort_key = StringProperty('name')
+    search_text = StringProperty('')
+    loading = BooleanProperty(False)
+
+    SORT_ORDER = ('name', 'stock', 'vendor')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.db_handler = None
         self.queries = None
+        self._next_cursor = None
+        self._exhausted = False
+        # Incremented on every reload so pages of an outdated listing are dropped
+        self._generation = 0
 
     def set_dependencies(self, db_handler, queries):
         """Injects database dependencies."""
@@ -20,4 +42,83 @@ class InventoryScreen(MDScreen):
     def on_enter(self):
         """Load initial data when screen is entered."""
         print("Inventory Screen entered.")
-        # Future implementation: Load all products for display
\ No newline at end of file
+        self.load_inventory()
+
+    def on_kv_post(self, base_widget):
+        super().on_kv_post(base_widget)
+        self.ids.inventory_rv.bind(scroll_y=self._on_scroll)
+
+    def load_inventory(self):
+        """(Re)loads the listing from the first page with the current sort/filter."""
+        self._generation += 1
+        self._next_cursor = None
+        self._exhausted = False
+        self.loading = False
+        self.ids.inventory_rv.data = []
+        self._load_next_page()
+
+    def search_inventory(self, text):
+        """Debounced filter from the search field."""
+        self.search_text = text.strip()
+        Clock.unschedule(self._reload_from_search)
+        Clock.schedule_once(self._reload_from_search, 0.3)
+
+    def _reload_from_search(self, dt):
+        self.load_inventory()
+
+    def cycle_sort(self):
+        """Switches between name, stock and vendor ordering."""
+        index = self.SORT_ORDER.index(self.sort_key)
+        self.sort_key = self.SORT_ORDER[(index + 1) % len(self.SORT_ORDER)]
+        self.load_inventory()
+
+    def show_add_product_dialog(self):
+        """Placeholder for the add-product form."""
+        print("Add Product dialog is not implemented yet.")
+
+    def _on_scroll(self, rv, scroll_y):
+        # scroll_y is 1 at the top and 0 at the bottom
+        if scroll_y <= self.prefetch_threshold:
+            self._load_next_page()
+
+    def _load_next_page(self):
+        """Requests the next page on the DB worker (no-op while one is in flight)."""
+        if self.loading or self._exhausted or not self.queries:
+            return
+        self.loading = True
+        generation = self._generation
+        self.queries.run_async(
+            self.queries.list_products_page,
+            sort=self.sort_key,
+            after=self._next_cursor,
+            limit=self.page_size,
+            search=self.search_text or None,
+            callback=lambda page: self._append_page(generation, page),
+            error_callback=lambda error: self._on_page_error(generation, error)
+        )
+
+    def _on_page_error(self, generation, error):
+        """Main thread: a page fetch failed; allow the next scroll to retry it."""
+        if generation != self._generation:
+            return
+        self.loading = False
+        print(f"Failed to load inventory page: {error}")
+
+    def _append_page(self, generation, page):
+        """Main thread: appends one page of rows to the RecycleView."""
+        if generation != self._generation:
+            return
+        self.loading = False
+        self._next_cursor = page['next_cursor']
+        self._exhausted = self._next_cursor is None
+        self.ids.inventory_rv.data.extend(
+            {
+                'viewclass': 'InventoryListItem',
+                'text': f"{row['name']} ({row['size'] or '-'}/{row['color'] or '-'})",
+                'secondary_text': (
+                    f"SKU: {row['sku']} | Qty: {row['stock_quantity']} | "
+                    f"${row['sell_price']:.2f} | {row['vendor_name'] or 'No vendor'}"
+                ),
+            }
+            for row in page['rows']
+        )
@@ -1,13 +1,37 @@
 from kivymd.uix.screen import MDScreen
-from kivy.properties import ObjectProperty
+from kivy.clock import Clock
+from kivy.properties import ObjectProperty, StringProperty, BooleanProperty
+
+from models.customer import normalize_phone
 
 class LedgerScreen(MDScreen):
     """
     Screen dedicated to managing trial balances and customer credits/debits.
+
+    Open trials are loaded page by page through Queries.get_on_trial_items_page():
+    the first page renders as soon as the screen is entered and further pages
+    are fetched on the DB worker when the list is scrolled near its end.
     """
     db = ObjectProperty(None)
     queries = ObjectProperty(None)
 
+    # Text of the filter field: a phone number (any punctuation) filters by phone
+    # prefix, anything containing letters by name
+    filter_text = StringProperty("")
+    loading = BooleanProperty(False)
+
+    # Rows fetched per page
+    page_size = 50
+    # Fetch the next page when the scroll position gets this close to the bottom (0..1)
+    prefetch_threshold = 0.15
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._next_cursor = None
+        self._exhausted = False
+        # Incremented on every reload so pages of an outdated listing are dropped
+        self._generation = 0
+
     def set_dependencies(self, db_handler, queries_handler):
         """Method called from main.py to inject DB and Queries objects."""
         self.db = db_handler
@@ -16,4 +40,75 @@ class LedgerScreen(MDScreen):
     def on_enter(self):
         """Called when the screen becomes the current one."""
         print("Trial Ledger Screen entered.")
-        # Logic to load ledger data here
\ No newline at end of file
+        self.load_ledger()
+
+    def on_kv_post(self, base_widget):
+        super().on_kv_post(base_widget)
+        self.ids.ledger_rv.bind(scroll_y=self._on_scroll)
+
+    def load_ledger(self):
+        """(Re)loads open trials from the first page with the current filter."""
+        self._generation += 1
+        self._next_cursor = None
+        self._exhausted = False
+        self.loading = False
+        self.ids.ledger_rv.data = []
+        self._load_next_page()
+
+    def filter_ledger(self, text):
+        """Debounced customer/phone filter from the search field."""
+        self.filter_text = text.strip()
+        Clock.unschedule(self._reload_from_filter)
+        Clock.schedule_once(self._reload_from_filter, 0.3)
+
+    def _reload_from_filter(self, dt):
+        self.load_ledger()
+
+    def _on_scroll(self, rv, scroll_y):
+        # scroll_y is 1 at the top and 0 at the bottom
+        if scroll_y <= self.prefetch_threshold:
+            self._load_next_page()
+
+    def _load_next_page(self):
+        """Requests the next page on the DB worker (no-op while one is in flight)."""
+        if self.loading or self._exhausted or not self.queries:
+            return
+        self.loading = True
+        generation = self._generation
+        text = self.filter_text
+        is_phone = normalize_phone(text) is not None and not any(ch.isalpha() for ch in text)
+        self.queries.run_async(
+            self.queries.get_on_trial_items_page,
+            after=self._next_cursor,
+            limit=self.page_size,
+            customer=None if is_phone else (text or None),
+            phone=text if is_phone else None,
+            callback=lambda page: self._append_page(generation, page),
+            error_callback=lambda error: self._on_page_error(generation, error)
+        )
+
+    def _on_page_error(self, generation, error):
+        """Main thread: a page fetch failed; allow the next scroll to retry it."""
+        if generation != self._generation:
+            return
+        self.loading = False
+        print(f"Failed to load trial ledger page: {error}")
+
+    def _append_page(self, generation, page):
+        """Main thread: appends one page of open trials to the RecycleView."""
+        if generation != self._generation:
+            return
+        self.loading = False
+        self._next_cursor = page['next_cursor']
+        self._exhausted = self._next_cursor is None
+        self.ids.ledger_rv.data.extend(
+            {
+                'viewclass': 'LedgerListItem',
+                'text': f"{row['customer_name'] or 'Unknown'} ({row['customer_phone'] or '-'})",
+                'secondary_text': (
+                    f"{row['name']} ({row['color']}/{row['size']}) | "
+                    f"${row['sell_price']:.2f} | Since {row['date_taken']}"
+                ),
+            }
+            for row in page['rows']
+        )
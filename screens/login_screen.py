@@ -45,6 +45,9 @@ class LoginScreen(MDScreen):
             self.ids.password_input.text = ""
             error_label.text = ""
 
+            # Preload the SKU cache in the background so the first scans are instant
+            self.queries.run_async(self.queries.warm_sku_cache)
+
             # Navigate to Dashboard
             self.manager.current = 'dashboard'
             self.manager.transition.direction = 'left' # Added transition for better UX
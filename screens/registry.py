@@ -0,0 +1,99 @@
+import importlib
+import os
+import time
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.uix.screenmanager import ScreenManager
+
+from utils import startup_profiler
+
+KV_DIR = os.path.dirname(__file__)
+
+# Screen name -> (module, class name, KV file). Nothing here is imported or
+# loaded until the screen is first needed.
+SCREENS = {
+    'login': ('screens.login_screen', 'LoginScreen', 'login.kv'),
+    'dashboard': ('screens.dashboard', 'DashboardScreen', 'dashboard.kv'),
+    'inventory': ('screens.inventory', 'InventoryScreen', 'inventory.kv'),
+    'pos': ('screens.billing_screen', 'BillingScreen', 'billing.kv'),
+    'ledger': ('screens.ledger_screen', 'LedgerScreen', 'ledger.kv'),
+    'reports': ('screens.reports_screen', 'ReportsScreen', 'reports.kv'),
+}
+
+# Screens worth building in idle frames once the key screen is showing.
+PREBUILD_AFTER = {
+    'login': ('dashboard',),
+    'dashboard': ('pos',),
+}
+
+# Seconds to wait after a screen is shown before prebuilding its successors,
+# so the prebuild never competes with the transition animation.
+PREBUILD_DELAY = 1.0
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    ScreenManager that imports, loads the KV for, builds and wires each screen
+    on first navigation instead of at startup.
+
+    Setting `current` to a registered name that has not been built yet builds
+    it first, so existing navigation code (`self.manager.current = 'pos'`)
+    works unchanged.
+    """
+    def __init__(self, db_handler=None, queries_handler=None, registry=None, **kwargs):
+        self.db = db_handler
+        self.queries = queries_handler
+        self.registry = dict(SCREENS if registry is None else registry)
+        self.build_times_ms = {}
+        self._loaded_kv = set()
+        super().__init__(**kwargs)
+
+    def ensure_screen(self, name):
+        """Returns the screen called name, building it if necessary."""
+        if self.has_screen(name):
+            return self.get_screen(name)
+        with startup_profiler.phase(f"build screen {name}"):
+            return self._build_screen(name)
+
+    def _build_screen(self, name):
+        module_name, class_name, kv_file = self.registry[name]
+        started = time.perf_counter()
+
+        screen_class = getattr(importlib.import_module(module_name), class_name)
+        if kv_file and kv_file not in self._loaded_kv:
+            try:
+                Builder.load_file(os.path.join(KV_DIR, kv_file))
+                print(f"[KV Loader] Loaded: {kv_file}")
+            except Exception as e:
+                print(f"[KV ERROR] Failed to load {kv_file}: {e}")
+            self._loaded_kv.add(kv_file)
+
+        screen = screen_class(name=name)
+        screen.set_dependencies(self.db, self.queries)
+        self.add_widget(screen)
+
+        elapsed = (time.perf_counter() - started) * 1000.0
+        self.build_times_ms[name] = elapsed
+        print(f"[Screens] Built '{name}' in {elapsed:.1f} ms")
+        return screen
+
+    def on_current(self, instance, value):
+        if value and value in self.registry:
+            self.ensure_screen(value)
+            self._schedule_prebuild(value)
+        super().on_current(instance, value)
+
+    def _schedule_prebuild(self, name):
+        pending = [n for n in PREBUILD_AFTER.get(name, ()) if n in self.registry and not self.has_screen(n)]
+        if pending:
+            Clock.schedule_once(lambda dt: self._prebuild(pending), PREBUILD_DELAY)
+
+    def _prebuild(self, names):
+        """Builds one screen per frame so no single frame takes the whole cost."""
+        remaining = [name for name in names if not self.has_screen(name)]
+        if not remaining:
+            return
+        self.ensure_screen(remaining[0])
+        if len(remaining) > 1:
+            Clock.schedule_once(lambda dt: self._prebuild(remaining[1:]), 0)
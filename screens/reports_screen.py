@@ -1,3 +1,4 @@
+import datetime
 from kivymd.uix.screen import MDScreen
 
 class ReportsScreen(MDScreen):
@@ -6,6 +7,11 @@ class ReportsScreen(MDScreen):
     """
     name = 'reports' # Corresponds to the navigation item in dashboard.kv
 
+    # Number of days (including today) covered by the report
+    report_days = 30
+    # Number of vendors listed in the performance report
+    top_vendor_count = 20
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.db_handler = None
@@ -19,4 +25,50 @@ class ReportsScreen(MDScreen):
     def on_enter(self):
         """Load report summaries when screen is entered."""
         print("Reports Screen entered.")
-        # Future implementation: Load aggregated sales and inventory data
\ No newline at end of file
+        if self.queries:
+            # Aggregates are read on the DB worker; the UI is filled in the callback.
+            self.queries.run_async(
+                self._load_report, callback=self._apply_report, error_callback=self._report_failed
+            )
+
+    def _load_report(self):
+        """
+        Runs on the DB worker: reads the precomputed vendor and store aggregates.
+        Store totals cover every vendor (and products without one), not just
+        the vendors listed.
+        """
+        end_day = datetime.date.today()
+        start_day = end_day - datetime.timedelta(days=self.report_days - 1)
+        start, end = start_day.isoformat(), end_day.isoformat()
+        vendors = self.queries.get_top_vendors(start, end, limit=self.top_vendor_count)
+        sales = self.queries.get_sales_totals(start, end, period='all')
+        total_sales = sales[0]['total_amount'] if sales else 0.0
+        total_profit = sum(row['margin'] for row in self.queries.get_vendor_report(start, end, period='all'))
+        stats = self.queries.get_dashboard_stats()
+        return vendors, total_sales, total_profit, stats
+
+    def _report_failed(self, error):
+        """Runs on the main thread when the report could not be read."""
+        print(f"Report failed to load: {error}")
+        self.ids.total_sales_label.text = "Unavailable"
+        self.ids.total_profit_label.text = "Unavailable"
+
+    def _apply_report(self, report):
+        """Runs on the main thread: updates the summary labels and vendor list."""
+        vendors, total_sales, total_profit, stats = report
+
+        self.ids.total_sales_label.text = f"${total_sales:,.2f}"
+        self.ids.total_profit_label.text = f"${total_profit:,.2f}"
+        self.ids.items_on_trial_label.text = str(stats.get('pending_trials', 0))
+
+        self.ids.vendor_report_rv.data = [
+            {
+                'viewclass': 'VendorReportItem',
+                'text': row['vendor_name'],
+                'secondary_text': (
+                    f"{row['units']} sold | Revenue ${row['revenue']:,.2f} | "
+                    f"Margin ${row['margin']:,.2f}"
+                ),
+            }
+            for row in vendors
+        ]
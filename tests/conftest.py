@@ -0,0 +1,23 @@
+import contextlib
+import io
+
+import pytest
+
+from database.db_handler import DatabaseHandler
+from database.queries import Queries
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A migrated, seeded store database in a temporary file."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler = DatabaseHandler(str(tmp_path / "store.db"))
+        handler.setup_database()
+    yield handler
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.close()
+
+
+@pytest.fixture
+def queries(db):
+    return Queries(db)
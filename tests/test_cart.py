@@ -0,0 +1,110 @@
+import pytest
+
+from models.cart import Cart
+
+
+def product(product_id, price=10.0, stock=5, name=None):
+    return {'id': product_id, 'name': name or f"Item {product_id}", 'sell_price': price,
+            'stock_quantity': stock}
+
+
+class RowMirror:
+    """Applies cart events to a list of rows the way BillingScreen._on_cart_changed patches cart_rv.data."""
+
+    def __init__(self, cart):
+        self.rows = []
+        self.events = []
+        cart.bind(self)
+
+    def __call__(self, event, position, line):
+        self.events.append((event, position))
+        row = None if line is None else (line.product_id, line.qty)
+        if event == Cart.ADDED:
+            assert position == len(self.rows)
+            self.rows.append(row)
+        elif event == Cart.UPDATED:
+            self.rows[position] = row
+        elif event == Cart.REMOVED:
+            assert self.rows[position][0] == line.product_id
+            del self.rows[position]
+        else:
+            self.rows = []
+
+
+def assert_consistent(cart, mirror):
+    """Index, display order and mirrored rows all agree."""
+    lines = list(cart)
+    assert mirror.rows == [(line.product_id, line.qty) for line in lines]
+    for row, line in enumerate(lines):
+        assert cart.position(line.product_id) == row
+        assert cart.get(line.product_id) is line
+    assert cart.total == pytest.approx(sum(line.qty * line.price for line in lines))
+
+
+def test_add_increment_remove_keep_index_in_sync():
+    cart = Cart()
+    mirror = RowMirror(cart)
+    for product_id in (1, 2, 3, 4):
+        cart.add(product(product_id))
+    cart.add(product(2))                  # increments the existing line
+    cart.set_quantity(3, 4)
+    cart.remove(2)                        # rows after it shift up
+    cart.set_quantity(4, 0)               # quantity 0 removes the line
+    cart.add(product(5))
+
+    assert [line.product_id for line in cart] == [1, 3, 5]
+    assert cart.position(2) is None and 2 not in cart
+    assert cart.get(3).qty == 4
+    assert len(cart) == 3 and cart.unit_count == 6
+    assert_consistent(cart, mirror)
+
+
+def test_events_carry_the_display_row():
+    cart = Cart()
+    mirror = RowMirror(cart)
+    cart.add(product(1))
+    cart.add(product(2))
+    cart.add(product(2))
+    cart.remove(1)
+    cart.set_quantity(2, 1)
+    cart.clear()
+
+    assert mirror.events == [
+        (Cart.ADDED, 0), (Cart.ADDED, 1), (Cart.UPDATED, 1),
+        (Cart.REMOVED, 0), (Cart.UPDATED, 0), (Cart.CLEARED, None),
+    ]
+    assert mirror.rows == [] and len(cart) == 0 and cart.total == 0
+
+
+def test_unchanged_quantity_emits_nothing():
+    cart = Cart()
+    cart.add(product(1))
+    mirror = RowMirror(cart)
+    cart.set_quantity(1, 1)
+    assert mirror.events == []
+
+
+def test_total_is_kept_in_cents():
+    cart = Cart()
+    cart.add(product(1, price=0.1, stock=10))
+    cart.add(product(2, price=0.2, stock=10))
+    cart.set_quantity(1, 3)
+    # 3 * 0.10 + 0.20 exactly, without float drift
+    assert cart.total == 0.5
+    cart.remove(1)
+    assert cart.total == 0.2
+    cart.add(product(3, price=19.999, stock=10))  # prices are rounded to cents on add
+    assert cart.total == 20.2
+    assert cart.items_list() == [(2, 1, 0.2), (3, 1, 20.0)]
+
+
+def test_stock_limits_are_enforced():
+    cart = Cart()
+    mirror = RowMirror(cart)
+    assert cart.add(product(1, stock=0)) is None
+    assert cart.add(product(2, stock=2)) is not None
+    assert cart.add(product(2, stock=2)) is not None
+    assert cart.add(product(2, stock=2)) is None      # a third unit would exceed stock
+    assert cart.set_quantity(2, 5) is None
+    assert cart.get(2).qty == 2
+    assert_consistent(cart, mirror)
@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from database.overdue_scanner import OverdueTrialScanner
+
+NOW = datetime.datetime(2026, 1, 12, 10, 0, 0)  # 7 days back: 2026-01-05 10:00:00
+
+
+@pytest.fixture
+def ledger(db, capsys):
+    """Ten open trials taken daily from 2026-01-01 10:00 (ids 1..10)."""
+    db.conn.executemany(
+        "INSERT INTO trial_ledger (customer_name, customer_phone, product_id, date_taken, status) "
+        "VALUES ('Asha', '555-0101', 3, ?, 'On_Trial')",
+        [(f"2026-01-{day:02d} 10:00:00",) for day in range(1, 11)])
+    db.conn.commit()
+    return db
+
+
+def flagged(db):
+    return [row[0] for row in db.conn.execute("SELECT trial_id FROM overdue_trials ORDER BY trial_id")]
+
+
+def overdue_count(queries):
+    return queries.get_dashboard_stats()['overdue_trials']
+
+
+def test_first_scan_flags_every_overdue_trial_in_batches(ledger, queries):
+    result = queries.scan_overdue_trials(max_age_days=7, batch_size=2, now=NOW)
+
+    assert result['flagged'] == 5 and result['batches'] == 3 and not result['reset']
+    assert result['checkpoint'] == ('2026-01-05 10:00:00', 5)
+    assert flagged(ledger) == [1, 2, 3, 4, 5]
+    assert overdue_count(queries) == 5
+    assert [row['trial_id'] for row in queries.get_overdue_trials(limit=2)] == [1, 2]
+    assert [row['trial_id'] for row in queries.get_overdue_trials(after=('2026-01-04 10:00:00', 4))] == [5]
+
+
+def test_later_scans_resume_from_the_checkpoint(ledger, queries):
+    queries.scan_overdue_trials(max_age_days=7, now=NOW)
+    # Rows behind the checkpoint are not read again (a rescan would re-flag this one)
+    ledger.conn.execute("DELETE FROM overdue_trials WHERE trial_id = 1")
+    ledger.conn.commit()
+
+    again = queries.scan_overdue_trials(max_age_days=7, now=NOW)
+    assert again['flagged'] == 0 and again['checkpoint'] == ('2026-01-05 10:00:00', 5)
+
+    later = queries.scan_overdue_trials(max_age_days=7, now=NOW + datetime.timedelta(days=2))
+    assert later['flagged'] == 2 and later['checkpoint'] == ('2026-01-07 10:00:00', 7)
+    assert flagged(ledger) == [2, 3, 4, 5, 6, 7]
+    assert overdue_count(queries) == 6
+
+
+def test_closing_a_trial_removes_it_and_reopening_flags_it_again(ledger, queries):
+    queries.scan_overdue_trials(max_age_days=7, now=NOW)
+
+    assert queries.return_trial_items([2]) == 1
+    assert queries.convert_trials_to_sale([3], "Cash", 1) is not None
+    assert flagged(ledger) == [1, 4, 5]
+    assert overdue_count(queries) == 3
+
+    # Reopened behind the checkpoint: the trigger flags it, no rescan needed
+    assert queries.update_trial_status(2, 'On_Trial') is True
+    assert flagged(ledger) == [1, 2, 4, 5]
+    assert overdue_count(queries) == 4
+
+
+def test_changing_the_age_resets_the_scan(ledger, queries):
+    queries.scan_overdue_trials(max_age_days=7, now=NOW)
+
+    result = queries.scan_overdue_trials(max_age_days=9, now=NOW)
+
+    assert result['reset'] is True
+    assert flagged(ledger) == [1, 2, 3]
+    assert overdue_count(queries) == 3
+    assert result['checkpoint'] == ('2026-01-03 10:00:00', 3)
+
+
+def test_rebuild_store_stats_agrees_with_the_triggers(ledger, queries):
+    queries.scan_overdue_trials(max_age_days=7, now=NOW)
+    queries.return_trial_items([1])
+    assert queries.rebuild_store_stats() is True
+    assert overdue_count(queries) == 4
+
+
+class FakeAsync:
+    """Stands in for Queries.run_async: jobs run when the test says so."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def __call__(self, method, *args, callback=None, error_callback=None, **kwargs):
+        self.jobs.append((method, args, kwargs, callback, error_callback))
+
+    def finish(self, error=None):
+        method, args, kwargs, callback, error_callback = self.jobs.pop(0)
+        if error is not None:
+            error_callback(error)
+        else:
+            callback(method(*args, **kwargs))
+
+
+def test_scanner_runs_one_scan_at_a_time(ledger, queries, monkeypatch):
+    fake = FakeAsync()
+    monkeypatch.setattr(queries, "run_async", fake)
+    results = []
+    scanner = OverdueTrialScanner(queries, max_age_days=7, on_scan=results.append)
+
+    assert scanner.scan_now() is True
+    assert scanner.scan_now() is False   # previous scan still pending
+    fake.finish()
+    assert results[0]['flagged'] == 10   # measured from the real clock: all ten are old
+    assert scanner.last_result is results[0]
+
+    assert scanner.scan_now() is True
+    fake.finish(error=RuntimeError("worker failed"))
+    assert len(results) == 1
+    assert scanner.scan_now() is True    # a failed scan does not block the next one
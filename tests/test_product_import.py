@@ -0,0 +1,90 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+from database import bulk_io
+from database.db_handler import DatabaseHandler
+from database.queries import Queries
+from models.product import Product
+
+
+def _record(**overrides):
+    record = {'sku': 'IMP-1', 'name': 'Imported Tee', 'buy_price': 5, 'sell_price': 9, 'stock_quantity': 3}
+    record.update(overrides)
+    return record
+
+
+@pytest.mark.parametrize("value", [1.5, True, False])
+def test_from_record_rejects_non_integral_stock(value):
+    with pytest.raises(ValueError, match="stock_quantity is not a valid int"):
+        Product.from_record(_record(stock_quantity=value), None)
+
+
+def test_from_record_rejects_bool_price():
+    with pytest.raises(ValueError, match="sell_price is not a valid float"):
+        Product.from_record(_record(sell_price=True), None)
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity", float("nan"), float("inf")])
+def test_from_record_rejects_non_finite_price(value):
+    with pytest.raises(ValueError, match="buy_price is not a finite number"):
+        Product.from_record(_record(buy_price=value), None)
+
+
+def test_from_record_accepts_integral_float_stock():
+    assert Product.from_record(_record(stock_quantity=2.0), None).stock_quantity == 2
+
+
+def test_import_lists_fractional_and_bool_stock_as_rejected(tmp_path):
+    path = tmp_path / "catalogue.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in (
+        _record(sku='IMP-1'),
+        _record(sku='IMP-2', stock_quantity=1.5),
+        _record(sku='IMP-3', stock_quantity=True),
+    )) + "\n", encoding="utf-8")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseHandler(":memory:")
+        db.setup_database()
+        report = bulk_io.import_products(Queries(db), str(path))
+    skus = {row[0] for row in db.conn.execute("SELECT sku FROM products WHERE sku LIKE 'IMP-%'")}
+    db.close()
+
+    assert report['written'] == 1
+    assert report['rejected'] == 2
+    assert report['errors'] == [
+        "line 2: stock_quantity is not a valid int: 1.5",
+        "line 3: stock_quantity is not a valid int: True",
+    ]
+    assert skus == {'IMP-1'}
+
+
+def test_import_rejects_nan_price_without_failing_the_batch(tmp_path):
+    path = tmp_path / "catalogue.csv"
+    lines = ["sku,name,buy_price,sell_price,stock_quantity"]
+    lines += [f"OK-{i},Item {i},1,2,1" for i in range(1000)]
+    lines.append("BAD,Bad,nan,2,1")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseHandler(":memory:")
+        db.setup_database()
+        report = bulk_io.import_products(Queries(db), str(path))
+    db.close()
+
+    assert report['failed'] is False
+    assert report['written'] == 1000
+    assert report['rejected'] == 1
+    assert report['errors'] == ["line 1002: buy_price is not a finite number: 'nan'"]
+
+
+def test_maintenance_import_reports_missing_file(tmp_path, capsys):
+    from database import maintenance
+
+    status = maintenance.main(["--db", str(tmp_path / "store.db"), "import-products",
+                               str(tmp_path / "missing.csv")])
+
+    assert status == 1
+    assert "No such file" in capsys.readouterr().out
@@ -0,0 +1,10 @@
+import contextlib
+import io
+
+from database.query_plans import check_query_plans
+
+
+def test_every_statement_uses_an_index():
+    with contextlib.redirect_stdout(io.StringIO()):
+        failures = check_query_plans()
+    assert failures == []
@@ -0,0 +1,124 @@
+import pytest
+
+
+@pytest.fixture
+def store(db, queries, capsys):
+    """Helpers over the seeded store: stock per product and trial status per entry."""
+    class Store:
+        @staticmethod
+        def stock(product_id):
+            return db.conn.execute("SELECT stock_quantity FROM products WHERE id = ?", (product_id,)).fetchone()[0]
+
+        @staticmethod
+        def status(trial_id):
+            return db.conn.execute("SELECT status FROM trial_ledger WHERE id = ?", (trial_id,)).fetchone()[0]
+
+        @staticmethod
+        def transactions():
+            return db.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+        @staticmethod
+        def checkout(name, phone, product_id):
+            assert queries.checkout_for_trial(name, phone, product_id) is True
+            return db.conn.execute("SELECT MAX(id) FROM trial_ledger").fetchone()[0]
+    return Store
+
+
+def test_checkout_and_return_keep_stock_balanced(queries, store):
+    before = store.stock(3)
+    first = store.checkout("Asha", "555-0101", 3)
+    second = store.checkout("Asha", "555-0101", 3)
+    assert store.stock(3) == before - 2
+
+    assert queries.return_trial_items([first, second]) == 2
+    assert store.stock(3) == before
+    assert {store.status(first), store.status(second)} == {'Returned'}
+
+
+def test_return_is_all_or_nothing(queries, store):
+    before = store.stock(3)
+    open_id = store.checkout("Asha", "555-0101", 3)
+    closed_id = store.checkout("Asha", "555-0101", 3)
+    assert queries.return_trial_items([closed_id]) == 1
+
+    assert queries.return_trial_items([open_id, closed_id]) is None
+    assert store.status(open_id) == 'On_Trial'
+    assert store.stock(3) == before - 1
+
+
+def test_convert_sells_without_touching_stock(db, queries, store):
+    before = store.stock(3)
+    trial_ids = [store.checkout("Asha", "555-0101", 3), store.checkout("Asha", "555-0101", 1)]
+    commits = db.commit_count
+
+    transaction_id = queries.convert_trials_to_sale(trial_ids, "Card", 1)
+
+    assert transaction_id is not None
+    assert db.commit_count == commits + 1
+    assert store.stock(3) == before - 1
+    assert {store.status(trial_id) for trial_id in trial_ids} == {'Purchased'}
+    lines = db.conn.execute(
+        "SELECT COUNT(*) FROM transaction_items WHERE transaction_id = ?", (transaction_id,)).fetchone()[0]
+    assert lines == 2
+
+
+def test_convert_is_all_or_nothing(queries, store):
+    open_id = store.checkout("Asha", "555-0101", 3)
+    closed_id = store.checkout("Asha", "555-0101", 3)
+    queries.return_trial_items([closed_id])
+    sales = store.transactions()
+
+    assert queries.convert_trials_to_sale([open_id, closed_id], "Cash", 1) is None
+    assert store.status(open_id) == 'On_Trial'
+    assert store.transactions() == sales
+
+
+def test_settle_sells_chosen_items_and_returns_the_rest_in_one_commit(db, queries, store):
+    before = {product_id: store.stock(product_id) for product_id in (1, 3)}
+    kept = store.checkout("Asha", "555-0101", 3)
+    returned = store.checkout("Asha", "(555) 0101", 1)
+    other_customer = store.checkout("Ravi", "555-0102", 3)
+    commits = db.commit_count
+
+    result = queries.settle_customer_trials("555 0101", 1, purchased_ids=[kept])
+
+    assert result['returned'] == 1 and result['purchased'] == 1 and result['transaction_id']
+    assert db.commit_count == commits + 1
+    assert (store.status(kept), store.status(returned), store.status(other_customer)) == \
+        ('Purchased', 'Returned', 'On_Trial')
+    assert store.stock(1) == before[1]
+    assert store.stock(3) == before[3] - 2
+
+
+def test_settle_is_all_or_nothing(queries, store):
+    before = store.stock(3)
+    mine = store.checkout("Asha", "555-0101", 3)
+    theirs = store.checkout("Ravi", "555-0102", 3)
+    sales = store.transactions()
+
+    # Another customer's trial cannot be bought in this settlement
+    assert queries.settle_customer_trials("555-0101", 1, purchased_ids=[theirs]) is None
+    assert store.status(mine) == 'On_Trial' and store.status(theirs) == 'On_Trial'
+    assert store.stock(3) == before - 2
+    assert store.transactions() == sales
+
+
+@pytest.mark.parametrize("status", ["Returned", "Purchased", "Lost"])
+def test_update_trial_status_refuses_stock_changes(queries, store, status):
+    trial_id = store.checkout("Asha", "555-0101", 3)
+    with pytest.raises(ValueError):
+        queries.update_trial_status(trial_id, status)
+    assert store.status(trial_id) == 'On_Trial'
+
+
+def test_reopening_a_returned_trial_takes_stock_again(queries, store):
+    before = store.stock(3)
+    trial_id = store.checkout("Asha", "555-0101", 3)
+    queries.return_trial_items([trial_id])
+
+    assert queries.update_trial_status(trial_id, 'On_Trial') is True
+    assert store.status(trial_id) == 'On_Trial'
+    assert store.stock(3) == before - 1
+    # Already open: nothing to reopen
+    assert queries.update_trial_status(trial_id, 'On_Trial') is None
+    assert store.stock(3) == before - 1
@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def notes(db):
+    db.conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL)")
+    db.conn.commit()
+    # A second connection only sees what has been committed
+    reader = sqlite3.connect(db.db_path)
+    yield lambda: [row[0] for row in reader.execute("SELECT body FROM notes ORDER BY id")]
+    reader.close()
+
+
+def test_unit_of_work_commits_once_at_the_end(db, notes):
+    commits = db.commit_count
+    with db.transaction('two_inserts') as cursor:
+        cursor.execute("INSERT INTO notes (body) VALUES ('a')")
+        db.execute_query("INSERT INTO notes (body) VALUES (?)", ('b',))
+        assert notes() == []
+        assert db.commit_count == commits
+    assert notes() == ['a', 'b']
+    assert db.commit_count == commits + 1
+
+
+def test_nested_unit_rolls_back_only_itself(db, notes):
+    with db.transaction('outer') as cursor:
+        cursor.execute("INSERT INTO notes (body) VALUES ('outer-before')")
+        with pytest.raises(RuntimeError):
+            with db.transaction('inner') as inner:
+                inner.execute("INSERT INTO notes (body) VALUES ('inner')")
+                raise RuntimeError("inner failed")
+        cursor.execute("INSERT INTO notes (body) VALUES ('outer-after')")
+    assert notes() == ['outer-before', 'outer-after']
+    assert not db.in_unit_of_work
+
+
+def test_outer_failure_discards_released_savepoints(db, notes):
+    with pytest.raises(RuntimeError):
+        with db.transaction('outer') as cursor:
+            cursor.execute("INSERT INTO notes (body) VALUES ('outer')")
+            with db.transaction('inner') as inner:
+                inner.execute("INSERT INTO notes (body) VALUES ('inner')")
+            raise RuntimeError("outer failed")
+    assert notes() == []
+    assert not db.conn.in_transaction
+
+
+def test_after_commit_runs_only_after_the_outer_commit(db, notes):
+    seen = []
+    with db.transaction('outer') as cursor:
+        cursor.execute("INSERT INTO notes (body) VALUES ('a')")
+        db.after_commit(lambda: seen.append(('outer', notes())))
+        with db.transaction('inner'):
+            db.after_commit(lambda: seen.append(('inner', notes())))
+        assert seen == []
+    # Both callbacks ran once, in order, with the data already committed
+    assert seen == [('outer', ['a']), ('inner', ['a'])]
+
+
+def test_after_commit_is_dropped_on_rollback(db, notes):
+    seen = []
+    with db.transaction('outer'):
+        db.after_commit(lambda: seen.append('kept'))
+        with pytest.raises(RuntimeError):
+            with db.transaction('inner'):
+                db.after_commit(lambda: seen.append('inner rolled back'))
+                raise RuntimeError
+    assert seen == ['kept']
+
+    with pytest.raises(RuntimeError):
+        with db.transaction('outer'):
+            db.after_commit(lambda: seen.append('outer rolled back'))
+            raise RuntimeError
+    assert seen == ['kept']
+
+
+def test_after_commit_outside_a_unit_runs_immediately(db):
+    seen = []
+    db.after_commit(lambda: seen.append(1))
+    assert seen == [1]
+
+
+def test_failed_statement_outside_a_unit_returns_none(db, notes, capsys):
+    errors = db.error_count
+    assert db.execute_query("INSERT INTO notes (body) VALUES (NULL)") is None
+    assert db.error_count == errors + 1
+    assert not db.conn.in_transaction
+    # The handler is still usable afterwards
+    assert db.execute_query("INSERT INTO notes (body) VALUES ('ok')") is True
+    assert notes() == ['ok']
+
+
+def test_failed_statement_inside_a_unit_reraises_and_rolls_back(db, notes, capsys):
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction('failing'):
+            db.execute_query("INSERT INTO notes (body) VALUES ('a')")
+            db.execute_query("INSERT INTO notes (body) VALUES (NULL)")
+    assert notes() == []
+    assert not db.in_unit_of_work
@@ -0,0 +1,214 @@
+"""
+Opt-in cold-start profiler.
+
+Enable it with the environment variable STORE_PROFILE_STARTUP (set to 1, or
+to the path of the report) or the command line flag --profile-startup[=PATH]
+(after Kivy's "--" separator, e.g. `python main.py -- --profile-startup`).
+
+When enabled it records:
+  * named phases of main.py / ClothingStoreApp.build (start and duration)
+  * point-in-time marks such as the first frame
+  * the import time of every module imported while it runs (cumulative and
+    self time, measured by a sys.meta_path hook)
+
+finish() writes everything as JSON. When it is not enabled, phase() returns
+a shared no-op context manager and nothing else runs.
+"""
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+ENV_VAR = "STORE_PROFILE_STARTUP"
+FLAG = "--profile-startup"
+DEFAULT_REPORT = "startup_profile.json"
+
+# The running profiler, or None when profiling is off
+PROFILER = None
+
+_NOOP = contextlib.nullcontext()
+
+
+class _TimedLoader:
+    """Wraps a module loader so exec_module() is timed; everything else is delegated."""
+    def __init__(self, loader, fullname, timer):
+        self._loader = loader
+        self._fullname = fullname
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.enter(self._fullname)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave()
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer:
+    """
+    sys.meta_path finder that times module execution. Nested imports are
+    charged to their parent's cumulative time but not to its self time.
+    """
+    def __init__(self):
+        self.modules = {}  # name -> [cumulative_ms, self_ms]
+        self._stack = []   # [name, started, child_ms]
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'searching', False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimedLoader(spec.loader, fullname, self)
+                    return spec
+            return None
+        finally:
+            self._local.searching = False
+
+    def enter(self, fullname):
+        self._stack.append([fullname, time.perf_counter(), 0.0])
+
+    def leave(self):
+        fullname, started, child_ms = self._stack.pop()
+        cumulative = (time.perf_counter() - started) * 1000.0
+        self.modules[fullname] = [cumulative, cumulative - child_ms]
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class StartupProfiler:
+    """Collects phases, marks and import times relative to its creation."""
+    def __init__(self, report_path=None):
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.phases = []
+        self.marks = []
+        self.imports = ImportTimer()
+        self._depth = 0
+
+    def _now_ms(self):
+        return (time.perf_counter() - self.started) * 1000.0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        entry = {'name': name, 'depth': self._depth, 'start_ms': round(self._now_ms(), 3)}
+        self.phases.append(entry)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            entry['duration_ms'] = round(self._now_ms() - entry['start_ms'], 3)
+
+    def mark(self, name):
+        self.marks.append({'name': name, 'at_ms': round(self._now_ms(), 3)})
+
+    def report(self):
+        modules = [
+            {'module': name, 'cumulative_ms': round(cumulative, 3), 'self_ms': round(own, 3)}
+            for name, (cumulative, own) in self.imports.modules.items()
+        ]
+        modules.sort(key=lambda entry: entry['self_ms'], reverse=True)
+        return {
+            'started_at': self.started_at,
+            'total_ms': round(self._now_ms(), 3),
+            'environment': {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': sys.platform,
+                'machine': platform.machine(),
+            },
+            'phases': self.phases,
+            'marks': self.marks,
+            'imports': {
+                'count': len(modules),
+                'self_ms_total': round(sum(entry['self_ms'] for entry in modules), 3),
+                'modules': modules,
+            },
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.report(), handle, indent=2)
+        print(f"[Startup] Profile written to {path}")
+
+
+def _requested_path(argv, environ):
+    """Report path requested by flag or environment ('' = default), or None."""
+    for index, arg in enumerate(argv):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            # Removed so the app's own argument handling never sees it
+            del argv[index]
+            return arg.partition("=")[2]
+    value = environ.get(ENV_VAR, "")
+    if value and value.lower() not in ("0", "false", "no"):
+        return "" if value.lower() in ("1", "true", "yes") else value
+    return None
+
+
+def start_if_requested(argv=None, environ=None):
+    """
+    Starts the profiler when the flag or environment variable asks for it.
+    Call this as early as possible; returns the profiler or None.
+    """
+    global PROFILER
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    path = _requested_path(argv, environ)
+    if path is None:
+        return None
+    PROFILER = StartupProfiler(path or None)
+    PROFILER.imports.install()
+    return PROFILER
+
+
+def phase(name):
+    """Context manager timing a startup phase (a no-op when profiling is off)."""
+    if PROFILER is None:
+        return _NOOP
+    return PROFILER.phase(name)
+
+
+def mark(name):
+    if PROFILER is not None:
+        PROFILER.mark(name)
+
+
+def finish(default_dir=None):
+    """
+    Stops import timing and writes the report (to the requested path, or
+    DEFAULT_REPORT in default_dir). Returns the path, or None when off.
+    """
+    global PROFILER
+    profiler = PROFILER
+    if profiler is None:
+        return None
+    PROFILER = None
+    profiler.imports.uninstall()
+    path = profiler.report_path or os.path.join(default_dir or os.getcwd(), DEFAULT_REPORT)
+    profiler.write(path)
+    return path